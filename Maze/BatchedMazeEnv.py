@@ -0,0 +1,238 @@
+# Batched version of MazeEnv that steps many copies of the same maze at once
+# Every env is stored in one array laid out like a stack of MazeEnv observations, over a single terrain
+# they all share, so a step is a handful of NumPy operations no matter how many envs there are.
+# Cells are numbered row * width + col, so every lookup and write is one index per env
+import numpy as np
+from gym.spaces import Discrete
+from stable_baselines3.common.vec_env import VecEnv
+
+import ExplorationTracker
+import MazeLayers
+import MazeRenderer
+import MazeRules
+from MazeEnv import TELEPORT, WALL, TRAP, GOAL
+from Seeding import spawnSeeds
+
+# Codes for the state of each world, matching MazeEnv.state
+PLAYING = 0
+FAILED = 1
+SUCCEEDED = 2
+STATE_NAMES = ['P', 'Failed', 'Succeeded']
+# State of a world after each outcome of MazeRules
+OUTCOME_STATES = np.array([PLAYING, PLAYING, FAILED, SUCCEEDED], dtype=np.int8)
+
+
+class BatchedMazeEnv(VecEnv):
+    # Constructor
+    def __init__(self, world, numOfAgents, num_envs, obs_layout='world', agent_start=None, exploration='shared'):
+        '''
+
+        :param world: Starting world of the map
+        :param numOfAgents: Number of agents, agents are numbered 1 to numOfAgents
+        :param num_envs: Number of copies of the maze stepped together
+        :param obs_layout: 'world' or 'planes', see MazeLayers
+        :param agent_start: Starting cell of each agent, found in the world by default
+        :param exploration: Track visited cells for everyone ('shared'), per 'team' or per 'agent'
+        '''
+        self.world_start = np.asarray(world)
+        self.numAgents = numOfAgents
+        self.height = np.size(self.world_start, 0)
+        self.width = np.size(self.world_start, 1)
+        self.max_step = 60
+        self.render_mode = None
+        self.rules = MazeRules.MazeRules(self.world_start, self.numAgents)
+        self.terrain = self.rules.terrain
+        if agent_start is None:
+            agent_start = self.rules.agent_start
+        else:
+            agent_start = MazeLayers.agentStarts(agent_start, self.terrain, self.numAgents)
+
+        self.obs_layout = obs_layout
+        observation_space = MazeLayers.observationSpace(self.terrain.shape, obs_layout, self.numAgents)
+        super().__init__(num_envs, observation_space, Discrete(5))
+        self.reward_range = (-200, 200)
+
+        # The observation of every env, with the planes of its layout as views into it
+        self.observations, self.world, self.occupancy = MazeLayers.allocate(self.terrain, obs_layout, num_envs)
+        self.agent_index = (slice(None),) + MazeLayers.AGENT_INDEX[obs_layout]
+        # The same planes and rule tables with one cell number per env, assigning the shape raises if a view
+        # can't be made
+        self._world = self.world.view()
+        self._world.shape = (num_envs, -1)
+        self._occupancy = self.occupancy.view()
+        self._occupancy.shape = (num_envs, -1)
+        self._terrain = self.terrain.reshape(-1)
+        self._outcome = self.rules.outcome.reshape(-1, TELEPORT)
+        self._steps = MazeRules.ROW_STEPS * self.width + MazeRules.COL_STEPS
+        self._teleport_rows = self.rules.teleport_rows.reshape(-1, MazeRules.TELEPORT_DISTANCE)
+        self._teleport_outcome = self.rules.teleport_outcome.reshape(-1)
+        # Agents on a cell before this one can be teleported, the ones after it are at the edge
+        self._teleport_end = (self.height - 2) * self.width
+
+        # Starting cell of every agent, -1 for agents that are not on the map
+        self.start_cells = np.full(self.numAgents + 1, -1, dtype=np.int64)
+        for agent, pos in enumerate(agent_start):
+            if pos is not None:
+                self.start_cells[agent] = pos[0] * self.width + pos[1]
+
+        self.envs = np.arange(num_envs)
+        # Every agent starts off the map, so the first reset has nothing to take off
+        self.agent_cells = np.full((num_envs, self.numAgents + 1), -1, dtype=np.int64)
+        self.current_agent = np.ones(num_envs, dtype=np.int64)
+        self.current_step = np.zeros(num_envs, dtype=np.int64)
+        self.state = np.zeros(num_envs, dtype=np.int8)
+        # Cells visited this episode, with the plane of each agent
+        groups, num_groups = ExplorationTracker.agentGroups(exploration, self.numAgents)
+        self.exploration_groups = np.array(groups)
+        self.exploration_prize = ExplorationTracker.BatchedExplorationTracker(num_envs, self.height, self.width,
+                                                                              num_groups)
+        self.current_episode = np.zeros(num_envs, dtype=np.int64)
+        self.actions = None
+        # Cells a move can lead to, only the first is ever set
+        self._move_candidates = np.full((num_envs, MazeRules.TELEPORT_DISTANCE), -1, dtype=np.int64)
+        # Info of every env that is still playing, it must not be changed
+        self._playing_info = {'state': STATE_NAMES[PLAYING]}
+
+        # Cells are coloured like MazeEnv, the tile atlas is only built the first time frames are drawn
+        self.cell_colours = {WALL: "white", TRAP: "red", GOAL: "green"}
+        self.cell_colours.update({agent: "blue" for agent in range(1, self.numAgents + 1)})
+        self.atlas = None
+
+        self._resetEnvs(self.envs)
+
+    # Write the agents of the given envs on their cells, or take them off with the terrain under them
+    def _drawAgents(self, envs, remove):
+        env_rows, agents = np.nonzero(self.agent_cells[envs] >= 0)
+        envs = envs[env_rows]
+        cells = self.agent_cells[envs, agents]
+        if remove:
+            self._occupancy[envs, cells] = 0
+            self._world[envs, cells] = self._terrain[cells]
+        else:
+            self._occupancy[envs, cells] = agents
+            self._world[envs, cells] = agents
+
+    # Put the given envs back to the start of an episode
+    # Only the cells of the agents are touched, the terrain is the same for every episode
+    def _resetEnvs(self, envs):
+        self._drawAgents(envs, remove=True)
+        self.agent_cells[envs] = self.start_cells
+        self._drawAgents(envs, remove=False)
+        self.current_agent[envs] = 1
+        self.current_step[envs] = 0
+        self.state[envs] = PLAYING
+        self.exploration_prize.clear(envs)
+        self.observations[self.agent_index][envs] = 1
+
+    # Apply the action of every env in one pass
+    # The current agent moves itself, or teleports the next agent forward. Either way the agent has up to three
+    # cells to go to in order, the cell a move leads to or the rows a teleport can land on, and goes to the first
+    # of them that no agent is standing on. Returns the exploration prize of every env
+    def _applyActions(self, actions):
+        envs = self.envs
+        teleporting = actions == TELEPORT
+        agents = np.where(teleporting, self.current_agent % self.numAgents + 1, self.current_agent)
+        cells = self.agent_cells[envs, agents]
+        on_map = cells >= 0
+        cells = np.maximum(cells, 0)
+
+        move_actions = np.minimum(actions, TELEPORT - 1)
+        move_outcome = self._outcome[cells, move_actions]
+        self._move_candidates[:, 0] = np.where(move_outcome != MazeRules.BLOCKED, cells + self._steps[move_actions], -1)
+        teleport_rows = self._teleport_rows[cells].astype(np.int64)
+        teleport_cells = np.where(teleport_rows >= 0, teleport_rows * self.width + cells[:, None] % self.width, -1)
+        candidates = np.where(teleporting[:, None], teleport_cells, self._move_candidates)
+
+        # Walls, the edge of the maze and other agents block a cell, and agents off the map can't move
+        free = (candidates >= 0) & on_map[:, None]
+        free &= self._occupancy[envs[:, None], np.maximum(candidates, 0)] == 0
+        rank = free.argmax(axis=1)
+        found = free[envs, rank]
+        targets = candidates[envs, rank]
+        outcome = np.where(teleporting, self._teleport_outcome[targets], move_outcome)
+        self.state[:] = OUTCOME_STATES[outcome] * found
+
+        # Like MazeEnv, an agent teleported to the row three ahead stays where it is
+        moved = found & ~(teleporting & (rank == 0))
+        moved_envs, agents, from_cells, to_cells = envs[moved], agents[moved], cells[moved], targets[moved]
+        self._occupancy[moved_envs, from_cells] = 0
+        self._world[moved_envs, from_cells] = self._terrain[from_cells]
+        self._occupancy[moved_envs, to_cells] = agents
+        self._world[moved_envs, to_cells] = agents
+        self.agent_cells[moved_envs, agents] = to_cells
+
+        # Incentive mechanism for exploration, one point for every newly visited cell, credited to the agent
+        # taking the action like MazeEnv. A teleport with nowhere to land counts the cell the agent is on
+        prized = found | (teleporting & on_map & (cells < self._teleport_end))
+        prize_envs = envs[prized]
+        bonus = np.zeros(self.num_envs)
+        groups = self.exploration_groups[self.current_agent[prize_envs]]
+        bonus[prize_envs] = self.exploration_prize.visit(prize_envs, groups, np.where(found, targets, cells)[prized])
+        return bonus
+
+    def reset(self):
+        self._resetEnvs(self.envs)
+        return self.observations.copy()
+
+    def step_async(self, actions):
+        self.actions = np.asarray(actions, dtype=np.int64).reshape(self.num_envs)
+
+    def step_wait(self):
+        bonus = self._applyActions(self.actions)
+        self.current_step += 1
+
+        # Reward Assignment
+        reward = np.full(self.num_envs, -2.0)
+        succeeded = self.state == SUCCEEDED
+        reward[succeeded] = 200 * (1 + 1 / self.current_step[succeeded])
+        reward[self.state == FAILED] = -200
+        reward += bonus
+        dones = (self.state != PLAYING) | (self.current_step >= self.max_step)
+
+        # Switch the agent turns
+        self.current_agent = self.current_agent % self.numAgents + 1
+        self.observations[self.agent_index] = self.current_agent
+
+        # Envs that are still playing all share one info, only the envs that are done get their own
+        infos = [self._playing_info] * self.num_envs
+        done_envs = np.flatnonzero(dones)
+        if len(done_envs):
+            terminal_observations = self.observations[done_envs]
+            for env, state, observation in zip(done_envs.tolist(), self.state[done_envs].tolist(),
+                                               terminal_observations):
+                infos[env] = {'state': STATE_NAMES[state], 'terminal_observation': observation}
+            self.current_episode[done_envs] += 1
+            self._resetEnvs(done_envs)
+
+        return self.observations.copy(), reward.astype(np.float32), dones, infos
+
+    # Draw the world of every env into an RGB array shaped (N, H * 25, W * 25, 3)
+    def renderFrames(self):
+        if self.atlas is None:
+            self.atlas = MazeRenderer.makeAtlas(self.cell_colours, "light blue")
+        return MazeRenderer.drawFrames(self.world, self.atlas)
+
+    def get_images(self):
+        return list(self.renderFrames())
+
+    def close(self):
+        pass
+
+    def seed(self, seed=None):
+        # Stepping is deterministic, only the action space has a random stream to seed
+        # Each env is still given its own seed, like the envs of SharedMemVecEnv
+        self.action_space.seed(seed)
+        return spawnSeeds(seed, self.num_envs)
+
+    def get_attr(self, attr_name, indices=None):
+        return [getattr(self, attr_name)] * len(self._get_indices(indices))
+
+    def set_attr(self, attr_name, value, indices=None):
+        setattr(self, attr_name, value)
+
+    def env_method(self, method_name, *method_args, indices=None, **method_kwargs):
+        method = getattr(self, method_name)
+        return [method(*method_args, **method_kwargs) for _ in self._get_indices(indices)]
+
+    def env_is_wrapped(self, wrapper_class, indices=None):
+        return [False] * len(self._get_indices(indices))
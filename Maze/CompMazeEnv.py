@@ -1,10 +1,18 @@
 # Discrete allows us to define how many actions can occur in the space
-# Box allows us to record the state of the space
-# Turtle is for drawing each step of the environment
+# Box allows us to record the state of the space, MazeLayers builds it for each observation layout
+# Turtle is for drawing each step of the environment, it is only imported once a window is needed
+import sys
+
 import numpy as np
 from gym import Env
-from gym.spaces import Discrete, Box
-import turtle
+from gym.spaces import Discrete
+
+import EpisodeLog
+import ExplorationTracker
+import MazeLayers
+import MazeRenderer
+import MazeRules
+import StepProfiler
 
 # Define the possible actions of the maze
 BACKWARD = 0
@@ -26,28 +34,45 @@ Team2 = range(2, numOfAgents+1, 2)
 
 
 class MazeEnv(Env):
+    # None runs headless, "human" draws every step in a turtle window, "rgb_array" draws frames offscreen
+    metadata = {'render.modes': ['human', 'rgb_array']}
+
     # Constructor
-    def __init__(self, world):
+    def __init__(self, world, render_mode=None, log=None, copy_obs=False, profile=False,
+                 obs_layout='world', agent_start=None, exploration='shared'):
         self.world_start = world
         # Set number of actions (LEFT, RIGHT, UP, DOWN, TELEPORT OTHER AGENT)
         self.action_space = Discrete(5)
 
-        shape_0 = np.size(self.world_start, 0)
-        shape_1 = np.size(self.world_start, 1)
-        # The observation space of the maze
-        self.observation_space = Box(low=-1,
-                                     high=13,
-                                     shape=(shape_0 + 1, shape_1),
-                                     dtype=np.int16)
         self.reward_range = (-200, 200)
 
         # Initialize the current agent, world, and state of the world
+        self.AGENTS = range(1, numOfAgents + 1)
+        self.rules = MazeRules.MazeRules(self.world_start, numOfAgents)
+        # Walls, traps and goals never change, agents are only ever written to the occupancy plane
+        self.terrain = self.rules.terrain
+        if agent_start is None:
+            self.agent_start = self.rules.agent_start
+        else:
+            self.agent_start = MazeLayers.agentStarts(agent_start, self.terrain, numOfAgents)
+        # The observation space of the maze
+        self.obs_layout = obs_layout
+        self.observation_space = MazeLayers.observationSpace(self.terrain.shape, obs_layout, numOfAgents)
         self.current_agent = 1
-        self.world = np.copy(self.world_start)
+        # The observation is allocated once and the planes of its layout are views into it,
+        # so moving an agent updates the observation in place
+        self.observation, self.world, self.occupancy = MazeLayers.allocate(self.terrain, obs_layout)
+        self.agent_index = MazeLayers.AGENT_INDEX[obs_layout]
+        # Return a copy of the observation for callers that keep observations around
+        self.copy_obs = copy_obs
+        self.agent_pos = [None] * (numOfAgents + 1)
+        self._resetAgents()
         self.state = 'P'
         self.current_step = 0
         self.max_step = 50
-        self.exploration_prize = None
+        # Cells visited this episode, once for everyone, per team or per agent, with the plane of each agent
+        self.exploration_groups, groups = ExplorationTracker.agentGroups(exploration, numOfAgents)
+        self.exploration_prize = ExplorationTracker.ExplorationTracker(*self.terrain.shape, groups)
         #Separate Team rewards
         self.team1Reward = 0
         self.team2Reward = 0
@@ -55,10 +80,42 @@ class MazeEnv(Env):
         self.current_episode = 0
         self.success_episode = []
 
-        # Initialize the Visualization window and turtle drawing it
+        # The turtle window is only opened the first time the maze is drawn
+        if render_mode is not None and render_mode not in self.metadata['render.modes']:
+            raise ValueError(f"Unsupported render_mode: {render_mode}")
+        self.render_mode = render_mode
+        self.window = None
+        self.pen = None
+        # Last world drawn in the window and the stamp of each agent drawn on it
+        self.drawn_world = None
+        self.agent_stamps = {}
+        self.bgcolor = "light blue"
+
+        # Colours of each cell value for offscreen frames
+        colours = {WALL: "white", TRAP: "red", GOAL: "green"}
+        colours.update({agent: "red" for agent in Team1})
+        colours.update({agent: "blue" for agent in Team2})
+        # The tile atlas is only built the first time a frame is drawn
+        self.cell_colours = colours
+        self.atlas = None
+        self.agent_colours = {agent: colours[agent] for agent in self.AGENTS}
+
+        # Episode log, nothing is written unless a logger is given
+        self.log = log if log is not None else EpisodeLog.NO_LOG
+
+        # Random stream of the environment and its action space, seeded by seed() or reset(seed=...)
+        self.seed()
+
+        # Timers for the phases of step() and reset(), only installed while profiling is on
+        self.profiler = StepProfiler.StepProfiler(self)
+        if profile:
+            self.profiler.enable()
+
+    # Initialize the Visualization window and turtle drawing it
+    def _initWindow(self):
+        import turtle
         # Maze Window
         self.window = turtle.Screen()
-        self.bgcolor = "light blue"
         self.window.bgcolor(self.bgcolor)
         self.window.title("Multi Agent Maze")
         self.window.setup(800, 650)
@@ -69,39 +126,47 @@ class MazeEnv(Env):
         self.pen.speed(0)
 
     # Draw the maze on the turtle screen
+    # Walls, traps and the goal are drawn once per episode, after that only the cells that changed are redrawn
     def drawMaze(self, maze):
+        if self.window is None:
+            self._initWindow()
+        if self.drawn_world is None:
+            self._drawTerrain()
+            self.drawn_world = np.array(self.rules.terrain)
+
+        rows, cols = np.nonzero(maze != self.drawn_world)
+        for y, x in zip(rows.tolist(), cols.tolist()):
+            # Remove the agent that was drawn here before
+            stamp = self.agent_stamps.pop((y, x), None)
+            if stamp is not None:
+                self.pen.clearstamp(stamp)
+
+            value = int(maze[y, x])
+            if value in self.agent_colours:
+                self.pen.shape("turtle")
+                self.pen.color(self.agent_colours[value])
+                self.pen.goto(-288 + (x * 25), 288 - (y * 25))
+                self.agent_stamps[(y, x)] = self.pen.stamp()
+        self.drawn_world[:] = maze
+        self.window.update()
+
+    # Draw the walls, traps and goal, which don't change during an episode
+    def _drawTerrain(self):
+        terrain = self.rules.terrain
         # Define x and y coordinates
-        for y in range(np.size(maze, 0)):
-            for x in range(np.size(maze, 1)):
-                # Get the character from the x and y value
-                value = maze[y, x]
+        for y in range(np.size(terrain, 0)):
+            for x in range(np.size(terrain, 1)):
+                value = terrain[y, x]
                 # Get screen coordinates
                 screen_x = -288 + (x * 25)
                 screen_y = 288 - (y * 25)
 
-                # If there is an empty space (0)
                 if value == WALL:
                     self.pen.shape("square")
                     self.pen.color("white")
                     self.pen.goto(screen_x, screen_y)
                     self.pen.stamp()
 
-                if value == SPACE:
-                    self.pen.shape("square")
-                    self.pen.color(self.bgcolor)
-                    self.pen.goto(screen_x, screen_y)
-                    self.pen.stamp()
-
-                if value in Team1:
-                    self.pen.shape("turtle")
-                    self.pen.color("red")
-                    self.pen.goto(screen_x, screen_y)
-                    self.pen.stamp()
-                if value in Team2:
-                    self.pen.shape("turtle")
-                    self.pen.color("blue")
-                    self.pen.goto(screen_x, screen_y)
-                    self.pen.stamp()
                 if value == TRAP:
                     self.pen.shape("circle")
                     self.pen.color("red")
@@ -118,184 +183,12 @@ class MazeEnv(Env):
                         self.pen.right(144)
                     self.pen.end_fill()
                     self.pen.penup()
-        self.window.update()
-
-    # Function to teleport agents
-    def teleportAgent(self, current_agent):
-        pass
 
     # Function to move the current agent about the maze
+    # Where each action leads is looked up in the compiled rules, only other agents are checked here
     def moveAgent(self, action):
         # Current position[0] = x, current_pos[1] = y
-        current_pos = np.where(self.world == self.current_agent)
-
-        # If the agent goes backward
-        if action == BACKWARD:
-            new_pos = (current_pos[0] - 1, current_pos[1])
-            # Making sure the agent does not go out of bounds so newpos[0] must be > 0
-
-            # If the other agent is in the next position, don't move
-            if new_pos[0] > SPACE and int(self.world[new_pos]) in Team1:
-                new_pos = (current_pos[0], current_pos[1])
-
-            if new_pos[0] > SPACE and int(self.world[new_pos]) in Team2:
-                new_pos = (current_pos[0], current_pos[1])
-
-            # If the agent hits a wall, don't move
-            if new_pos[0] > SPACE and int(self.world[new_pos]) == WALL:
-                new_pos = (current_pos[0], current_pos[1])
-
-            # If the agent hits a wall, don't move
-            if new_pos[0] < 1:
-                new_pos = (current_pos[0], current_pos[1])
-
-            # If the space is not a trap (0), move to it and set the previous spot to 0
-            if new_pos[0] >= SPACE and int(self.world[new_pos]) == SPACE:
-                self.world[new_pos] = self.current_agent
-                self.world[current_pos] = SPACE
-                # Reward Exploration
-                self._exploration_prize(new_pos)
-            # If the space is a trap (3), end the game
-            if new_pos[0] >= SPACE and int(self.world[new_pos]) == TRAP:
-                self.world[new_pos] = self.current_agent
-                self.world[current_pos] = SPACE
-                self.state = 'Failed'
-                # Reward Exploration
-                self._exploration_prize(new_pos)
-
-            if new_pos[0] >= SPACE and int(self.world[new_pos]) in Team1:
-                self.world[new_pos] = self.current_agent
-            if new_pos[0] >= SPACE and int(self.world[new_pos]) in Team2:
-                self.world[new_pos] = self.current_agent
-
-            # If the agent reaches the goal
-            elif new_pos[0] >= SPACE and (int(self.world[new_pos]) == GOAL):
-                self.world[new_pos] = self.current_agent
-                self.world[current_pos] = SPACE
-                self.state = 'Succeeded'
-                self._exploration_prize(new_pos)
-
-        # If the agent goes right
-        if action == RIGHT:
-            new_pos = (current_pos[0], current_pos[1] + 1)
-            print(f"New X: {new_pos[0]}, New Y:{new_pos[1]}")
-            limit = np.size(self.world, 1)
-
-            # Making sure the agent does not go out of bounds so newpos[0] must be < max width of maze
-
-            # If the other agent is in the next position, don't move
-            if new_pos[1] < limit and int(self.world[new_pos]) in Team1:
-                pass
-            if new_pos[1] < limit and int(self.world[new_pos]) in Team2:
-                pass
-
-            # If there is a wall, the agent does not move
-            if new_pos[1] < limit and int(self.world[new_pos]) == WALL:
-                pass
-
-            # If the space is not a trap (0), move to it and set the previous spot to 0
-            if new_pos[1] < limit and int(self.world[new_pos]) == SPACE:
-                self.world[new_pos] = self.current_agent
-                self.world[current_pos] = SPACE
-                # Reward Exploration
-                self._exploration_prize(new_pos)
-
-            # If the space is a trap (3), end the game
-            if new_pos[1] < limit and int(self.world[new_pos]) == TRAP:
-                self.world[new_pos] = self.current_agent
-                self.world[current_pos] = SPACE
-                self.state = 'Failed'
-                # Reward Exploration
-                self._exploration_prize(new_pos)
-
-
-            # If the agent reaches the goal(5) End the game
-            elif new_pos[1] < limit and (int(self.world[new_pos]) == GOAL):
-                self.world[new_pos] = self.current_agent
-                self.world[current_pos] = SPACE
-                self.state = 'Succeeded'
-                # Reward Exploration
-                self._exploration_prize(new_pos)
-
-        # If the agent goes forward
-        if action == FORWARD:
-            new_pos = (current_pos[0] + 1, current_pos[1])
-            limit = np.size(self.world, 0) - 1
-
-            # Making sure the agent does not go out of bounds so newpos[0] must be > 0
-
-            # If the other agent is in the next position, don't move
-            if new_pos[0] < limit and int(self.world[new_pos]) in Team1:
-                pass
-            if new_pos[0] < limit and int(self.world[new_pos]) in Team2:
-                pass
-
-            # If there is a wall then the agent does not move
-            if (new_pos[0] < limit and int(self.world[new_pos]) == WALL) or new_pos[0] == limit:
-                pass
-
-            # If the space is not a trap (0), move to it and set the previous spot to 0
-            if new_pos[0] < limit and int(self.world[new_pos]) == SPACE:
-                self.world[new_pos] = self.current_agent
-                self.world[current_pos] = SPACE
-                # Reward Exploration
-                self._exploration_prize(new_pos)
-
-            # If the space is a trap (3), end the game
-            if new_pos[0] < limit and int(self.world[new_pos]) == TRAP:
-                self.world[new_pos] = self.current_agent
-                self.world[current_pos] = SPACE
-                self.state = 'Failed'
-                # Reward Exploration
-                self._exploration_prize(new_pos)
-
-
-            # If the agent reaches the goal End the game
-            elif new_pos[0] < limit and (int(self.world[new_pos]) == GOAL):
-                self.world[new_pos] = self.current_agent
-                self.world[current_pos] = SPACE
-                self.state = 'Succeeded'
-                # Reward Exploration
-                self._exploration_prize(new_pos)
-
-        # If the agent goes left
-        if action == LEFT:
-            new_pos = (current_pos[0], current_pos[1] - 1)
-
-            # Making sure the agent does not go out of bounds so newpos[0] must be > 0
-
-            # If the other agent is in the next position, don't move
-            if new_pos[1] >= SPACE and int(self.world[new_pos]) in Team1:
-                pass
-            if new_pos[1] >= SPACE and int(self.world[new_pos]) in Team2:
-                pass
-
-            # If there is a wall, then the agent does not move
-            if new_pos[1] >= SPACE and int(self.world[new_pos]) == WALL:
-                pass
-
-            # If the space is not a trap (0), move to it and set the previous spot to 0
-            if new_pos[1] >= SPACE and int(self.world[new_pos]) == SPACE:
-                self.world[new_pos] = self.current_agent
-                self.world[current_pos] = SPACE
-                # Reward Exploration
-                self._exploration_prize(new_pos)
-            # If the space is a trap (3), end the game
-            if new_pos[1] >= SPACE and int(self.world[new_pos]) == TRAP:
-                self.world[new_pos] = self.current_agent
-                self.world[current_pos] = SPACE
-                self.state = 'Failed'
-                # Reward Exploration
-                self._exploration_prize(new_pos)
-
-
-            # If the agent reaches the goal
-            elif new_pos[1] >= SPACE and (int(self.world[new_pos]) == GOAL):
-                self.world[new_pos] = self.current_agent
-                self.world[current_pos] = SPACE
-                self.state = 'Succeeded'
-                # Reward Exploration
-                self._exploration_prize(new_pos)
+        current_pos = self.agent_pos[self.current_agent]
 
         # Teleport the other agent
         if action == TELEPORT:
@@ -306,35 +199,84 @@ class MazeEnv(Env):
                     other_agent = 1
                 else:
                     other_agent = 2
+            self.teleportAgent(other_agent)
+            return
+
+        # Agents that are not on the map cannot move
+        if current_pos is None:
+            return
+
+        row, col = current_pos
+        outcome = self.rules.outcome.item(row, col, action)
+        row_step, col_step = MazeRules.MOVES[action]
+        new_pos = (row + row_step, col + col_step)
+        # Walls, the edge of the maze and other agents block the move
+        if outcome == MazeRules.BLOCKED or self.occupancy[new_pos]:
+            return
+        self._placeAgent(self.current_agent, new_pos)
+        # Stepping on a trap ends the game, and so does reaching the goal
+        self.state = MazeRules.OUTCOME_STATES[outcome]
+        # Reward Exploration
+        self._exploration_prize(new_pos)
 
-            other_player_pos = np.where(self.world == other_agent)
-            other_next_pos = (other_player_pos[0] + 3, other_player_pos[1])
-            # Set the next position of the other agent
-
-            # If the other agent is still within top
-            if other_next_pos[0] < np.size(self.world, 0) - 2:
-                pass
-
-            else:
-                # The other agent moves out of bounds, so needs to be in bounds
-                increment = 1
-                while other_next_pos[0] >= np.size(self.world, 0) - 2 and increment <= 3:
-                    other_next_pos = (other_player_pos[0] - increment, other_player_pos[1])
-                    increment += 1
-
-            # Check if the other agent teleports into a trap or the goal
-            # Otherwise the maze is still playable
-            if self.world[other_next_pos] == TRAP:
-                self.state = 'Failed'
-            elif self.world[other_next_pos] == GOAL:
-                self.state = 'Succeeded'
-            else:
-                self.state = 'P'
-
-            self.world[other_next_pos] = other_agent
-            self.world[other_player_pos] = SPACE
-            # Reward Exploration
-            self._exploration_prize(other_next_pos)
+    # Function to teleport agents
+    # The agent jumps three rows ahead, or back when that is too close to the edge, onto whatever is there
+    def teleportAgent(self, agent):
+        agent_pos = self.agent_pos[agent]
+        # If the other agent is not on the map, there is nothing to teleport
+        if agent_pos is None:
+            self.state = 'P'
+            return
+        new_pos = (self.rules.jump_rows[agent_pos[0]], agent_pos[1])
+
+        # Check if the other agent teleports into a trap or the goal
+        # Otherwise the maze is still playable
+        value = int(self.world[new_pos])
+        if value == TRAP:
+            self.state = 'Failed'
+        elif value == GOAL:
+            self.state = 'Succeeded'
+        else:
+            self.state = 'P'
+
+        self._placeAgent(agent, new_pos)
+        # Reward Exploration
+        self._exploration_prize(new_pos)
+
+    # Take the agents off their cells, leaving the terrain under them, and put them back on their starting cells
+    # Only the cells of the agents are touched, so this costs the same however big the map is
+    def _resetAgents(self):
+        for pos in self.agent_pos:
+            if pos is not None:
+                self.occupancy[pos] = 0
+                self.world[pos] = self.terrain[pos]
+        for agent, pos in enumerate(self.agent_start):
+            if pos is not None:
+                self.occupancy[pos] = agent
+                self.world[pos] = agent
+        self.agent_pos[:] = self.agent_start
+
+    # Move an agent to a new cell, keeping the occupancy plane, the world and the position table in sync
+    def _placeAgent(self, agent, new_pos):
+        old_pos = self.agent_pos[agent]
+        if new_pos == old_pos:
+            return
+        # An agent that was on the new cell is no longer on the map
+        displaced = int(self.occupancy[new_pos])
+        if displaced:
+            self.agent_pos[displaced] = None
+        self.occupancy[new_pos] = agent
+        self.world[new_pos] = agent
+        # The cell the agent leaves shows its terrain again
+        self.occupancy[old_pos] = 0
+        self.world[old_pos] = self.terrain[old_pos]
+        self.agent_pos[agent] = new_pos
+
+    # Draw the maze into an RGB array without opening a window
+    def renderFrame(self):
+        if self.atlas is None:
+            self.atlas = MazeRenderer.makeAtlas(self.cell_colours, self.bgcolor)
+        return MazeRenderer.drawFrame(self.world, self.atlas)
 
     # Function to perform each action per timestep
     def step(self, action):
@@ -345,16 +287,21 @@ class MazeEnv(Env):
         -Increase number of steps taken
         -Print the world with the updated agent location
         '''
-        print(f"Step {self.current_step}")
+        tracing = self.log.tracing
+        if tracing:
+            self.log.write(f"Step {self.current_step}\n")
         self.moveAgent(action)
         self.current_step += 1
-        print(self.world)
-        self.drawMaze(self.world)
-        print()
+        if tracing:
+            # The world is copied here and formatted by the writer thread
+            self.log.write(self.world.copy(), '\n\n')
+        if self.render_mode == "human":
+            self.drawMaze(self.world)
 
         # Reward Assignment
         if self.state == "Succeeded":
-            print(f'Agent {self.current_agent} found the exit')
+            if tracing:
+                self.log.write(f'Agent {self.current_agent} found the exit', '\n')
             if self.current_agent in Team1:
                 self.team1Reward = 100 * (1 + 1 / self.current_step)
                 self.team2Reward = -200
@@ -363,7 +310,8 @@ class MazeEnv(Env):
                 self.team1Reward = -200
             done = True
         elif self.state == 'Failed':
-            print(f'Agent {self.current_agent} fell into a trap')
+            if tracing:
+                self.log.write(f'Agent {self.current_agent} fell into a trap', '\n')
             if self.current_agent in Team1:
                 self.team1Reward = -200
                 self.team2Reward = 100 * (1 + 1 / self.current_step)
@@ -378,7 +326,8 @@ class MazeEnv(Env):
 
         # Have new episodes be created
         if self.current_step >= self.max_step:
-            print(f'New episode number {self.current_episode + 1}')
+            if tracing:
+                self.log.write(f'New episode number {self.current_episode + 1}', '\n')
             done = True
 
         #Apply Agent rewards for this step, then set it to 0
@@ -397,9 +346,10 @@ class MazeEnv(Env):
         if done:
             self.render(self.state)
             self.current_episode += 1
-            self.window.title(f"Multi Agent Maze --- Episode{self.current_episode + 1}")
+            if self.window is not None:
+                self.window.title(f"Multi Agent Maze --- Episode{self.current_episode + 1}")
 
-        obs = self.createObservation()
+        obs = self.createObservation(done)
 
         return obs, self.team1Reward, self.team2Reward, done, {'state': self.state}
 
@@ -409,27 +359,50 @@ class MazeEnv(Env):
         self.success_episode.append(
             'Success' if state == 'Succeeded' else 'Failure')
 
-        file = open('trial/render.txt', 'a')
-        file.write('----------------------------\n')
-        file.write(f'Episode number {self.current_episode}\n')
-        file.write(
-            f'{self.success_episode[-1]} in {self.current_step} steps\n')
-        file.close()
+        if self.log.enabled:
+            self.log.write('----------------------------\n',
+                           f'Episode number {self.current_episode}\n',
+                           f'{self.success_episode[-1]} in {self.current_step} steps\n')
+
+    # Seed the random stream of the environment and of its action space
+    def seed(self, seed=None):
+        self.np_random = np.random.default_rng(seed)
+        self.action_space.seed(seed)
+        return [seed]
+
+    # Turn the phase timers on or off, the stats collected so far are kept
+    def set_profiling(self, enabled):
+        if enabled:
+            self.profiler.enable()
+        else:
+            self.profiler.disable()
+
+    # Calls, total time and latency histogram of each phase of step() and reset() since the last clear
+    def get_perf_stats(self):
+        return self.profiler.summary()
+
+    def clear_perf_stats(self):
+        self.profiler.clear()
 
     # Function that resets the environment
-    def reset(self):
-        self.pen.clear()
+    def reset(self, seed=None):
+        # A seed restarts the random streams, otherwise they carry on from the last episode
+        if seed is not None:
+            self.seed(seed)
+        if self.pen is not None:
+            # Clearing the pen removes every stamp, the terrain is drawn again on the next frame
+            self.pen.clear()
+            self.drawn_world = None
+            self.agent_stamps = {}
         self.current_agent = 1
         # P means the game is playable, W means somenone wins, L someone lose
         self.state = 'P'
         self.current_step = 0
         self.max_step = 50
-        self.world = np.copy(self.world_start)
+        self._resetAgents()
+        self.log.startEpisode(self.current_episode)
 
-        self.exploration_prize = np.ones(
-            shape=(np.size(self.world, 0),
-                   np.size(self.world, 1))
-        )
+        self.exploration_prize.clear()
 
         self.t1bonus_reward = 0
         self.t2bonus_reward = 0
@@ -437,24 +410,22 @@ class MazeEnv(Env):
         return self.createObservation()
 
     # Create observations for further analysis
-    def createObservation(self):
-        observation = self.world
-
-        # Numpy.size(array, axis value)
-        data_to_add = [0] * np.size(self.world, 1)
-        data_to_add[0] = self.current_agent
-
-        observation = np.append(observation, [data_to_add], axis=0)
-
-        return observation
+    # Only the current agent cell changes, the returned array is overwritten by the next step
+    # The terminal observation is always a copy, since reset() writes the next episode into the same buffer
+    # and vector envs keep it as the terminal_observation
+    def createObservation(self, done=False):
+        self.observation[self.agent_index] = self.current_agent
+        if self.copy_obs or done:
+            return self.observation.copy()
+        return self.observation
 
     def _exploration_prize(self, next_pos):
         """
         Incentive mechanism for exploration.
         :param next_pos (int):
         """
-        if self.exploration_prize[next_pos] == 1:
-            self.exploration_prize[next_pos] = 0
+        # The cell is credited to the agent taking the action, in its own plane when agents are tracked apart
+        if self.exploration_prize.visit(self.exploration_groups[self.current_agent], next_pos):
             if self.current_agent in Team1:
                 self.t1bonus_reward += 1
             else:
@@ -462,180 +433,17 @@ class MazeEnv(Env):
 
 
 if __name__ == "__main__":
-    # Practice Map
-    world = np.array([[-1, -1, -1, -1, -1, -1, -1, -1, -1],
-                      [-1, 1, 0, 3, 0, 2, 0, 4, -1],
-                      [-1, 0, 0, 12, 0, 0, 0, 0, -1],
-                      [-1, 0, 0, 0, 0, 0, 0, 0, -1],
-                      [-1, 0, 0, 12, 12, 0, 0, 0, -1],
-                      [-1, 0, 12, 0, 13, 0, 12, 0, -1],
-                      [-1, -1, -1, 13, -1, -1, -1, -1, -1]])
-
-    worldA = np.array([[-1, -1, -1, -1, -1, -1, -1, -1, -1],
-                      [-1, 1, 0, 3, 0, 2, 0, 4, -1],
-                      [-1, 0, 0, 0, 0, 0, 0, 0, -1],
-                      [-1, 0, 0, 0, 0, 0, 0, 0, -1],
-                      [-1, 0, 0, 0, 0, 0, 0, 0, -1],
-                      [-1, 0, 0, 0, 13, 0, 0, 0, -1],
-                      [-1, -1, -1, 13, -1, -1, -1, -1, -1]])
-
-    # CSGO Dusk 2
-    World2 = [
-        "BBB******************BBBBBB"
-        "B*BBBBBBBBBBBBBBBBBBB*****B",
-        "B***********************3*B",
-        "B**BBBBBBBB***BBBBBBB*BBB*x",
-        "B*B*******B***B*****B*B*B*x",
-        "B*BBBBBBBBB***BBBBBBB*B*B*x",
-        "B*********************B*B*x",
-        "BB*BBBB*******BBBBBBBBBB**x",
-        "B***BBB******B*******B****x",
-        "X*****Bxxxxx*BBBBBBBBB*B**x",
-        "X***********5**********BBBB",
-        "Xxxxxxxxxxxx5xxxxxxxxxxxxxx"
-    ]
-    # 10x25, can change to 20x20
-    world2 = np.array(
-        [
-            [-1, -1, -1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, -1, -1, -1, -1, -1, -1],
-            [-1, 0, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, 0, 0, 0, 0, 0, -1],
-            [-1, 1, 0, 2, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 11, 0, -1],
-            [-1, 0, 0, -1, -1, -1, -1, -1, -1, -1, -1, 0, 0, 0, -1, -1, -1, -1, -1, -1, -1, 0, -1, -1, -1, 0, -1],
-            [-1, 0, -1, 0, 0, 0, 0, 0, 0, 0, -1, 0, 0, 0, -1, 0, 0, 0, 0, 0, -1, 0, -1, 0, -1, 0, -1],
-            [-1, 0, -1, -1, -1, -1, -1, -1, -1, -1, -1, 0, 0, 0, -1, -1, -1, -1, -1, -1, -1, 0, -1, 0, -1, 0, -1],
-            [-1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, -1, 0, -1, 0, -1],
-            [-1, -1, 0, -1, -1, -1, -1, 0, 0, 0, 0, 0, 0, 0, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, 0, 0, -1],
-            [-1, 0, 0, 0, -1, -1, -1, 0, 0, 0, 0, 0, 0, -1, 0, 0, 0, 0, 0, 0, 0, -1, 0, 0, 0, 0, -1],
-            [-1, 0, 0, 0, 0, 0, -1, -1, -1, -1, -1, -1, 0, -1, -1, -1, -1, -1, -1, -1, -1, -1, 0, -1, 0, 0, -1],
-            [-1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 13, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, -1, -1, -1, -1],
-            [-1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1]
-        ]
-    )
-    # COD 4 Modern Warfare KillingHouse
-    World3 = [
-        "XXXXXXXXXXX",
-        "X000000000X",
-        "XXX000000XX",
-        "X0000XX000X",
-        "X000XXXX00X",
-        "XX000000X0X",
-        "X0330000X0X",
-        "X0033000X0X",
-        "X000000000X",
-        "XXX00XXX00X",
-        "X000000000X",
-        "XXXXXXXXXXX"
-    ]
-    # KillingHouse 10x10
-    world3 = np.array([
-        [-1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1],
-        [-1, 1, 0, 2, 0, 0, 0, 0, 0, 0, 0, -1],
-        [-1, -1, -1, 0, 0, 0, 0, 0, 0, 0, -1, -1],
-        [-1, 0, 0, 0, 0, -1, -1, 0, 0, 0, 0, -1],
-        [-1, 0, 0, 0, -1, -1, -1, -1, 0, 0, 0, -1],
-        [-1, -1, 0, 0, 0, 0, 0, 0, 0, -1, 0, -1],
-        [-1, 0, 12, 12, 0, 0, 0, 0, 0, -1, 0, -1],
-        [-1, 0, 0, 12, 12, 0, 0, 0, 0, -1, 0, -1],
-        [-1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, -1],
-        [-1, -1, -1, 0, 0, 0, -1, -1, -1, 0, 0, -1],
-        [-1, 0, 0, 0, 0, 0, 13, 0, 0, 0, 0, -1],
-        [-1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1]
-    ])
-
-    # Halo 3 SandTrap (15x15)
-    World4 = [
-        "XXXXXXXXXXXXXXXX",
-        "X---XXXXXXX----X",
-        "X-X-X-X-X-X--X-X",
-        "X-----X-X------X",
-        "X--------------X",
-        "X-X-XXX-X----X-X",
-        "X-X-X-X-X------X",
-        "X-X-X-X-X------X",
-        "X-X-X-X-X------X",
-        "X-X-XXX-X------X",
-        "X-X-----X----X-X",
-        "X-X-XXX-X------X",
-        "X--------------X",
-        "X--------------X",
-        "X-----X--X-----X",
-        "XXXXXXXXXXXXXXXX"
-    ]
-
-    world4 = np.array([
-        [-1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1],
-        [-1, 0, 1, 0, -1, -1, -1, -1, -1, -1, -1, 0, 2, 0, 0, -1],
-        [-1, 0, -1, 0, -1, 0, -1, 0, -1, 0, -1, 0, 0, -1, 0, -1],
-        [-1, 0, 0, 0, 0, 0, -1, 0, -1, 0, 0, 0, 0, 0, 0, -1],
-        [-1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, -1],
-        [-1, 0, -1, 0, -1, -1, -1, 0, -1, 0, 0, 0, 0, -1, 0, -1],
-        [-1, 0, -1, 0, -1, 0, -1, 0, -1, 0, 0, 0, 0, 0, 0, -1],
-        [-1, 0, -1, 0, -1, 0, -1, 0, -1, 0, 0, 12, 0, 0, 0, -1],
-        [-1, 0, -1, 0, -1, 0, -1, 0, -1, 0, 0, 0, 0, 0, 0, -1],
-        [-1, 0, -1, 0, -1, -1, -1, 0, -1, 0, 0, 0, 0, 0, 0, -1],
-        [-1, 0, -1, 0, 0, 0, 12, 0, -1, 0, 0, 0, 0, -1, 0, -1],
-        [-1, 0, -1, 0, -1, -1, -1, 0, -1, 0, 0, 0, 0, 0, 0, -1],
-        [-1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, -1],
-        [-1, 0, 0, 0, 0, 0, -1, 0, 0, -1, 0, 0, 0, 0, 0, -1],
-        [-1, 0, 0, 0, 0, 0, 0, 13, 0, 0, 0, 0, 0, 0, 0, -1],
-        [-1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1]
-    ])
-    # Battlefield 4  Golmund Railway (20x20)
-    World5 = [
-        "000XXXXXXXXXX000000000",
-
-        "00X000000000X0000000000",
-        "00X00000000000X0000000",
-        "00X000000000000X000000",
-        "00X0000000000000X00000",
-        "00X00000000000000X0000",
-        "00X000000000000000X000",
-        "00X0000000000000000X00",
-        "00X00000000000000000X0",
-        "00X00000000000000000X0",
-        "0X000000000000000000X0",
-        "0X000000000000000000X0",
-        "X00000000000000000000X",
-        "X00000000000000000000X",
-        "0X000000000000000000X0",
-        "0X00000000000000000X00",
-        "00X000000000000000X000",
-        "000X000000000000XX0000",
-        "00000X000000000X000000",
-        "0000000X000000X0000000",
-
-        "00000000XXXXXX00000000"
-    ]
-    world5 = np.array(
-        [
-            [0, 0, 0, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, 0, 0, 0, 0, 0, 0, 0, 0, 0],
-            [0, 0, -1, 1, 0, 2, 0, 0, 0, 0, 0, 0, 0, -1, 0, 0, 0, 0, 0, 0, 0, 0],
-            [0, 0, -1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, -1, 0, 0, 0, 0, 0, 0, 0],
-            [0, 0, -1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, -1, 0, 0, 0, 0, 0, 0],
-            [0, 0, -1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, -1, 0, 0, 0, 0, 0],
-            [0, 0, -1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, -1, 0, 0, 0, 0],
-            [0, 0, -1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, -1, 0, 0, 0],
-            [0, 0, -1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, -1, 0, 0],
-            [0, 0, -1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, -1, 0],
-            [0, 0, -1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, -1, 0],
-            [0, -1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, -1, 0],
-            [0, -1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, -1, 0],
-            [-1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, -1],
-            [-1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, -1],
-            [0, -1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, -1, 0],
-            [0, -1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, -1, 0, 0],
-            [0, 0, -1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, -1, 0, 0, 0],
-            [0, 0, 0, -1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, -1, -1, 0, 0, 0, 0],
-            [0, 0, 0, 0, -1, -1, 0, 0, 0, 0, 0, 0, 0, 0, 0, -1, 0, 0, 0, 0, 0, 0],
-            [0, 0, 0, 0, 0, 0, -1, -1, 0, 0, 13, 0, 0, 0, -1, 0, 0, 0, 0, 0, 0, 0],
-            [0, 0, 0, 0, 0, 0, 0, 0, -1, -1, 13, -1, -1, -1, 0, 0, 0, 0, 0, 0, 0, 0]
-        ])
+    import MazeMaps
+    worldA = MazeMaps.getMap('worldA')
     # Create the new environment
-    env = MazeEnv(worldA)
+    log = EpisodeLog.EpisodeLogger(stream=sys.stdout, level=EpisodeLog.LOG_STEPS)
+    env = MazeEnv(worldA, render_mode="human", log=log)
     numTotalEpisodes = 3
 
+    # Only the first episode is seeded, the others carry on from the same random stream
+    seed = 0
     while env.current_episode < numTotalEpisodes:
-        state = env.reset()
+        state = env.reset(seed=seed if env.current_episode == 0 else None)
         done = False
         score1 = 0
         score2 = 0
@@ -645,4 +453,5 @@ if __name__ == "__main__":
             observation, team1Reward, team2Reward, done, n_state = env.step(action)
             score1 += team1Reward
             score2 += team2Reward
+        log.flush()
         print(f"Episode:{env.current_episode} \n Team 1 Score:{score1} \n Team 2 Score:{score2}")
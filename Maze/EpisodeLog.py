@@ -0,0 +1,122 @@
+# Buffered episode log for the maze environments
+# Log entries are queued in memory and written by a background thread, so a step never
+# waits on the file and never formats the world itself
+import atexit
+import queue
+import threading
+
+import numpy as np
+
+# Verbosity levels
+LOG_OFF = 0
+# One summary per episode
+LOG_EPISODES = 1
+# Every step of the traced episodes, including the world after each move
+LOG_STEPS = 2
+
+# Seconds a blocked write or flush waits before checking whether the writer thread has failed
+POLL_SECONDS = 0.1
+
+
+# Write the world as rows of right aligned cell values
+def formatWorld(world):
+    width = max(len(str(world.min())), len(str(world.max())))
+    return '\n'.join(' '.join(str(value).rjust(width) for value in row) for row in world.tolist())
+
+
+class EpisodeLogger:
+    # Constructor
+    def __init__(self, path='trial/render.txt', level=LOG_EPISODES, trace_every=1, buffer_size=10000, stream=None):
+        '''
+
+        :param path: File the log is appended to
+        :param level: LOG_OFF, LOG_EPISODES or LOG_STEPS
+        :param trace_every: At LOG_STEPS, trace one of every trace_every episodes
+        :param buffer_size: Entries held in memory before logging blocks the environment
+        :param stream: Write to this stream (e.g. sys.stdout) instead of the file
+        '''
+        self.path = path
+        self.stream = stream
+        self.level = level
+        self.trace_every = trace_every
+        # The environments check these before building any log entry
+        self.enabled = level > LOG_OFF
+        self.tracing = False
+
+        self._queue = None
+        self._thread = None
+        self._error = None
+        if self.enabled:
+            self._queue = queue.Queue(maxsize=buffer_size)
+            self._thread = threading.Thread(target=self._writeLoop, daemon=True)
+            self._thread.start()
+            atexit.register(self.close)
+
+    # Decide whether the episode that is starting is traced step by step
+    def startEpisode(self, episode):
+        self.tracing = self.level >= LOG_STEPS and episode % self.trace_every == 0
+
+    # Queue an entry made of strings and world arrays, which are formatted by the writer thread
+    def write(self, *parts):
+        self._put(parts)
+
+    # Block until everything queued so far has been written
+    def flush(self):
+        if self._thread is not None:
+            with self._queue.all_tasks_done:
+                while self._queue.unfinished_tasks:
+                    self._raiseError()
+                    self._queue.all_tasks_done.wait(POLL_SECONDS)
+
+    # Write the remaining entries and stop the writer thread
+    # Raises the error that stopped the writer thread, if there was one
+    def close(self):
+        if self._thread is not None:
+            thread, self._thread = self._thread, None
+            self.enabled = False
+            self.tracing = False
+            self._put(None)
+            thread.join()
+            self._raiseError()
+
+    # A full queue is only waited on while the writer thread is still working through it
+    def _put(self, item):
+        while True:
+            self._raiseError()
+            try:
+                self._queue.put(item, timeout=POLL_SECONDS)
+                return
+            except queue.Full:
+                pass
+
+    def _raiseError(self):
+        if self._error is not None:
+            raise RuntimeError("The episode log writer failed") from self._error
+
+    def _writeLoop(self):
+        try:
+            file = self.stream if self.stream is not None else open(self.path, 'a')
+            try:
+                while True:
+                    parts = self._queue.get()
+                    if parts is None:
+                        break
+                    for part in parts:
+                        file.write(formatWorld(part) if isinstance(part, np.ndarray) else part)
+                    # Only flush once the buffer has been drained
+                    if self._queue.empty():
+                        file.flush()
+                    self._queue.task_done()
+            finally:
+                if self.stream is None:
+                    file.close()
+                else:
+                    file.flush()
+            self._queue.task_done()
+        except Exception as error:
+            # Raised on the stepping thread by its next write, flush or close
+            self._error = error
+
+
+# Logger used by environments that were not given one
+NO_LOG = EpisodeLogger(level=LOG_OFF)
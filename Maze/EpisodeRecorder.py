@@ -0,0 +1,192 @@
+# Records MazeEnv episodes into GIF or MP4 videos
+# The stepping thread only queues a copy of the world, a background thread draws each frame offscreen
+# and encodes it straight away, so memory stays flat however long the episode and stepping never
+# waits on the encoder
+import atexit
+import os
+import queue
+import threading
+
+import gym
+
+import MazeRenderer
+
+# Which episodes are kept
+# 'every' keeps every Kth episode, 'failures' keeps the episodes that did not reach the goal,
+# 'best' keeps the highest scoring episode so far
+POLICIES = ['every', 'failures', 'best']
+FORMATS = ['gif', 'mp4']
+
+# Seconds a blocked put or flush waits before checking whether the encoder thread has failed
+POLL_SECONDS = 0.1
+
+
+# Writes an animated GIF frame by frame instead of holding the whole episode in memory
+class GifWriter:
+    # Constructor
+    def __init__(self, path, fps):
+        self.file = open(path, 'wb')
+        self.duration = int(1000 / fps)
+        self.palette = None
+
+    def append_data(self, frame):
+        from PIL import Image, GifImagePlugin
+        # The first frame shows every kind of cell, so its palette is shared by the rest of the episode
+        if self.palette is None:
+            self.palette = Image.fromarray(frame).quantize(colors=256)
+            header, _ = GifImagePlugin.getheader(self.palette, info={'loop': 0, 'duration': self.duration})
+            for block in header:
+                self.file.write(block)
+        image = Image.fromarray(frame).quantize(palette=self.palette, dither=0)
+        for block in GifImagePlugin.getdata(image, duration=self.duration, disposal=1):
+            self.file.write(block)
+
+    def close(self):
+        # GIF trailer
+        self.file.write(b';')
+        self.file.close()
+
+
+class EpisodeRecorder(gym.Wrapper):
+    # Constructor
+    def __init__(self, env, directory='trial/videos', policy='every', every=1, video_format='gif', fps=4,
+                 buffer_size=10000):
+        '''
+
+        :param env: MazeEnv to record, frames are drawn with its cell colours like renderFrame()
+        :param directory: Folder the videos are written to
+        :param policy: 'every', 'failures' or 'best'
+        :param every: With the 'every' policy, record one of every K episodes
+        :param video_format: 'gif', or 'mp4' which needs imageio's ffmpeg plugin
+        :param fps: Steps shown per second of video
+        :param buffer_size: Worlds held in memory before recording blocks the environment
+        '''
+        super().__init__(env)
+        if policy not in POLICIES:
+            raise ValueError(f"Unsupported policy: {policy}")
+        if video_format not in FORMATS:
+            raise ValueError(f"Unsupported video_format: {video_format}")
+        self.directory = directory
+        self.policy = policy
+        self.every = every
+        self.video_format = video_format
+        self.fps = fps
+        self.atlas = MazeRenderer.makeAtlas(self.env.cell_colours, self.env.bgcolor)
+        os.makedirs(directory, exist_ok=True)
+
+        self.episode = -1
+        self.recording = False
+        self.path = None
+        self.score = 0
+        self.best_score = None
+
+        self._error = None
+        self._queue = queue.Queue(maxsize=buffer_size)
+        self._thread = threading.Thread(target=self._encodeLoop, daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def reset(self, **kwargs):
+        if self.recording:
+            self._finishEpisode(complete=False, succeeded=False)
+        observation = self.env.reset(**kwargs)
+        self.episode += 1
+        self.score = 0
+
+        # Failures and the best score are only known at the end, so those policies record every episode
+        self.recording = self.policy != 'every' or self.episode % self.every == 0
+        if self.recording:
+            self.path = os.path.join(self.directory, f'episode_{self.episode}.partial.{self.video_format}')
+            self._put(('open', self.path))
+            self._put(('world', self.env.world.copy()))
+        return observation
+
+    def step(self, action):
+        observation, reward, done, info = self.env.step(action)
+        if self.recording:
+            self.score += reward
+            self._put(('world', self.env.world.copy()))
+            if done:
+                self._finishEpisode(complete=True, succeeded=info.get('state') == 'Succeeded')
+        return observation, reward, done, info
+
+    # Decide whether the episode is kept and hand the video over to the encoder to finish
+    def _finishEpisode(self, complete, succeeded):
+        final_path = None
+        if self.policy == 'every':
+            final_path = os.path.join(self.directory, f'episode_{self.episode}.{self.video_format}')
+        elif self.policy == 'failures' and complete and not succeeded:
+            final_path = os.path.join(self.directory, f'episode_{self.episode}.{self.video_format}')
+        elif self.policy == 'best' and complete and (self.best_score is None or self.score > self.best_score):
+            self.best_score = self.score
+            final_path = os.path.join(self.directory, f'best.{self.video_format}')
+        self.recording = False
+        self._put(('close', self.path, final_path))
+
+    # Block until every queued world has been encoded
+    def flush(self):
+        if self._thread is not None:
+            with self._queue.all_tasks_done:
+                while self._queue.unfinished_tasks:
+                    self._raiseError()
+                    self._queue.all_tasks_done.wait(POLL_SECONDS)
+
+    # Finish the current video and stop the encoder thread
+    # Raises the error that stopped the encoder thread, if there was one
+    def close(self):
+        try:
+            if self._thread is not None:
+                thread, self._thread = self._thread, None
+                if self.recording:
+                    self._finishEpisode(complete=False, succeeded=False)
+                self._put(None)
+                thread.join()
+                self._raiseError()
+        finally:
+            super().close()
+
+    # A full queue is only waited on while the encoder thread is still working through it
+    def _put(self, message):
+        while True:
+            self._raiseError()
+            try:
+                self._queue.put(message, timeout=POLL_SECONDS)
+                return
+            except queue.Full:
+                pass
+
+    def _raiseError(self):
+        if self._error is not None:
+            raise RuntimeError("The episode video encoder failed") from self._error
+
+    def _openWriter(self, path):
+        if self.video_format == 'gif':
+            return GifWriter(path, self.fps)
+        import imageio
+        return imageio.get_writer(path, fps=self.fps)
+
+    def _encodeLoop(self):
+        writer = None
+        try:
+            while True:
+                message = self._queue.get()
+                if message is None:
+                    self._queue.task_done()
+                    break
+                if message[0] == 'open':
+                    writer = self._openWriter(message[1])
+                elif message[0] == 'world':
+                    writer.append_data(MazeRenderer.drawFrame(message[1], self.atlas))
+                else:
+                    _, path, final_path = message
+                    writer.close()
+                    writer = None
+                    # Videos of episodes that are not kept are thrown away
+                    if final_path is None:
+                        os.remove(path)
+                    else:
+                        os.replace(path, final_path)
+                self._queue.task_done()
+        except Exception as error:
+            # Raised on the stepping thread by its next put, flush or close
+            self._error = error
@@ -0,0 +1,134 @@
+# Cells visited during an episode, for the exploration prize
+# Every cell is one bit, so the visited set of a 2000x2000 map is 500KB instead of the 32MB of a float64 plane.
+# The bits are kept for the whole life of the env and cleared in place at reset, so nothing is allocated per
+# episode. Visits can be tracked once for everyone, per team or per agent, each in its own plane of bits.
+# BatchedExplorationTracker only packs the bits of big batches, small ones keep a cheaper bool plane
+import numpy as np
+
+EXPLORATION_MODES = ['shared', 'team', 'agent']
+# Mask of each bit of a byte
+BITS = np.array([1 << bit for bit in range(8)], dtype=np.uint8)
+# Batches whose visited sets fit in this many bytes at one byte per cell keep a bool plane, as a visit is then
+# one lookup and one store. Bigger batches pack eight cells per byte, which costs a few more ops per visit
+BOOL_PLANE_BYTES = 64 << 20
+
+
+# Plane of each agent id for a tracking mode, and the number of planes
+# Teams are the odd and the even agents, like the teams of the competitive environments
+def agentGroups(mode, numAgents):
+    if mode == 'shared':
+        return [0] * (numAgents + 1), 1
+    if mode == 'team':
+        return [0] + [(agent + 1) % 2 for agent in range(1, numAgents + 1)], 2
+    if mode == 'agent':
+        return [0] + [agent - 1 for agent in range(1, numAgents + 1)], numAgents
+    raise ValueError(f"Unsupported exploration mode: {mode}")
+
+
+class ExplorationTracker:
+    # Constructor
+    def __init__(self, height, width, groups=1):
+        '''
+
+        :param height: Rows of the map
+        :param width: Columns of the map
+        :param groups: Number of planes of visits kept, one for each team or agent that is tracked
+        '''
+        self.height = height
+        self.width = width
+        self.groups = groups
+        # Bytes of one plane, cell (row, col) is bit (row * width + col)
+        self.stride = (height * width + 7) // 8
+        # A bytearray is much faster to index one cell at a time than a NumPy array
+        self.bits = bytearray(groups * self.stride)
+        self._planes = np.frombuffer(self.bits, dtype=np.uint8).reshape(groups, self.stride)
+        self._flat = self._planes.reshape(-1)
+
+    # Mark a cell as visited by a group, returns 1 if it had not been visited before, 0 otherwise
+    def visit(self, group, pos):
+        cell = pos[0] * self.width + pos[1]
+        index = group * self.stride + (cell >> 3)
+        bit = 1 << (cell & 7)
+        byte = self.bits[index]
+        if byte & bit:
+            return 0
+        self.bits[index] = byte | bit
+        return 1
+
+    # Mark many distinct cells at once, returns which of them had not been visited before by their group
+    def visitMany(self, groups, rows, cols):
+        cells = rows * self.width + cols
+        index = groups * self.stride + (cells >> 3)
+        bit = BITS[cells & 7]
+        new = (self._flat[index] & bit) == 0
+        # Cells next to each other can share a byte, so their bits are added one by one
+        np.bitwise_or.at(self._flat, index, bit)
+        return new
+
+    # Forget every visit, in place
+    def clear(self):
+        self._planes.fill(0)
+
+    # Visited cells of a group as a (height, width) bool array
+    def visited(self, group=0):
+        cells = np.unpackbits(self._planes[group], count=self.height * self.width, bitorder='little')
+        return cells.reshape(self.height, self.width).astype(bool)
+
+
+# Visited cells of a batch of envs, for vectorized envs that step every env at once
+class BatchedExplorationTracker:
+    # Constructor
+    def __init__(self, num_envs, height, width, groups=1, packed=None):
+        '''
+
+        :param num_envs: Number of envs
+        :param height: Rows of the map
+        :param width: Columns of the map
+        :param groups: Number of planes of visits kept in each env
+        :param packed: Keep one bit per cell instead of one byte, by default only when the bool planes would take
+                       more than BOOL_PLANE_BYTES
+        '''
+        self.height = height
+        self.width = width
+        self.groups = groups
+        if packed is None:
+            packed = num_envs * groups * height * width > BOOL_PLANE_BYTES
+        self.packed = packed
+        if packed:
+            # Bits of each row are packed on their own, with the byte and the bit of every cell worked out once
+            self.row_bytes = (width + 7) // 8
+            self.planes = np.zeros((num_envs, groups, height, self.row_bytes), dtype=np.uint8)
+            cols = np.arange(width)
+            self._cell_bytes = (np.arange(height)[:, None] * self.row_bytes + (cols >> 3)).reshape(-1)
+            self._cell_bits = np.tile(BITS[cols & 7], height)
+        else:
+            self.planes = np.zeros((num_envs, groups, height, width), dtype=bool)
+        # Cells are looked up in a flat view, one index per env instead of four
+        self._flat = self.planes.reshape(-1)
+        self._plane_size = self.planes[0, 0].size
+
+    # Mark one cell (row * width + col) of each of the given envs as visited, returns which of them had not been
+    # visited before. An env can only appear once in a call
+    def visit(self, envs, groups, cells):
+        planes = (envs * self.groups + groups) * self._plane_size
+        if not self.packed:
+            index = planes + cells
+            new = ~self._flat[index]
+            self._flat[index] = True
+            return new
+        index = planes + self._cell_bytes[cells]
+        bit = self._cell_bits[cells]
+        byte = self._flat[index]
+        self._flat[index] = byte | bit
+        return (byte & bit) == 0
+
+    # Forget every visit of the given envs, in place
+    def clear(self, envs):
+        self.planes[envs] = 0
+
+    # Visited cells of a group in every env as a (num_envs, height, width) bool array
+    def visited(self, group=0):
+        if not self.packed:
+            return self.planes[:, group].copy()
+        cells = np.unpackbits(self.planes[:, group], axis=-1, count=self.width, bitorder='little')
+        return cells.astype(bool)
@@ -1,10 +1,17 @@
 # Discrete allows us to define how many actions can occur in the space
-# Box allows us to record the state of the space
-# Turtle is for drawing each step of the environment
+# Box allows us to record the state of the space, MazeLayers builds it for each observation layout
+# Turtle is for drawing each step of the environment, it is only imported once a window is needed
 import numpy as np
 from gym import Env
-from gym.spaces import Discrete, Box
-import turtle
+from gym.spaces import Discrete, MultiDiscrete
+
+import EpisodeLog
+import ExplorationTracker
+import MazeLayers
+import MazeRenderer
+import MazeRules
+import StateIndex
+import StepProfiler
 
 # Define the possible actions of the maze
 BACKWARD = 0
@@ -14,6 +21,9 @@ LEFT = 3
 # Teleport other agent
 TELEPORT = 4
 
+# How each action is described in the step trace
+ACTION_NAMES = {LEFT: 'left', RIGHT: 'right', BACKWARD: 'backward', FORWARD: 'forward'}
+
 # Define the possible maze values for visualization
 WALL = -1
 SPACE = 0
@@ -23,38 +33,115 @@ GOAL = 13
 
 
 class MazeEnv(Env):
+    # None runs headless, "human" draws every step in a turtle window, "rgb_array" draws frames offscreen
+    metadata = {'render.modes': ['human', 'rgb_array']}
+
     # Constructor
-    def __init__(self, world, numOfAgents):
+    def __init__(self, world, numOfAgents, render_mode=None, log=None, copy_obs=False, profile=False,
+                 obs_layout='world', agent_start=None, exploration='shared', simultaneous=False,
+                 state_index=None):
         self.world_start = world
         # Set number of actions (LEFT, RIGHT, UP, DOWN, TELEPORT OTHER AGENT)
         self.action_space = Discrete(5)
 
-        shape_0 = np.size(self.world_start, 0)
-        shape_1 = np.size(self.world_start, 1)
-        # The observation space of the maze
-        self.observation_space = Box(low=-1,
-                                     high=13,
-                                     shape=(shape_0 + 1, shape_1),
-                                     dtype=np.int16)
         self.reward_range = (-200, 200)
 
         # Initialize the current agent, world, and state of the world
         self.numAgents = numOfAgents
         self.AGENTS = range(1, self.numAgents + 1)
+        self.rules = MazeRules.MazeRules(self.world_start, self.numAgents)
+        # Walls, traps and goals never change, agents are only ever written to the occupancy plane
+        self.terrain = self.rules.terrain
+        if agent_start is None:
+            self.agent_start = self.rules.agent_start
+        else:
+            self.agent_start = MazeLayers.agentStarts(agent_start, self.terrain, self.numAgents)
+        # Every agent acts in every step when simultaneous, taking an action each and getting a reward
+        # and an observation each, otherwise the agents take turns
+        self.simultaneous = simultaneous
+        if simultaneous:
+            self.action_space = MultiDiscrete([5] * self.numAgents)
+        # The observation space of the maze
+        self.obs_layout = obs_layout
+        self.observation_space = MazeLayers.observationSpace(self.terrain.shape, obs_layout, self.numAgents,
+                                                             perAgent=simultaneous)
         self.current_agent = 1
-        self.world = np.copy(self.world_start)
+        # The observation is allocated once and the planes of its layout are views into it,
+        # so moving an agent updates the observation in place
+        self.observation, self.world, self.occupancy = MazeLayers.allocate(self.terrain, obs_layout)
+        self.agent_index = MazeLayers.AGENT_INDEX[obs_layout]
+        # Return a copy of the observation for callers that keep observations around
+        self.copy_obs = copy_obs
+        self.agent_pos = [None] * (self.numAgents + 1)
+        if simultaneous:
+            # Observation of each agent, kept up to date by copying the cells that change
+            self.observations = MazeLayers.allocateAgents(self.terrain, obs_layout, self.numAgents)
+            # Cell of every agent as arrays, (-1, -1) for agents that are not on the map
+            self.positions = np.full((self.numAgents + 1, 2), -1, dtype=np.int64)
+            self.start_positions = self.positions.copy()
+            for agent, pos in enumerate(self.agent_start):
+                if pos is not None:
+                    self.start_positions[agent] = pos
+            self.agent_ids = np.arange(self.numAgents + 1)
+        # Key of the current configuration for tabular learners, 'zobrist' or 'dense', see StateIndex
+        if state_index is not None and simultaneous:
+            raise ValueError("state_index needs the agents to take turns")
+        self.state_index = None if state_index is None else StateIndex.makeIndex(state_index, self.terrain,
+                                                                                  self.numAgents)
+        self._resetAgents()
         self.state = 'P'
         self.current_step = 0
         self.max_step = 60
-        self.exploration_prize = None
+        self.exploration = exploration
+        # Cells visited this episode, once for everyone, per team or per agent, with the plane of each agent
+        self.exploration_groups, groups = ExplorationTracker.agentGroups(exploration, self.numAgents)
+        self.exploration_prize = ExplorationTracker.ExplorationTracker(*self.terrain.shape, groups)
+        if simultaneous:
+            # Looked up for every agent at once
+            self.exploration_groups = np.array(self.exploration_groups)
         self.bonus_reward = 0
         self.current_episode = 0
         self.success_episode = []
 
-        # Initialize the Visualization window and turtle drawing it
+        # The turtle window is only opened the first time the maze is drawn
+        if render_mode is not None and render_mode not in self.metadata['render.modes']:
+            raise ValueError(f"Unsupported render_mode: {render_mode}")
+        self.render_mode = render_mode
+        self.window = None
+        self.pen = None
+        # Last world drawn in the window and the stamp of each agent drawn on it
+        self.drawn_world = None
+        self.agent_stamps = {}
+        self.bgcolor = "light blue"
+
+        # Colours of each cell value for offscreen frames
+        colours = {WALL: "white", TRAP: "red", GOAL: "green"}
+        colours.update({agent: "blue" for agent in self.AGENTS})
+        # The tile atlas is only built the first time a frame is drawn
+        self.cell_colours = colours
+        self.atlas = None
+        self.agent_colours = {agent: colours[agent] for agent in self.AGENTS}
+
+        # Episode log, nothing is written unless a logger is given
+        self.log = log if log is not None else EpisodeLog.NO_LOG
+
+        # Random stream of the environment and its action space, seeded by seed() or reset(seed=...)
+        self.seed()
+
+        # Timers for the phases of step() and reset(), only installed while profiling is on
+        self.profiler = StepProfiler.StepProfiler(self)
+        if profile:
+            self.profiler.enable()
+
+    # Get current Episode number
+    def getEpisodeNumber(self):
+        return self.current_episode
+
+    # Initialize the Visualization window and turtle drawing it
+    def _initWindow(self):
+        import turtle
         # Maze Window
         self.window = turtle.Screen()
-        self.bgcolor = "light blue"
         self.window.bgcolor(self.bgcolor)
         self.window.title("Multi Agent Maze")
         self.window.setup(800, 650)
@@ -64,39 +151,48 @@ class MazeEnv(Env):
         self.pen.penup()
         self.pen.speed(0)
 
-    # Get current Episode number
-    def getEpisodeNumber(self):
-        return self.current_episode
-
     # Draw the maze on the turtle screen
+    # Walls, traps and the goal are drawn once per episode, after that only the cells that changed are redrawn
     def drawMaze(self, maze):
+        if self.window is None:
+            self._initWindow()
+        if self.drawn_world is None:
+            self._drawTerrain()
+            self.drawn_world = np.array(self.rules.terrain)
+
+        rows, cols = np.nonzero(maze != self.drawn_world)
+        for y, x in zip(rows.tolist(), cols.tolist()):
+            # Remove the agent that was drawn here before
+            stamp = self.agent_stamps.pop((y, x), None)
+            if stamp is not None:
+                self.pen.clearstamp(stamp)
+
+            value = int(maze[y, x])
+            if value in self.agent_colours:
+                self.pen.shape("turtle")
+                self.pen.color(self.agent_colours[value])
+                self.pen.goto(-288 + (x * 25), 288 - (y * 25))
+                self.agent_stamps[(y, x)] = self.pen.stamp()
+        self.drawn_world[:] = maze
+        self.window.update()
+
+    # Draw the walls, traps and goal, which don't change during an episode
+    def _drawTerrain(self):
+        terrain = self.rules.terrain
         # Define x and y coordinates
-        for y in range(np.size(maze, 0)):
-            for x in range(np.size(maze, 1)):
-                # Get the character from the x and y value
-                value = maze[y, x]
+        for y in range(np.size(terrain, 0)):
+            for x in range(np.size(terrain, 1)):
+                value = terrain[y, x]
                 # Get screen coordinates
                 screen_x = -288 + (x * 25)
                 screen_y = 288 - (y * 25)
 
-                # If there is an empty space (0)
                 if value == WALL:
                     self.pen.shape("square")
                     self.pen.color("white")
                     self.pen.goto(screen_x, screen_y)
                     self.pen.stamp()
 
-                if value == SPACE:
-                    self.pen.shape("square")
-                    self.pen.color(self.bgcolor)
-                    self.pen.goto(screen_x, screen_y)
-                    self.pen.stamp()
-
-                if value in self.AGENTS:
-                    self.pen.shape("turtle")
-                    self.pen.color("blue")
-                    self.pen.goto(screen_x, screen_y)
-                    self.pen.stamp()
                 if value == TRAP:
                     self.pen.shape("circle")
                     self.pen.color("red")
@@ -113,235 +209,249 @@ class MazeEnv(Env):
                         self.pen.right(144)
                     self.pen.end_fill()
                     self.pen.penup()
-        self.window.update()
-
-    # Function to teleport agents
-    def teleportAgent(self, current_agent):
-        pass
 
     # Function to move the current agent about the maze
+    # Where each action leads is looked up in the compiled rules, only other agents are checked here
     def moveAgent(self, action):
         # Current position[0] = x, current_pos[1] = y
-        current_pos = np.where(self.world == self.current_agent)
-
-        # If the agent goes backward
-        if action == BACKWARD:
-            new_pos = (current_pos[0] - 1, current_pos[1])
-            # Making sure the agent does not go out of bounds so newpos[0] must be > 0
-
-            # If the other agent is in the next position, don't move
-            if new_pos[0] > SPACE and int(self.world[new_pos]) in self.AGENTS:
-                new_pos = (current_pos[0], current_pos[1])
-
-            # If the agent hits a wall, don't move
-            if new_pos[0] > SPACE and int(self.world[new_pos]) == WALL:
-                new_pos = (current_pos[0], current_pos[1])
-
-            # If the agent hits a wall, don't move
-            if new_pos[0] < 1:
-                new_pos = (current_pos[0], current_pos[1])
-
-            # If the space is not a trap (0), move to it and set the previous spot to 0
-            if new_pos[0] >= SPACE and int(self.world[new_pos]) == SPACE:
-                self.world[new_pos] = self.current_agent
-                self.world[current_pos] = SPACE
-                # Reward Exploration
-                self._exploration_prize(new_pos)
-            # If the space is a trap (3), end the game
-            if new_pos[0] >= SPACE and int(self.world[new_pos]) == TRAP:
-                self.world[new_pos] = self.current_agent
-                self.world[current_pos] = SPACE
-                self.state = 'Failed'
-                # Reward Exploration
-                self._exploration_prize(new_pos)
-            if new_pos[0] >= SPACE and int(self.world[new_pos]) in self.AGENTS:
-                self.world[new_pos] = self.current_agent
-
-            # If the agent reaches the goal
-            elif new_pos[0] >= SPACE and (int(self.world[new_pos]) == GOAL):
-                self.world[new_pos] = self.current_agent
-                self.world[current_pos] = SPACE
-                self.state = 'Succeeded'
-                self._exploration_prize(new_pos)
-
-        # If the agent goes right
-        if action == RIGHT:
-            new_pos = (current_pos[0], current_pos[1] + 1)
-            limit = np.size(self.world, 1)
-
-            # Making sure the agent does not go out of bounds so newpos[0] must be < max width of maze
-
-            # If the other agent is in the next position, don't move
-            if new_pos[1] < limit and int(self.world[new_pos[0], new_pos[1]]) in self.AGENTS:
-                pass
-
-            # If there is a wall, the agent does not move
-            if new_pos[1] < limit and int(self.world[new_pos[0], new_pos[1]]) == WALL:
-                pass
-
-            # If the space is not a trap (0), move to it and set the previous spot to 0
-            if new_pos[1] < limit and int(self.world[new_pos[0], new_pos[1]]) == SPACE:
-                self.world[new_pos] = self.current_agent
-                self.world[current_pos] = SPACE
-                # Reward Exploration
-                self._exploration_prize(new_pos)
-
-            # If the space is a trap (3), end the game
-            if new_pos[1] < limit and int(self.world[new_pos[0], new_pos[1]]) == TRAP:
-                self.world[new_pos] = self.current_agent
-                self.world[current_pos] = SPACE
-                self.state = 'Failed'
-                # Reward Exploration
-                self._exploration_prize(new_pos)
-
-
-            # If the agent reaches the goal(5) End the game
-            elif new_pos[1] < limit and int(self.world[new_pos[0], new_pos[1]]) == GOAL:
-                self.world[new_pos] = self.current_agent
-                self.world[current_pos] = SPACE
-                self.state = 'Succeeded'
-                # Reward Exploration
-                self._exploration_prize(new_pos)
-
-        # If the agent goes forward
-        if action == FORWARD:
-            new_pos = (current_pos[0] + 1, current_pos[1])
-            limit = np.size(self.world, 0) - 1
-
-            # Making sure the agent does not go out of bounds so newpos[0] must be > 0
-
-            # If the other agent is in the next position, don't move
-            if new_pos[0] < limit and int(self.world[new_pos[0], new_pos[1]]) in self.AGENTS:
-                pass
-
-            # If there is a wall then the agent does not move
-            if (new_pos[0] < limit and int(self.world[new_pos[0], new_pos[1]]) == WALL) or new_pos[0] == limit:
-                pass
-
-            # If the space is not a trap (0), move to it and set the previous spot to 0
-            if new_pos[0] < limit and int(self.world[new_pos[0], new_pos[1]]) == SPACE:
-                self.world[new_pos] = self.current_agent
-                self.world[current_pos] = SPACE
-                # Reward Exploration
-                self._exploration_prize(new_pos)
-
-            # If the space is a trap (3), end the game
-            if new_pos[0] < limit and int(self.world[new_pos[0], new_pos[1]]) == TRAP:
-                self.world[new_pos] = self.current_agent
-                self.world[current_pos] = SPACE
-                self.state = 'Failed'
-                # Reward Exploration
-                self._exploration_prize(new_pos)
-
-
-            # If the agent reaches the goal End the game
-            elif new_pos[0] < limit and int(self.world[new_pos[0], new_pos[1]]) == GOAL:
-                self.world[new_pos] = self.current_agent
-                self.world[current_pos] = SPACE
-                self.state = 'Succeeded'
-                # Reward Exploration
-                self._exploration_prize(new_pos)
-
-        # If the agent goes left
-        if action == LEFT:
-            new_pos = (current_pos[0], current_pos[1] - 1)
-
-            # Making sure the agent does not go out of bounds so newpos[0] must be > 0
-
-            # If the other agent is in the next position, don't move
-            if new_pos[1] >= SPACE and int(self.world[new_pos[0], new_pos[1]]) in self.AGENTS:
-                pass
-
-            # If there is a wall, then the agent does not move
-            if new_pos[1] >= SPACE and int(self.world[new_pos[0], new_pos[1]]) == WALL:
-                pass
-
-            # If the space is not a trap (0), move to it and set the previous spot to 0
-            if new_pos[1] >= SPACE and int(self.world[new_pos[0], new_pos[1]]) == SPACE:
-                self.world[new_pos] = self.current_agent
-                self.world[current_pos] = SPACE
-                # Reward Exploration
-                self._exploration_prize(new_pos)
-            # If the space is a trap (3), end the game
-            if new_pos[1] >= SPACE and int(self.world[new_pos[0], new_pos[1]]) == TRAP:
-                self.world[new_pos] = self.current_agent
-                self.world[current_pos] = SPACE
-                self.state = 'Failed'
-                # Reward Exploration
-                self._exploration_prize(new_pos)
-
-
-            # If the agent reaches the goal
-            elif new_pos[1] >= SPACE and (int(self.world[new_pos[0], new_pos[1]]) == GOAL):
-                self.world[new_pos] = self.current_agent
-                self.world[current_pos] = SPACE
-                self.state = 'Succeeded'
-                # Reward Exploration
-                self._exploration_prize(new_pos)
+        current_pos = self.agent_pos[self.current_agent]
 
         # Teleport the other agent
         if action == TELEPORT:
             # keep current position of current agent, move the other agent
-
             other_agent = (self.current_agent + 1) % (self.numAgents + 1)
             if other_agent == 0:
                 other_agent = 1
-            file = open("trial/render.txt", 'a')
-            file.write(f"Agent {self.current_agent} is teleporting Agent {other_agent} forward      ")
-            file.close()
-
-            other_agent_pos = np.where(self.world == other_agent)
-            other_next_pos = (other_agent_pos[0] + 3, other_agent_pos[1])
-            #print(f"Other agent Original [X]= {other_agent_pos[0]} [Y]= {other_agent_pos[1]}")
-            posChanged = False
-            # If the agent is at the edge, don't teleport
-
-            if other_agent_pos[0] == np.size(self.world, 0) - 2:
-                self.state = 'P'
-                return
-
-            # If agent destination is in bounds, proceed to check where it lands
-            else:
-                increment = 1
-
+            if self.log.tracing:
+                self.log.write(f"Agent {self.current_agent} is teleporting Agent {other_agent} forward      ")
+            self.teleportAgent(other_agent)
+            return
+
+        # Agents that are not on the map cannot move
+        if current_pos is None:
+            return
+
+        row, col = current_pos
+        outcome = self.rules.outcome.item(row, col, action)
+        row_step, col_step = MazeRules.MOVES[action]
+        new_pos = (row + row_step, col + col_step)
+        # Walls, the edge of the maze and other agents block the move
+        if outcome == MazeRules.BLOCKED or self.occupancy[new_pos]:
+            return
+        self._placeAgent(self.current_agent, new_pos)
+        # Stepping on a trap ends the game, and so does reaching the goal
+        self.state = MazeRules.OUTCOME_STATES[outcome]
+        # Reward Exploration
+        self._exploration_prize(new_pos)
 
-                # Make sure the agent teleports to a reasonable destination
-                while increment < 4:
-                    if other_next_pos[0] > np.size(self.world, 0) - 2:
-                        other_next_pos = (other_next_pos[0] - 1, other_next_pos[1])
-                        increment += 1
-                        posChanged = True
-
-                    elif self.world[other_next_pos] in self.AGENTS:
-                        other_next_pos = (other_next_pos[0] - 1, other_next_pos[1])
-                        increment += 1
-                        posChanged = True
-
-                    elif self.world[other_next_pos] == WALL:
-                        other_next_pos = (other_next_pos[0] - 1, other_next_pos[1])
-                        increment += 1
-                        posChanged = True
-
-                    else:
-                        increment += 1
-                    #print("Position change [0] = ", other_next_pos[0])
+    # Function to teleport agents
+    # The agent lands on the furthest of the next three rows that is not a wall or another agent.
+    # When that is the row three ahead the agent stays where it is, only the trap, the goal and the
+    # exploration prize of that cell count, as the maze has always played
+    def teleportAgent(self, agent):
+        agent_pos = self.agent_pos[agent]
+        # If the agent is not on the map or is at the edge, don't teleport
+        if agent_pos is None or not self.rules.can_teleport.item(agent_pos):
+            self.state = 'P'
+            return
+
+        outcome, new_pos = MazeRules.MOVE, agent_pos
+        col = agent_pos[1]
+        for new_row in self.rules.teleport_rows[agent_pos].tolist():
+            if new_row >= 0 and not self.occupancy[new_row, col]:
+                outcome, new_pos = self.rules.teleport_outcome.item(new_row, col), (new_row, col)
+                break
+
+        # Check if the agent teleports into a trap or the goal
+        # Otherwise the maze is still playable
+        self.state = MazeRules.OUTCOME_STATES[outcome]
+        if new_pos[0] != agent_pos[0] + MazeRules.TELEPORT_DISTANCE:
+            self._placeAgent(agent, new_pos)
+        # Reward Exploration
+        self._exploration_prize(new_pos)
+
+    # Take the agents off their cells, leaving the terrain under them, and put them back on their starting cells
+    # Only the cells of the agents are touched, so this costs the same however big the map is
+    def _resetAgents(self):
+        if self.simultaneous:
+            self._resetPositions()
+            return
+        for pos in self.agent_pos:
+            if pos is not None:
+                self.occupancy[pos] = 0
+                self.world[pos] = self.terrain[pos]
+        for agent, pos in enumerate(self.agent_start):
+            if pos is not None:
+                self.occupancy[pos] = agent
+                self.world[pos] = agent
+        self.agent_pos[:] = self.agent_start
+        if self.state_index is not None:
+            self.state_index.reset(self.agent_pos, self.current_agent)
+
+    # Move an agent to a new cell, keeping the occupancy plane, the world and the position table in sync
+    def _placeAgent(self, agent, new_pos):
+        old_pos = self.agent_pos[agent]
+        if new_pos == old_pos:
+            return
+        # An agent that was on the new cell is no longer on the map
+        displaced = int(self.occupancy[new_pos])
+        if displaced:
+            self.agent_pos[displaced] = None
+            if self.state_index is not None:
+                self.state_index.move(displaced, new_pos, None)
+        self.occupancy[new_pos] = agent
+        self.world[new_pos] = agent
+        # The cell the agent leaves shows its terrain again
+        self.occupancy[old_pos] = 0
+        self.world[old_pos] = self.terrain[old_pos]
+        self.agent_pos[agent] = new_pos
+        if self.state_index is not None:
+            self.state_index.move(agent, old_pos, new_pos)
+
+    # Same as _resetAgents for the position arrays of simultaneous mode
+    def _resetPositions(self):
+        old_rows, old_cols = self._moveAgentCells(self.agent_ids, self.start_positions)
+        self._copyCells([old_rows, self.start_positions[1:, 0]], [old_cols, self.start_positions[1:, 1]])
+
+    # Move the given agents to new cells, or off the map where the row is -1, returns the cells they left
+    def _moveAgentCells(self, agents, new_positions):
+        old = self.positions[agents]
+        left = old[:, 0] >= 0
+        old_rows, old_cols = old[left, 0], old[left, 1]
+        self.occupancy[old_rows, old_cols] = 0
+        self.world[old_rows, old_cols] = self.terrain[old_rows, old_cols]
+        self.positions[agents] = new_positions
+        placed = new_positions[:, 0] >= 0
+        new_rows, new_cols = new_positions[placed, 0], new_positions[placed, 1]
+        self.occupancy[new_rows, new_cols] = agents[placed]
+        self.world[new_rows, new_cols] = agents[placed]
+        return old_rows, old_cols
+
+    # Copy the cells that changed into the observation of every agent
+    def _copyCells(self, rows, cols):
+        rows = np.concatenate(rows)
+        cols = np.concatenate(cols)
+        rows, cols = rows[rows >= 0], cols[rows >= 0]
+        MazeLayers.copyCells(self.observations, self.obs_layout, self.world, self.occupancy, rows, cols)
+
+    # Keep the observations of simultaneous mode in the given array, so the envs of a batch can share one block
+    def useObservations(self, observations):
+        observations[:] = self.observations
+        self.observations = observations
+
+    # Move every agent taking a movement action in one pass
+    # Agents can only move into cells that were empty at the start of the step, and when several agents
+    # go for the same cell the lowest numbered one gets it. Returns the agents that moved, their outcomes and
+    # the cells they left
+    def moveAll(self, actions):
+        rows, cols = self.positions[1:, 0], self.positions[1:, 1]
+        movers = np.flatnonzero((rows >= 0) & (actions < TELEPORT))
+        rows, cols, actions = rows[movers], cols[movers], actions[movers]
+        outcome = self.rules.outcome[rows, cols, actions]
+        target = np.stack(self.rules.moveTargets(rows, cols, actions, outcome), axis=1)
+        free = (outcome != MazeRules.BLOCKED) & (self.occupancy[target[:, 0], target[:, 1]] == 0)
+        movers, outcome, target = movers[free], outcome[free], target[free]
+        # Movers are in agent order, so the first one to claim each cell is the lowest numbered
+        _, first = np.unique(target[:, 0] * self.terrain.shape[1] + target[:, 1], return_index=True)
+        movers, outcome, target = movers[first] + 1, outcome[first], target[first]
+        old_rows, old_cols = self._moveAgentCells(movers, target)
+        return movers, outcome, target, old_rows, old_cols
+
+    # Teleport the next agent of every agent taking the TELEPORT action forward, after the moves
+    # Each agent lands on the furthest of its candidate rows that is empty, a row claimed by several agents
+    # goes to the lowest numbered one and the others try their next row. Like teleportAgent, an agent that
+    # reaches the row three ahead stays where it is and only the cell it reached counts.
+    # Returns the agents taking the action, the outcomes of the teleports and the cells they left and reached
+    def teleportAll(self, actions):
+        actors = np.flatnonzero(actions == TELEPORT) + 1
+        others = actors % self.numAgents + 1
+        pos = self.positions[others]
+        keep = pos[:, 0] >= 0
+        keep[keep] = self.rules.can_teleport[pos[keep, 0], pos[keep, 1]]
+        actors, others, pos = actors[keep], others[keep], pos[keep]
+        # Widened from the compact table, so flat cell numbers don't overflow
+        candidates = self.rules.teleport_rows[pos[:, 0], pos[:, 1]].astype(np.int64)
+
+        landed = np.zeros(len(others), dtype=bool)
+        new_rows = pos[:, 0].copy()
+        for rank in range(candidates.shape[1]):
+            rows = candidates[:, rank]
+            trying = np.flatnonzero(~landed & (rows >= 0))
+            trying = trying[self.occupancy[rows[trying], pos[trying, 1]] == 0]
+            if len(trying) == 0:
+                continue
+            # Teleported agents are in agent order of the actors, so ties go to the lowest numbered actor
+            _, first = np.unique(rows[trying] * self.terrain.shape[1] + pos[trying, 1], return_index=True)
+            winners = trying[first]
+            new_rows[winners] = rows[winners]
+            landed[winners] = True
+            if rank:
+                self._moveAgentCells(others[winners], np.stack([rows[winners], pos[winners, 1]], axis=1))
+
+        actors, new_rows, pos = actors[landed], new_rows[landed], pos[landed]
+        outcome = self.rules.teleport_outcome[new_rows, pos[:, 1]]
+        return actors, outcome, new_rows, pos
+
+    # One step of simultaneous mode, every agent takes its own action
+    # Moves are resolved first and teleports after them. Reaching a trap or the goal, and every newly visited
+    # cell, count for the agent whose action caused it, like the turn based mode. The episode ends when any
+    # agent reaches a trap or the goal, the goal wins if both happen in the same step
+    def _stepSimultaneous(self, actions):
+        actions = np.asarray(actions, dtype=np.int64).reshape(self.numAgents)
+        tracing = self.log.tracing
+        if tracing:
+            self.log.write(f"Step {self.current_step} \n")
+        movers, move_outcome, target, left_rows, left_cols = self.moveAll(actions)
+        actors, teleport_outcome, landed_rows, teleported = self.teleportAll(actions)
+        self.current_step += 1
+        self._copyCells([left_rows, target[:, 0], teleported[:, 0], landed_rows],
+                        [left_cols, target[:, 1], teleported[:, 1], teleported[:, 1]])
+        if tracing:
+            self.log.write(self.world.copy(), '\n')
+        if self.render_mode == "human":
+            self.drawMaze(self.world)
+
+        # Outcome caused by each agent, and the cells each agent's action took an agent to
+        outcome = np.full(self.numAgents + 1, MazeRules.MOVE, dtype=np.int8)
+        outcome[movers] = move_outcome
+        outcome[actors] = teleport_outcome
+        agents = np.concatenate([movers, actors])
+        visited = self.exploration_prize.visitMany(self.exploration_groups[agents],
+                                                   np.concatenate([target[:, 0], landed_rows]),
+                                                   np.concatenate([target[:, 1], teleported[:, 1]]))
 
-                # If the position changed, check if the other agent teleports into a trap or the goal
-                # Otherwise the maze is still playable
+        # Reward Assignment
+        rewards = np.full(self.numAgents + 1, -2, dtype=np.float32)
+        rewards[outcome == MazeRules.SUCCEED] = 200 * (1 + 1 / self.current_step)
+        rewards[outcome == MazeRules.FAIL] = -200
+        rewards[agents] += visited
+        rewards = rewards[1:]
+        if (outcome == MazeRules.SUCCEED).any():
+            self.state = 'Succeeded'
+        elif (outcome == MazeRules.FAIL).any():
+            self.state = 'Failed'
+        done = self.state != 'P' or self.current_step >= self.max_step
+        if tracing:
+            for agent in np.flatnonzero(outcome == MazeRules.SUCCEED).tolist():
+                self.log.write(f'Agent {agent} found the exit')
+            for agent in np.flatnonzero(outcome == MazeRules.FAIL).tolist():
+                self.log.write(f'Agent {agent} fell into a trap')
+            if self.current_step >= self.max_step:
+                self.log.write(f'Max TimeSteps Reached! Episode {self.current_episode + 1} will start')
 
-                if self.world[other_next_pos] == TRAP:
-                    self.state = 'Failed'
-                elif self.world[other_next_pos] == GOAL:
-                    self.state = 'Succeeded'
-                else:
-                    self.state = 'P'
+        if done:
+            self.render(self.state, float(rewards.sum()))
+            self.current_episode += 1
+            if self.window is not None:
+                self.window.title(f"Multi Agent Maze --- Episode{self.current_episode + 1}")
 
-            # Check if the position changed
-            if posChanged:
-                self.world[other_next_pos] = other_agent
-                self.world[other_agent_pos] = SPACE
+        return self.createObservation(done), rewards, done, {'state': self.state, 'outcomes': outcome[1:]}
 
-            self._exploration_prize(other_next_pos)
+    # Draw the maze into an RGB array without opening a window
+    def renderFrame(self):
+        if self.atlas is None:
+            self.atlas = MazeRenderer.makeAtlas(self.cell_colours, self.bgcolor)
+        return MazeRenderer.drawFrame(self.world, self.atlas)
 
     # Function to perform each action per timestep
     def step(self, action):
@@ -352,34 +462,36 @@ class MazeEnv(Env):
         -Increase number of steps taken
         -Print the world with the updated agent location
         '''
-        file = open('trial/render.txt', 'a')
-        file.write(f"Step {self.current_step} \n")
+        if self.simultaneous:
+            return self._stepSimultaneous(action)
+        tracing = self.log.tracing
+        if tracing:
+            self.log.write(f"Step {self.current_step} \n")
         self.moveAgent(action)
         self.current_step += 1
-        if action == LEFT:
-            file.write(f"Agent {self.current_agent} is going left      ")
-        if action == RIGHT:
-            file.write(f"Agent {self.current_agent} is going right      ")
-        if action == BACKWARD:
-            file.write(f"Agent {self.current_agent} is going backward      ")
-        if action == FORWARD:
-            file.write(f"Agent {self.current_agent} is going forward      ")
-
-        file.write(str(self.world))
-        self.drawMaze(self.world)
-        file.write('\n')
+        if tracing:
+            # The world is copied here and formatted by the writer thread
+            if action in ACTION_NAMES:
+                self.log.write(f"Agent {self.current_agent} is going {ACTION_NAMES[action]}      ",
+                               self.world.copy(), '\n')
+            else:
+                self.log.write(self.world.copy(), '\n')
+        if self.render_mode == "human":
+            self.drawMaze(self.world)
 
         reward = 0
         done = False
 
         # Reward Assignment
         if self.state == "Succeeded":
-            file.write(f'Agent {self.current_agent} found the exit')
+            if tracing:
+                self.log.write(f'Agent {self.current_agent} found the exit')
             # reward = 100 * (1 + 1 / self.current_step)
             reward = 200 * (1 + 1 / self.current_step)
             done = True
         elif self.state == 'Failed':
-            file.write(f'Agent {self.current_agent} fell into a trap')
+            if tracing:
+                self.log.write(f'Agent {self.current_agent} fell into a trap')
             reward = -200
             done = True
         elif self.state == 'P':
@@ -388,14 +500,16 @@ class MazeEnv(Env):
 
         # Have new episodes be created
         if self.current_step >= self.max_step:
-            file.write(f'Max TimeSteps Reached! Episode {self.current_episode + 1} will start')
+            if tracing:
+                self.log.write(f'Max TimeSteps Reached! Episode {self.current_episode + 1} will start')
             done = True
 
-        file.close()
         # Switch the agent turns
         new_agent = (self.current_agent + 1) % (self.numAgents + 1)
         if new_agent == 0:
             new_agent = 1
+        if self.state_index is not None:
+            self.state_index.turn(self.current_agent, new_agent)
         self.current_agent = new_agent
 
         # Apply the bonus reward for this step then reset him to 0
@@ -405,9 +519,10 @@ class MazeEnv(Env):
         if done:
             self.render(self.state, reward)
             self.current_episode += 1
-            self.window.title(f"Multi Agent Maze --- Episode{self.current_episode + 1}")
+            if self.window is not None:
+                self.window.title(f"Multi Agent Maze --- Episode{self.current_episode + 1}")
 
-        obs = self.createObservation()
+        obs = self.createObservation(done)
 
         return obs, reward, done, {'state': self.state}
 
@@ -417,243 +532,96 @@ class MazeEnv(Env):
         self.success_episode.append(
             'Success' if state == 'Succeeded' else 'Failure')
 
-        file = open('trial/render.txt', 'a')
-        file.write('\n \n')
-        file.write(f'Episode number {self.current_episode}\n')
-        file.write(
-            f'{self.success_episode[-1]} in {self.current_step} steps\n')
-        file.write(f"Score: {score} \n")
-        file.write('----------------------------\n \n')
-        file.close()
+        if self.log.enabled:
+            self.log.write('\n \n',
+                           f'Episode number {self.current_episode}\n',
+                           f'{self.success_episode[-1]} in {self.current_step} steps\n',
+                           f"Score: {score} \n",
+                           '----------------------------\n \n')
+
+    # Seed the random stream of the environment and of its action space
+    def seed(self, seed=None):
+        self.np_random = np.random.default_rng(seed)
+        self.action_space.seed(seed)
+        return [seed]
+
+    # Turn the phase timers on or off, the stats collected so far are kept
+    def set_profiling(self, enabled):
+        if enabled:
+            self.profiler.enable()
+        else:
+            self.profiler.disable()
+
+    # Calls, total time and latency histogram of each phase of step() and reset() since the last clear
+    def get_perf_stats(self):
+        return self.profiler.summary()
+
+    def clear_perf_stats(self):
+        self.profiler.clear()
 
     # Function that resets the environment
-    def reset(self):
-        self.pen.clear()
+    def reset(self, seed=None):
+        # A seed restarts the random streams, otherwise they carry on from the last episode
+        if seed is not None:
+            self.seed(seed)
+        if self.pen is not None:
+            # Clearing the pen removes every stamp, the terrain is drawn again on the next frame
+            self.pen.clear()
+            self.drawn_world = None
+            self.agent_stamps = {}
         self.current_agent = 1
         # P means the game is playable, W means somenone wins, L someone lose
         self.state = 'P'
         self.current_step = 0
         self.max_step = 60
-        self.world = np.copy(self.world_start)
-        file = open('trial/render.txt', 'a')
-        file.write(f"----Current Episode: {self.current_episode} ---- \n")
+        self._resetAgents()
+        self.log.startEpisode(self.current_episode)
+        if self.log.tracing:
+            self.log.write(f"----Current Episode: {self.current_episode} ---- \n")
 
-        self.exploration_prize = np.ones(
-            shape=(np.size(self.world, 0),
-                   np.size(self.world, 1))
-        )
+        self.exploration_prize.clear()
 
         self.bonus_reward = 0
 
         return self.createObservation()
 
     # Create observations for further analysis
-    def createObservation(self):
-        observation = self.world
-
-        # Numpy.size(array, axis value)
-        data_to_add = [0] * np.size(self.world, 1)
-        data_to_add[0] = self.current_agent
-
-        observation = np.append(observation, [data_to_add], axis=0)
-
-        return observation
+    # Only the current agent cell changes, the returned array is overwritten by the next step
+    # The terminal observation is always a copy, since reset() writes the next episode into the same buffer
+    # and vector envs keep it as the terminal_observation
+    def createObservation(self, done=False):
+        if self.simultaneous:
+            return self.observations.copy() if self.copy_obs or done else self.observations
+        self.observation[self.agent_index] = self.current_agent
+        if self.copy_obs or done:
+            return self.observation.copy()
+        return self.observation
 
     def _exploration_prize(self, next_pos):
         """
         Incentive mechanism for exploration.
         :param next_pos (int):
         """
-        if self.exploration_prize[next_pos] == 1:
-            self.exploration_prize[next_pos] = 0
+        # The cell is credited to the agent taking the action, in its own plane when agents are tracked apart
+        if self.exploration_prize.visit(self.exploration_groups[self.current_agent], next_pos):
             self.bonus_reward += 1
 
 
 if __name__ == "__main__":
-    # Practice Map
-    world = np.array([[-1, -1, -1, -1, -1, -1, -1, -1, -1],
-                      [-1, 1, 0, 0, 0, 0, 2, 0, -1],
-                      [-1, 0, 0, 12, 0, 0, 0, 0, -1],
-                      [-1, 0, 0, 0, 0, 0, 0, 0, -1],
-                      [-1, 0, 0, 0, 0, 0, 12, 0, -1],
-                      [-1, 0, 0, 0, 13, 0, 0, 0, -1],
-                      [-1, -1, -1, -1, -1, -1, -1, -1, -1]])
-
-    # CSGO Dusk 2
-    World2 = [
-        "BBB******************BBBBBB"
-        "B*BBBBBBBBBBBBBBBBBBB*****B",
-        "B***********************3*B",
-        "B**BBBBBBBB***BBBBBBB*BBB*x",
-        "B*B*******B***B*****B*B*B*x",
-        "B*BBBBBBBBB***BBBBBBB*B*B*x",
-        "B*********************B*B*x",
-        "BB*BBBB*******BBBBBBBBBB**x",
-        "B***BBB******B*******B****x",
-        "X*****Bxxxxx*BBBBBBBBB*B**x",
-        "X***********5**********BBBB",
-        "Xxxxxxxxxxxx5xxxxxxxxxxxxxx"
-    ]
-    # 10x25, can change to 20x20
-    world2 = np.array(
-        [
-            [-1, -1, -1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, -1, -1, -1, -1, -1, -1],
-            [-1, 0, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, 0, 0, 0, 0, 0, -1],
-            [-1, 1, 0, 2, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 11, 0, -1],
-            [-1, 0, 0, -1, -1, -1, -1, -1, -1, -1, -1, 0, 0, 0, -1, -1, -1, -1, -1, -1, -1, 0, -1, -1, -1, 0, -1],
-            [-1, 0, -1, 0, 0, 0, 0, 0, 0, 0, -1, 0, 0, 0, -1, 0, 0, 0, 0, 0, -1, 0, -1, 0, -1, 0, -1],
-            [-1, 0, -1, -1, -1, -1, -1, -1, -1, -1, -1, 0, 0, 0, -1, -1, -1, -1, -1, -1, -1, 0, -1, 0, -1, 0, -1],
-            [-1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, -1, 0, -1, 0, -1],
-            [-1, -1, 0, -1, -1, -1, -1, 0, 0, 0, 0, 0, 0, 0, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, 0, 0, -1],
-            [-1, 0, 0, 0, -1, -1, -1, 0, 0, 0, 0, 0, 0, -1, 0, 0, 0, 0, 0, 0, 0, -1, 0, 0, 0, 0, -1],
-            [-1, 0, 0, 0, 0, 0, -1, -1, -1, -1, -1, -1, 0, -1, -1, -1, -1, -1, -1, -1, -1, -1, 0, -1, 0, 0, -1],
-            [-1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 13, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, -1, -1, -1, -1],
-            [-1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1]
-        ]
-    )
-    # COD 4 Modern Warfare KillingHouse
-    World3 = [
-        "XXXXXXXXXXX",
-        "X000000000X",
-        "XXX000000XX",
-        "X0000XX000X",
-        "X000XXXX00X",
-        "XX000000X0X",
-        "X0330000X0X",
-        "X0033000X0X",
-        "X000000000X",
-        "XXX00XXX00X",
-        "X000000000X",
-        "XXXXXXXXXXX"
-    ]
-    # KillingHouse 10x10
-    world3 = np.array([
-        [-1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1],
-        [-1, 1, 0, 2, 0, 0, 0, 0, 0, 0, 0, -1],
-        [-1, -1, -1, 0, 0, 0, 0, 0, 0, 0, -1, -1],
-        [-1, 0, 0, 0, 0, -1, -1, 0, 0, 0, 0, -1],
-        [-1, 0, 0, 0, -1, -1, -1, -1, 0, 0, 0, -1],
-        [-1, -1, 0, 0, 0, 0, 0, 0, 0, -1, 0, -1],
-        [-1, 0, 0, 12, 0, 0, 0, 0, 0, -1, 0, -1],
-        [-1, 0, 0, 0, 12, 0, 0, 0, 0, -1, 0, -1],
-        [-1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, -1],
-        [-1, -1, -1, 0, 0, 0, -1, -1, -1, 0, 0, -1],
-        [-1, 0, 0, 0, 0, 0, 13, 0, 0, 0, 0, -1],
-        [-1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1]
-    ])
-
-    world3_2 = np.array([
-        [-1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1],
-        [-1, 1, 2, 3, 0, 4, 5, 0, 6, 7, 8, -1],
-        [-1, -1, -1, 0, 0, 0, 0, 0, 0, 0, -1, -1],
-        [-1, 0, 0, 0, 0, -1, -1, 0, 0, 0, 0, -1],
-        [-1, 0, 0, 0, -1, -1, -1, -1, 0, 0, 0, -1],
-        [-1, -1, 0, 0, 0, 0, 0, 0, 0, -1, 0, -1],
-        [-1, 0, 0, 12, 0, 0, 0, 0, 0, -1, 0, -1],
-        [-1, 0, 0, 0, 12, 0, 0, 0, 0, -1, 0, -1],
-        [-1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, -1],
-        [-1, -1, -1, 0, 0, 0, -1, -1, -1, 0, 0, -1],
-        [-1, 0, 0, 0, 0, 0, 13, 0, 0, 0, 0, -1],
-        [-1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1]
-    ])
-
-    # Halo 3 SandTrap (15x15)
-    World4 = [
-        "XXXXXXXXXXXXXXXX",
-        "X---XXXXXXX----X",
-        "X-X-X-X-X-X--X-X",
-        "X-----X-X------X",
-        "X--------------X",
-        "X-X-XXX-X----X-X",
-        "X-X-X-X-X------X",
-        "X-X-X-X-X------X",
-        "X-X-X-X-X------X",
-        "X-X-XXX-X------X",
-        "X-X-----X----X-X",
-        "X-X-XXX-X------X",
-        "X--------------X",
-        "X--------------X",
-        "X-----X--X-----X",
-        "XXXXXXXXXXXXXXXX"
-    ]
-
-    world4 = np.array([
-        [-1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1],
-        [-1, 1, 2, 3, -1, -1, -1, -1, -1, -1, -1, 5, 6, 7, 8, -1],
-        [-1, 9, -1, 0, -1, 0, -1, 4, -1, 0, -1, 0, 10, -1, 0, -1],
-        [-1, 0, 0, 0, 0, 0, -1, 0, -1, 0, 0, 0, 0, 0, 0, -1],
-        [-1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, -1],
-        [-1, 0, -1, 0, -1, -1, -1, 0, -1, 0, 0, 0, 0, -1, 0, -1],
-        [-1, 0, -1, 0, -1, 0, -1, 0, -1, 0, 0, 0, 0, 0, 0, -1],
-        [-1, 12, -1, 0, -1, 0, -1, 0, -1, 0, 0, 12, 0, 0, 0, -1],
-        [-1, 0, -1, 0, -1, 0, -1, 0, -1, 0, 0, 0, 0, 0, 0, -1],
-        [-1, 0, -1, 0, -1, -1, -1, 0, -1, 0, 0, 0, 0, 0, 0, -1],
-        [-1, 0, -1, 0, 0, 0, 0, 0, -1, 0, 0, 0, 0, -1, 0, -1],
-        [-1, 0, -1, 0, -1, -1, -1, 0, -1, 0, 0, 0, 0, 0, 0, -1],
-        [-1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, -1],
-        [-1, 0, 0, 0, 0, 0, -1, 0, 0, -1, 0, 0, 0, 0, 0, -1],
-        [-1, 0, 0, 12, 0, 0, 0, 13, 0, 0, 0, 0, 0, 0, 0, -1],
-        [-1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1]
-    ])
-    # Battlefield 4  Golmund Railway (20x20)
-    World5 = [
-        "000XXXXXXXXXX000000000",
-
-        "00X000000000X0000000000",
-        "00X00000000000X0000000",
-        "00X000000000000X000000",
-        "00X0000000000000X00000",
-        "00X00000000000000X0000",
-        "00X000000000000000X000",
-        "00X0000000000000000X00",
-        "00X00000000000000000X0",
-        "00X00000000000000000X0",
-        "0X000000000000000000X0",
-        "0X000000000000000000X0",
-        "X00000000000000000000X",
-        "X00000000000000000000X",
-        "0X000000000000000000X0",
-        "0X00000000000000000X00",
-        "00X000000000000000X000",
-        "000X000000000000XX0000",
-        "00000X000000000X000000",
-        "0000000X000000X0000000",
-
-        "00000000XXXXXX00000000"
-    ]
-    world5 = np.array(
-        [
-            [0, 0, 0, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, 0, 0, 0, 0, 0, 0, 0, 0, 0],
-            [0, 0, -1, 1, 0, 2, 0, 0, 0, 0, 0, 0, 0, -1, 0, 0, 0, 0, 0, 0, 0, 0],
-            [0, 0, -1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, -1, 0, 0, 0, 0, 0, 0, 0],
-            [0, 0, -1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, -1, 0, 0, 0, 0, 0, 0],
-            [0, 0, -1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, -1, 0, 0, 0, 0, 0],
-            [0, 0, -1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, -1, 0, 0, 0, 0],
-            [0, 0, -1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, -1, 0, 0, 0],
-            [0, 0, -1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, -1, 0, 0],
-            [0, 0, -1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, -1, 0],
-            [0, 0, -1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, -1, 0],
-            [0, -1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, -1, 0],
-            [0, -1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, -1, 0],
-            [-1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, -1],
-            [-1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, -1],
-            [0, -1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, -1, 0],
-            [0, -1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, -1, 0, 0],
-            [0, 0, -1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, -1, 0, 0, 0],
-            [0, 0, 0, -1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, -1, -1, 0, 0, 0, 0],
-            [0, 0, 0, 0, -1, -1, 0, 0, 0, 0, 0, 0, 0, 0, 0, -1, 0, 0, 0, 0, 0, 0],
-            [0, 0, 0, 0, 0, 0, -1, -1, 0, 0, 13, 0, 0, 0, -1, 0, 0, 0, 0, 0, 0, 0],
-            [0, 0, 0, 0, 0, 0, 0, 0, -1, -1, 13, -1, -1, -1, 0, 0, 0, 0, 0, 0, 0, 0]
-        ])
     import time
+    import MazeMaps
 
+    world4 = MazeMaps.getMap('world4')
     print("Start: ", time.time())
     # Create the new environment
-    env = MazeEnv(world4, numOfAgents=10)
+    log = EpisodeLog.EpisodeLogger('trial/render.txt', level=EpisodeLog.LOG_STEPS)
+    env = MazeEnv(world4, numOfAgents=10, render_mode="human", log=log)
     numTotalEpisodes = 10
 
+    # Only the first episode is seeded, the others carry on from the same random stream
+    seed = 0
     while env.current_episode < numTotalEpisodes:
-        state = env.reset()
+        state = env.reset(seed=seed if env.current_episode == 0 else None)
         done = False
         score = 0
 
@@ -41,6 +41,7 @@ class MazeEnv(Env):
         # Initialize the current agent, world, and state of the world
         self.current_agent = 1
         self.world = np.copy(self.world_start)
+        self._findAgents()
         self.state = 'P'
         self.current_step = 0
         self.max_step = 50
@@ -108,7 +109,10 @@ class MazeEnv(Env):
     # Function to move the current agent about the maze
     def moveAgent(self, action):
         # Current position[0] = x, current_pos[1] = y
-        current_pos = np.where(self.world == self.current_agent)
+        current_pos = self.agent_pos[self.current_agent]
+        # Agents that are not on the map cannot move
+        if current_pos is None:
+            return
 
         # If the agent goes backward
         if action == BACKWARD:
@@ -126,37 +130,31 @@ class MazeEnv(Env):
 
             # If the space is not a trap (0), move to it and set the previous spot to 0
             if new_pos[0] > SPACE and int(self.world[new_pos]) == SPACE:
-                self.world[new_pos] = self.current_agent
-                self.world[current_pos] = SPACE
+                self._placeAgent(self.current_agent, new_pos)
                 '''Implement This Later: self._exploration_prize(next_pos)'''
             # If the space is a trap (3), end the game
             if new_pos[0] >= SPACE and int(self.world[new_pos]) == TRAP:
-                self.world[new_pos] = self.current_agent
-                self.world[current_pos] = SPACE
+                self._placeAgent(self.current_agent, new_pos)
                 self.state = 'Failed'
                 '''Implement This Later: self._exploration_prize(next_pos)'''
 
             # If the space is a teleporter
             elif new_pos[0] >= SPACE and int(self.world[new_pos] == TELEPORTER):
-                self.world[new_pos] = self.current_agent
-                self.world[current_pos] = SPACE
+                self._placeAgent(self.current_agent, new_pos)
 
                 # Teleport the other agent
                 other_agent = 2 if self.current_agent == 1 else 1
-                other_player_pos = np.where(self.world == other_agent)
-                other_next_pos = (other_player_pos[0] + 3, other_player_pos[1])
+                other_player_pos = self.agent_pos[other_agent]
                 # If the next position of the other agent
-                if other_next_pos[0] < np.size(self.world, 0):
-                    self.world[other_next_pos] = other_agent
-                    self.world[other_player_pos] = SPACE
+                if other_player_pos is not None and other_player_pos[0] + 3 < np.size(self.world, 0):
+                    self._placeAgent(other_agent, (other_player_pos[0] + 3, other_player_pos[1]))
 
                 self.state = 'P'
                 '''Implement This Later: self._exploration_prize(next_pos)'''
 
             # If the agent reaches the goal
             elif new_pos[0] >= SPACE and (int(self.world[new_pos]) == GOAL):
-                self.world[new_pos] = self.current_agent
-                self.world[current_pos] = SPACE
+                self._placeAgent(self.current_agent, new_pos)
                 self.state = 'Succeeded'
                 self._exploration_prize(new_pos)
 
@@ -178,38 +176,32 @@ class MazeEnv(Env):
 
             # If the space is not a trap (0), move to it and set the previous spot to 0
             if new_pos[1] < limit and int(self.world[new_pos]) == SPACE:
-                self.world[new_pos] = self.current_agent
-                self.world[current_pos] = SPACE
+                self._placeAgent(self.current_agent, new_pos)
                 '''Implement This Later: self._exploration_prize(next_pos)'''
 
             # If the space is a trap (3), end the game
             if new_pos[1] < limit and int(self.world[new_pos]) == 3:
-                self.world[new_pos] = self.current_agent
-                self.world[current_pos] = SPACE
+                self._placeAgent(self.current_agent, new_pos)
                 self.state = 'Failed'
                 '''Implement This Later: self._exploration_prize(next_pos)'''
 
             # If the space is a teleporter(4) move the other agent
             elif new_pos[1] < limit and int(self.world[new_pos] == TELEPORTER):
-                self.world[new_pos] = self.current_agent
-                self.world[current_pos] = SPACE
+                self._placeAgent(self.current_agent, new_pos)
 
                 # Teleport the other agent
                 other_agent = 2 if self.current_agent == 1 else 1
-                other_player_pos = np.where(self.world == other_agent)
-                other_next_pos = (other_player_pos[0] + 3, other_player_pos[1])
+                other_player_pos = self.agent_pos[other_agent]
                 # If the next position of the other agent
-                if other_next_pos[0] < np.size(self.world, 0):
-                    self.world[other_next_pos] = other_agent
-                    self.world[other_player_pos] = SPACE
+                if other_player_pos is not None and other_player_pos[0] + 3 < np.size(self.world, 0):
+                    self._placeAgent(other_agent, (other_player_pos[0] + 3, other_player_pos[1]))
 
                     self.state = 'P'
                     '''Implement This Later: self._exploration_prize(next_pos)'''
 
             # If the agent reaches the goal(5) End the game
             elif new_pos[1] < limit and (int(self.world[new_pos]) == GOAL):
-                self.world[new_pos] = self.current_agent
-                self.world[current_pos] = SPACE
+                self._placeAgent(self.current_agent, new_pos)
                 self.state = 'Succeeded'
                 ''' Implement self._exploration_prize(new_pos) '''
 
@@ -230,38 +222,32 @@ class MazeEnv(Env):
 
             # If the space is not a trap (0), move to it and set the previous spot to 0
             if new_pos[0] < limit and int(self.world[new_pos]) == SPACE:
-                self.world[new_pos] = self.current_agent
-                self.world[current_pos] = SPACE
+                self._placeAgent(self.current_agent, new_pos)
                 '''Implement This Later: self._exploration_prize(next_pos)'''
 
             # If the space is a trap (3), end the game
             if new_pos[0] < limit and int(self.world[new_pos]) == TRAP:
-                self.world[new_pos] = self.current_agent
-                self.world[current_pos] = SPACE
+                self._placeAgent(self.current_agent, new_pos)
                 self.state = 'Failed'
                 '''Implement This Later: self._exploration_prize(next_pos)'''
 
             # If the space is a teleporter(4) move the other agent
             elif new_pos[0] < limit and int(self.world[new_pos] == TELEPORTER):
-                self.world[new_pos] = self.current_agent
-                self.world[current_pos] = SPACE
+                self._placeAgent(self.current_agent, new_pos)
 
                 # Teleport the other agent
                 other_agent = 2 if self.current_agent == 1 else 1
-                other_player_pos = np.where(self.world == other_agent)
-                other_next_pos = (other_player_pos[0] + 3, other_player_pos[1])
+                other_player_pos = self.agent_pos[other_agent]
                 # If the next position of the other agent
-                if other_next_pos[0] < np.size(self.world, 0):
-                    self.world[other_next_pos] = other_agent
-                    self.world[other_player_pos] = SPACE
+                if other_player_pos is not None and other_player_pos[0] + 3 < np.size(self.world, 0):
+                    self._placeAgent(other_agent, (other_player_pos[0] + 3, other_player_pos[1]))
 
                     self.state = 'P'
                     '''Implement This Later: self._exploration_prize(next_pos)'''
 
                 # If the agent reaches the goal(5) End the game
                 elif new_pos[0] < limit and (int(self.world[new_pos]) == GOAL):
-                    self.world[new_pos] = self.current_agent
-                    self.world[current_pos] = SPACE
+                    self._placeAgent(self.current_agent, new_pos)
                     self.state = 'Succeeded'
                     '''Implement This Later: self._exploration_prize(next_pos)'''
 
@@ -281,40 +267,54 @@ class MazeEnv(Env):
 
             # If the space is not a trap (0), move to it and set the previous spot to 0
             if new_pos[1] >= SPACE and int(self.world[new_pos]) == SPACE:
-                self.world[new_pos] = self.current_agent
-                self.world[current_pos] = SPACE
+                self._placeAgent(self.current_agent, new_pos)
                 '''Implement This Later: self._exploration_prize(next_pos)'''
             # If the space is a trap (3), end the game
             if new_pos[1] >= SPACE and int(self.world[new_pos]) == TRAP:
-                self.world[new_pos] = self.current_agent
-                self.world[current_pos] = SPACE
+                self._placeAgent(self.current_agent, new_pos)
                 self.state = 'Failed'
                 '''Implement This Later: self._exploration_prize(next_pos)'''
 
             # If the space is a teleporter
             elif new_pos[1] >= SPACE and int(self.world[new_pos] == TELEPORTER):
-                self.world[new_pos] = self.current_agent
-                self.world[current_pos] = SPACE
+                self._placeAgent(self.current_agent, new_pos)
 
                 # Teleport the other agent
                 other_agent = 2 if self.current_agent == 1 else 1
-                other_player_pos = np.where(self.world == other_agent)
-                other_next_pos = (other_player_pos[0] + 3, other_player_pos[1])
+                other_player_pos = self.agent_pos[other_agent]
                 # If the next position of the other agent
-                if other_next_pos[0] < np.size(self.world, 0):
-                    self.world[other_next_pos] = other_agent
-                    self.world[other_player_pos] = SPACE
+                if other_player_pos is not None and other_player_pos[0] + 3 < np.size(self.world, 0):
+                    self._placeAgent(other_agent, (other_player_pos[0] + 3, other_player_pos[1]))
 
                 self.state = 'P'
                 '''Implement This Later: self._exploration_prize(next_pos)'''
 
             # If the agent reaches the goal
             elif new_pos[1] >= SPACE and (int(self.world[new_pos]) == GOAL):
-                self.world[new_pos] = self.current_agent
-                self.world[current_pos] = SPACE
+                self._placeAgent(self.current_agent, new_pos)
                 self.state = 'Succeeded'
                 '''Implement This Later: self._exploration_prize(next_pos)'''
 
+    # Build the table of agent positions with a single scan of the world
+    def _findAgents(self):
+        self.agent_pos = [None] * (numOfAgents + 1)
+        rows, cols = np.nonzero((self.world >= 1) & (self.world <= numOfAgents))
+        for row, col in zip(rows.tolist(), cols.tolist()):
+            self.agent_pos[int(self.world[row, col])] = (row, col)
+
+    # Move an agent to a new cell, keeping the world and the position table in sync
+    def _placeAgent(self, agent, new_pos):
+        old_pos = self.agent_pos[agent]
+        if new_pos == old_pos:
+            return
+        # An agent overwritten in the world is no longer on the map
+        displaced = int(self.world[new_pos])
+        if displaced in AGENTS:
+            self.agent_pos[displaced] = None
+        self.world[new_pos] = agent
+        self.world[old_pos] = SPACE
+        self.agent_pos[agent] = new_pos
+
     # Function to perform each action per timestep
     def step(self, action):
         '''
@@ -390,6 +390,7 @@ class MazeEnv(Env):
         self.current_step = 0
         self.max_step = 50
         self.world = np.copy(self.world_start)
+        self._findAgents()
 
         '''
         Implement This Later
@@ -414,13 +415,8 @@ class MazeEnv(Env):
 
 
 if __name__ == "__main__":
-    world = np.array([[-1, -1, -1, -1, -1, -1, -1, -1, -1],
-                      [-1, 1, 0, 0, 0, 0, 2, 0, -1],
-                      [-1, 0, 0, 3, 0, 0, 0, 0, -1],
-                      [-1, 4, 0, 0, 0, 0, 4, 0, -1],
-                      [-1, 0, 0, 3, 3, 0, 0, 0, -1],
-                      [-1, 0, 3, 0, 5, 0, 3, 0, -1],
-                      [-1, -1, -1,  5, -1, -1, -1, -1, -1]])
+    import MazeMaps
+    world = MazeMaps.getMap('maze_game')
 
     # Create the new environment
     env = MazeEnv(world)
@@ -0,0 +1,292 @@
+# Procedural maze maps for scaling tests
+# Maps are built with whole-array numpy operations and come out in the environments' cell values, so a
+# generated map can be passed straight to MazeEnv. The same style, size, options and seed always give the
+# same map, and generateBatch() gives every map of a batch its own seed for curriculum and benchmark runs
+import itertools
+
+import numpy as np
+
+from MazeMaps import WALL, SPACE, TRAP, GOAL
+from MazeRules import MAX_WORLD_AGENT
+from Seeding import spawnSeeds
+
+STYLES = ['backtracker', 'rooms', 'arena']
+# Every order the four directions (up, down, left, right) can be tried in
+ORDERS = np.array(list(itertools.permutations(range(4))))
+# Side of the blocks of cells the backtracker carves at the same time
+BLOCK_SIZE = 16
+
+
+# Neighbours of the cells of a grid, each in its own random order of directions
+# Neighbours outside the grid or outside the cell's block are rows * cols
+def _neighbours(rows, cols, block, rng):
+    cells = np.arange(rows * cols, dtype=np.int32).reshape(rows, cols)
+    neighbours = np.full((rows, cols, 4), rows * cols, dtype=np.int32)
+    neighbours[1:, :, 0] = cells[:-1]
+    neighbours[:-1, :, 1] = cells[1:]
+    neighbours[:, 1:, 2] = cells[:, :-1]
+    neighbours[:, :-1, 3] = cells[:, 1:]
+    # Cut the links that cross into another block
+    neighbours[::block, :, 0] = rows * cols
+    neighbours[block - 1::block, :, 1] = rows * cols
+    neighbours[:, ::block, 2] = rows * cols
+    neighbours[:, block - 1::block, 3] = rows * cols
+    orders = ORDERS[rng.integers(len(ORDERS), size=rows * cols)]
+    return np.take_along_axis(neighbours.reshape(-1, 4), orders, axis=1)
+
+
+# Recursive backtracker over a grid of cells, returns the parent of every cell in the spanning tree it carves
+# (-1 for the cell each block started from)
+# The grid is split into blocks and every block runs its own backtracker, all of them advancing one move
+# per pass, so the number of passes depends on the block size and not on the size of the grid.
+# The path back to a block's start is the chain of parents, so backtracking is a step to the parent
+def _backtrack(rows, cols, block, rng):
+    num_cells = rows * cols
+    neighbours = _neighbours(rows, cols, block, rng)
+    # Missing neighbours point at an extra cell that counts as visited
+    visited = np.zeros(num_cells + 1, dtype=bool)
+    visited[-1] = True
+    parent = np.full(num_cells + 1, -1, dtype=np.int32)
+
+    # Each block starts from a random cell of its own
+    top, left = (grid.ravel() for grid in np.meshgrid(np.arange(0, rows, block), np.arange(0, cols, block),
+                                                      indexing='ij'))
+    start_rows = top + (rng.random(len(top)) * np.minimum(block, rows - top)).astype(np.int32)
+    start_cols = left + (rng.random(len(left)) * np.minimum(block, cols - left)).astype(np.int32)
+    current = (start_rows * cols + start_cols).astype(np.int32)
+    visited[current] = True
+
+    while len(current):
+        # Move to the first neighbour in the cell's order that no one has visited, or back to the parent
+        options = neighbours[current]
+        free = ~visited[options]
+        first = free.argmax(axis=1)[:, None]
+        moving = np.take_along_axis(free, first, axis=1)[:, 0]
+        # Blocks moving back write to the extra cell instead of their target
+        target = np.where(moving, np.take_along_axis(options, first, axis=1)[:, 0], num_cells)
+        visited[target] = True
+        parent[target] = current
+        current = np.where(moving, target, parent[current])
+        current = current[current >= 0]
+    parent[-1] = -1
+    return parent[:-1]
+
+
+# Spanning tree over a grid of cells as pairs of neighbouring cells, carved by recursive backtrackers
+# Blocks of cells are carved by the backtracker, then the blocks are joined along a spanning tree of the
+# grid of blocks, built the same way, through one cell pair at a random spot along each shared edge it crosses
+def _spanningTree(rows, cols, block, rng):
+    parent = _backtrack(rows, cols, block, rng)
+    cells = np.flatnonzero(parent >= 0)
+    if rows <= block and cols <= block:
+        return cells, parent[cells]
+
+    block_cols = -(-cols // block)
+    blocks, parents = _spanningTree(-(-rows // block), block_cols, block, rng)
+    block_row, block_col = np.divmod(blocks, block_cols)
+    parent_row, parent_col = np.divmod(parents, block_cols)
+    vertical = block_col == parent_col
+    # Cell on this block's side of the shared edge, at a random spot along it
+    low = np.where(vertical, block_col, block_row) * block
+    high = np.minimum(low + block, np.where(vertical, cols, rows))
+    spot = low + (rng.random(len(blocks)) * (high - low)).astype(np.int64)
+    edge_row = np.where(vertical, block_row * block + np.where(block_row > parent_row, 0, block - 1), spot)
+    edge_col = np.where(vertical, spot, block_col * block + np.where(block_col > parent_col, 0, block - 1))
+    other_row = edge_row + parent_row - block_row
+    other_col = edge_col + parent_col - block_col
+    return (np.concatenate([cells, edge_row * cols + edge_col]),
+            np.concatenate([parent[cells], other_row * cols + other_col]))
+
+
+# Perfect maze with long winding corridors
+# Maze cell (r, c) is world[2r + 1, 2c + 1], and the wall between two cells joined by the tree is knocked down
+def _backtracker(height, width, rng, block=BLOCK_SIZE):
+    rows = (height - 1) // 2
+    cols = (width - 1) // 2
+    world = np.full((height, width), WALL, dtype=np.int16)
+    world[1:2 * rows:2, 1:2 * cols:2] = SPACE
+    cells, parents = _spanningTree(rows, cols, block, rng)
+    row, col = np.divmod(cells, cols)
+    parent_row, parent_col = np.divmod(parents, cols)
+    world[row + parent_row + 1, col + parent_col + 1] = SPACE
+    return world
+
+
+# Open the rectangles [top, bottom) x [left, right), all at once through a 2D running sum
+def _carveRectangles(world, top, left, bottom, right):
+    height, width = world.shape
+    starts = np.zeros((height + 1, width + 1), dtype=np.int32)
+    np.add.at(starts, (top, left), 1)
+    np.add.at(starts, (top, right), -1)
+    np.add.at(starts, (bottom, left), -1)
+    np.add.at(starts, (bottom, right), 1)
+    world[starts.cumsum(axis=0).cumsum(axis=1)[:height, :width] > 0] = SPACE
+
+
+# Rectangular rooms joined one after the other by L-shaped corridors
+def _rooms(height, width, rng, numRooms=None, minRoom=3, maxRoom=12):
+    world = np.full((height, width), WALL, dtype=np.int16)
+    if numRooms is None:
+        numRooms = max(2, height * width // (4 * maxRoom * maxRoom))
+    room_height = rng.integers(minRoom, maxRoom + 1, size=numRooms).clip(max=height - 2)
+    room_width = rng.integers(minRoom, maxRoom + 1, size=numRooms).clip(max=width - 2)
+    top = 1 + (rng.random(numRooms) * (height - 1 - room_height)).astype(np.int64)
+    left = 1 + (rng.random(numRooms) * (width - 1 - room_width)).astype(np.int64)
+
+    # Corridor from the centre of each room along its row, then along a column to the centre of the next
+    row = top + room_height // 2
+    col = left + room_width // 2
+    next_row = row[1:]
+    next_col = col[1:]
+    row = row[:-1]
+    col = col[:-1]
+    corridor_top = np.concatenate([row, np.minimum(row, next_row)])
+    corridor_left = np.concatenate([np.minimum(col, next_col), next_col])
+    corridor_bottom = np.concatenate([row + 1, np.maximum(row, next_row) + 1])
+    corridor_right = np.concatenate([np.maximum(col, next_col) + 1, next_col + 1])
+
+    _carveRectangles(world, np.concatenate([top, corridor_top]), np.concatenate([left, corridor_left]),
+                     np.concatenate([top + room_height, corridor_bottom]),
+                     np.concatenate([left + room_width, corridor_right]))
+    return world
+
+
+# Label of the connected region of every open cell, the labels of walls mean nothing
+# Open cells next to each other in a row form a run and start out joined. Runs that touch are then hooked
+# onto the smaller label and every label jumps to its root, so the number of passes grows with the log of the
+# number of runs and not with the length of the corridors
+def _regions(open_cells):
+    height, width = open_cells.shape
+    runs = np.cumsum((open_cells & ~np.roll(open_cells, 1, axis=1)).reshape(-1)) - 1
+    # One pair of cells is enough for each stretch where a run lies on top of another
+    down = open_cells[:-1] & open_cells[1:]
+    down = (down & ~np.roll(down, 1, axis=1)).reshape(-1)
+    upper, lower = runs[:-width][down], runs[width:][down]
+    labels = np.arange(runs[-1] + 1)
+    while True:
+        upper_label, lower_label = labels[upper], labels[lower]
+        joining = upper_label != lower_label
+        if not joining.any():
+            return labels[runs].reshape(height, width)
+        # Runs that are joined stay joined, so their pairs are dropped
+        upper, lower = upper[joining], lower[joining]
+        upper_label, lower_label = upper_label[joining], lower_label[joining]
+        np.minimum.at(labels, np.maximum(upper_label, lower_label), np.minimum(upper_label, lower_label))
+        while True:
+            roots = labels[labels]
+            if np.array_equal(roots, labels):
+                break
+            labels = roots
+
+
+# Open floor with walls around it and pillars scattered over it
+# Pillars can seal cells into pockets, which are walled up so every open cell can reach every other
+def _arena(height, width, rng, wallDensity=0.1):
+    world = np.full((height, width), WALL, dtype=np.int16)
+    inside = world[1:-1, 1:-1]
+    inside[rng.random(inside.shape) >= wallDensity] = SPACE
+    open_cells = world == SPACE
+    if open_cells.any():
+        labels = _regions(open_cells)[open_cells]
+        largest = np.bincount(labels).argmax()
+        world[open_cells] = np.where(labels == largest, SPACE, WALL)
+    return world
+
+
+GENERATORS = {'backtracker': _backtracker, 'rooms': _rooms, 'arena': _arena}
+
+
+# Open cells that can be walled off without cutting any route between the cells around them
+# Going round the eight cells next to a cell, its open neighbours must all be on one run of open cells, so a
+# route through the cell can go round it instead. Dead ends always qualify, corridors never do
+def _bypassable(open_cells):
+    north, south = open_cells[:-2, 1:-1], open_cells[2:, 1:-1]
+    west, east = open_cells[1:-1, :-2], open_cells[1:-1, 2:]
+    sides = north.astype(np.int8) + east + south + west
+    # Two open neighbours next to each other round the ring are joined through the corner between them
+    joined = ((north & open_cells[:-2, 2:] & east).astype(np.int8) + (east & open_cells[2:, 2:] & south)
+              + (south & open_cells[2:, :-2] & west) + (west & open_cells[:-2, :-2] & north))
+    bypassable = np.zeros_like(open_cells)
+    bypassable[1:-1, 1:-1] = open_cells[1:-1, 1:-1] & (sides - joined <= 1)
+    return bypassable
+
+
+# Place the goals, agents 1..numAgents and traps on distinct open cells
+# Traps only go on cells a route can go round, and never next to each other (diagonals included), so the way
+# round a trap is never another trap and every agent can still reach every goal
+def _placeCells(world, rng, numAgents, numGoals, trapDensity):
+    free = np.flatnonzero(world == SPACE)
+    numTraps = int(trapDensity * len(free))
+    if numAgents + numGoals + numTraps > len(free):
+        raise ValueError(f"The map has {len(free)} open cells, too few for {numAgents} agents, "
+                         f"{numGoals} goals and {numTraps} traps")
+    chosen = rng.choice(free, numAgents + numGoals, replace=False)
+    cells = world.reshape(-1)
+    cells[chosen[:numAgents]] = np.arange(1, numAgents + 1)
+    cells[chosen[numAgents:]] = GOAL
+    if numTraps == 0:
+        return world
+
+    # Keep the candidates whose random priority is the highest of the 3x3 cells around them
+    candidates = _bypassable(world != WALL) & (world == SPACE)
+    priority = np.where(candidates, rng.random(world.shape), -1.0)
+    padded = np.pad(priority, 1, constant_values=-1.0)
+    highest = np.maximum(np.maximum(padded[:, :-2], padded[:, 1:-1]), padded[:, 2:])
+    highest = np.maximum(np.maximum(highest[:-2], highest[1:-1]), highest[2:])
+    spaced = np.flatnonzero(candidates & (priority == highest))
+    if numTraps > len(spaced):
+        raise ValueError(f"Only {len(spaced)} cells of the map can be traps without cutting it off, "
+                         f"too few for {numTraps} traps")
+    cells[rng.choice(spaced, numTraps, replace=False)] = TRAP
+    return world
+
+
+# Generate one map of the given style, the outer rows and columns are always walls
+def generate(style, height, width, numAgents=2, numGoals=1, trapDensity=0.01, seed=None, **options):
+    '''
+
+    :param style: 'backtracker', 'rooms' or 'arena'
+    :param height: Rows of the map, at least 5
+    :param width: Columns of the map, at least 5
+    :param numAgents: Agents placed on the map, numbered 1..numAgents
+    :param numGoals: Goal cells placed on the map
+    :param trapDensity: Fraction of the open cells turned into traps, placed so they never cut an agent off from
+        a goal
+    :param seed: Seed of the map, None for a random one
+    :param options: Options of the style, block for 'backtracker', numRooms, minRoom and maxRoom for 'rooms',
+        wallDensity for 'arena'
+    '''
+    if style not in GENERATORS:
+        raise ValueError(f"Unsupported style: {style}")
+    if height < 5 or width < 5:
+        raise ValueError(f"Maps must be at least 5x5, got {height}x{width}")
+    if numAgents > MAX_WORLD_AGENT:
+        raise ValueError(f"At most {MAX_WORLD_AGENT} agents fit in a world, place more with placeAgents()")
+    rng = np.random.default_rng(seed)
+    world = GENERATORS[style](height, width, rng, **options)
+    return _placeCells(world, rng, numAgents, numGoals, trapDensity)
+
+
+# Starting cells of agents 1..numAgents on distinct open cells of a map, passed to the environments as
+# agent_start, for more agents than can be written into the world
+def placeAgents(world, numAgents, seed=None):
+    free = np.argwhere(np.asarray(world) == SPACE)
+    if numAgents > len(free):
+        raise ValueError(f"The map has {len(free)} open cells, too few for {numAgents} agents")
+    chosen = np.random.default_rng(seed).choice(len(free), numAgents, replace=False)
+    return [tuple(pos) for pos in free[chosen].tolist()]
+
+
+# Generate a batch of maps of the same size, each with its own seed derived from the given one
+def generateBatch(style, count, height, width, seed=None, **kwargs):
+    maps = np.empty((count, height, width), dtype=np.int16)
+    for index, map_seed in enumerate(spawnSeeds(seed, count)):
+        maps[index] = generate(style, height, width, seed=map_seed, **kwargs)
+    return maps
+
+
+if __name__ == "__main__":
+    import MazeMaps
+    for style in STYLES:
+        print(style)
+        print('\n'.join(MazeMaps.formatLayout(generate(style, 15, 31, seed=0))))
@@ -0,0 +1,83 @@
+# Layered storage of a maze world
+# The terrain (walls, traps and goals) never changes during an episode, so it is kept in one read-only array
+# that every reset and every env built from the same rules shares. Agents live in a separate occupancy plane
+# holding the id of the agent on each cell, so they never overwrite a trap or the goal, their ids don't have
+# to stay below TRAP, and a reset only has to take the agents off their cells
+import numpy as np
+from gym.spaces import Box
+
+from MazeRules import WALL, GOAL
+
+# 'world' is the original observation, the world with the agents drawn over the terrain and a row below it
+# holding the current agent. 'planes' stacks the terrain, with the same agent row, on the occupancy plane
+OBS_LAYOUTS = ['world', 'planes']
+# Cell of the observation holding the current agent
+AGENT_INDEX = {'world': (-1, 0), 'planes': (0, -1, 0)}
+
+
+# Check the starting cells given for agents 1..numAgents, returns them with None in front for agent 0
+def agentStarts(starts, terrain, numAgents):
+    starts = [None] + [None if pos is None else (int(pos[0]), int(pos[1])) for pos in starts]
+    if len(starts) != numAgents + 1:
+        raise ValueError(f"Got {len(starts) - 1} starting cells for {numAgents} agents")
+    placed = [pos for pos in starts if pos is not None]
+    if len(set(placed)) != len(placed):
+        raise ValueError("Two agents start on the same cell")
+    height = np.size(terrain, 0)
+    for pos in placed:
+        if not 1 <= pos[0] <= height - 2 or terrain[pos] == WALL:
+            raise ValueError(f"Agents can't start on {pos}")
+    return starts
+
+
+# Observation space of one observation, or of one observation for each agent when agents act simultaneously
+def observationSpace(shape, layout, numAgents, perAgent=False):
+    height, width = shape
+    if layout == 'world':
+        shape = (height + 1, width)
+    else:
+        shape = (2, height + 1, width)
+    if perAgent:
+        shape = (numAgents,) + shape
+    return Box(low=-1, high=max(GOAL, numAgents), shape=shape, dtype=np.int16)
+
+
+# Allocate the observation of one env, or of num_envs envs stacked on a first axis
+# Returns the observation, the world with the agents drawn over the terrain and the occupancy plane.
+# The planes that belong to the layout are views into the observation, so updating them updates it in place
+def allocate(terrain, layout, num_envs=None):
+    if layout not in OBS_LAYOUTS:
+        raise ValueError(f"Unsupported obs_layout: {layout}")
+    height, width = np.shape(terrain)
+    batch = () if num_envs is None else (num_envs,)
+    if layout == 'world':
+        observation = np.zeros(batch + (height + 1, width), dtype=np.int16)
+        world = observation[..., :height, :]
+        occupancy = np.zeros(batch + (height, width), dtype=np.int16)
+    else:
+        observation = np.zeros(batch + (2, height + 1, width), dtype=np.int16)
+        observation[..., 0, :height, :] = terrain
+        world = np.zeros(batch + (height, width), dtype=np.int16)
+        occupancy = observation[..., 1, :height, :]
+    world[:] = terrain
+    return observation, world, occupancy
+
+
+# Observation of every agent when agents act simultaneously, each with its own id in the current agent cell
+def allocateAgents(terrain, layout, numAgents):
+    observations, _, _ = allocate(terrain, layout, numAgents)
+    observations[(slice(None),) + AGENT_INDEX[layout]] = np.arange(1, numAgents + 1)
+    return observations
+
+
+# Copy the given cells of the world into the observation of every agent
+# Scattered writes cost far more per cell than a plain copy, so when many cells changed the whole plane is copied
+def copyCells(observations, layout, world, occupancy, rows, cols):
+    if layout == 'world':
+        source, target = world, observations[:, :world.shape[0]]
+    else:
+        source, target = occupancy, observations[:, 1, :occupancy.shape[0]]
+    if len(rows) * 32 > source.size:
+        target[:] = source
+    else:
+        target[:, rows, cols] = source[rows, cols]
@@ -0,0 +1,356 @@
+# Registry of the maze maps
+# Maps are written as ASCII layouts and looked up by name. The first time a map is loaded it is compiled
+# into a .npz file in trial/maps, named after a hash of its layout, with the grid and the cells that
+# other code looks up. Later loads map those arrays straight from the file, so nothing is built when a
+# module that uses maps is imported and a map is only read from disk when it is used
+import hashlib
+import os
+import struct
+import zipfile
+
+import numpy as np
+
+# Same cell values as the environments
+WALL = -1
+SPACE = 0
+TRAP = 12
+GOAL = 13
+
+# Character of each cell value in a layout, agents and other numbered cells are 1-9 then A, B
+LEGEND = {'#': WALL, '.': SPACE, 'T': TRAP, 'G': GOAL}
+LEGEND.update({str(value): value for value in range(1, 10)})
+LEGEND.update({'A': 10, 'B': 11})
+CHARACTERS = {value: character for character, value in LEGEND.items()}
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'trial', 'maps')
+
+LAYOUTS = {
+    # Practice Map
+    'world': [
+        '#########',
+        '#1....2.#',
+        '#..T....#',
+        '#.......#',
+        '#.....T.#',
+        '#...G...#',
+        '#########',
+    ],
+    # CSGO Dusk 2
+    'world2': [
+        '###..................######',
+        '#.###################.....#',
+        '#1.2....................B.#',
+        '#..########...#######.###.#',
+        '#.#.......#...#.....#.#.#.#',
+        '#.#########...#######.#.#.#',
+        '#.....................#.#.#',
+        '##.####.......##########..#',
+        '#...###......#.......#....#',
+        '#.....######.#########.#..#',
+        '#...........G..........####',
+        '###########################',
+    ],
+    # COD 4 Modern Warfare KillingHouse
+    'world3': [
+        '############',
+        '#1.2.......#',
+        '###.......##',
+        '#....##....#',
+        '#...####...#',
+        '##.......#.#',
+        '#..T.....#.#',
+        '#...T....#.#',
+        '#..........#',
+        '###...###..#',
+        '#.....G....#',
+        '############',
+    ],
+    # KillingHouse with 8 agents
+    'world3_2': [
+        '############',
+        '#123.45.678#',
+        '###.......##',
+        '#....##....#',
+        '#...####...#',
+        '##.......#.#',
+        '#..T.....#.#',
+        '#...T....#.#',
+        '#..........#',
+        '###...###..#',
+        '#.....G....#',
+        '############',
+    ],
+    # Halo 3 SandTrap
+    'world4': [
+        '################',
+        '#123#######5678#',
+        '#9#.#.#4#.#.A#.#',
+        '#.....#.#......#',
+        '#..............#',
+        '#.#.###.#....#.#',
+        '#.#.#.#.#......#',
+        '#T#.#.#.#..T...#',
+        '#.#.#.#.#......#',
+        '#.#.###.#......#',
+        '#.#.....#....#.#',
+        '#.#.###.#......#',
+        '#..............#',
+        '#.....#..#.....#',
+        '#..T...G.......#',
+        '################',
+    ],
+    # Battlefield 4 Golmund Railway
+    'world5': [
+        '...##########.........',
+        '..#1.2.......#........',
+        '..#...........#.......',
+        '..#............#......',
+        '..#.............#.....',
+        '..#..............#....',
+        '..#...............#...',
+        '..#................#..',
+        '..#.................#.',
+        '..#.................#.',
+        '.#..................#.',
+        '.#..................#.',
+        '#....................#',
+        '#....................#',
+        '.#..................#.',
+        '.#.................#..',
+        '..#...............#...',
+        '...#............##....',
+        '....##.........#......',
+        '......##..G...#.......',
+        '........##G###........',
+    ],
+    # Team maps of CompMazeEnv and TestEnv, odd agents play against even agents
+    'worldA': [
+        '#########',
+        '#1.3.2.4#',
+        '#.......#',
+        '#.......#',
+        '#.......#',
+        '#...G...#',
+        '###G#####',
+    ],
+    'world_teams': [
+        '#########',
+        '#1.3.2.4#',
+        '#..T....#',
+        '#.......#',
+        '#..TT...#',
+        '#.T.G.T.#',
+        '###G#####',
+    ],
+    'world3_teams': [
+        '############',
+        '#1.2.......#',
+        '###.......##',
+        '#....##....#',
+        '#...####...#',
+        '##.......#.#',
+        '#.TT.....#.#',
+        '#..TT....#.#',
+        '#..........#',
+        '###...###..#',
+        '#.....G....#',
+        '############',
+    ],
+    'world4_teams': [
+        '################',
+        '#.1.#######.2..#',
+        '#.#.#.#.#.#..#.#',
+        '#.....#.#......#',
+        '#..............#',
+        '#.#.###.#....#.#',
+        '#.#.#.#.#......#',
+        '#.#.#.#.#..T...#',
+        '#.#.#.#.#......#',
+        '#.#.###.#......#',
+        '#.#...T.#....#.#',
+        '#.#.###.#......#',
+        '#..............#',
+        '#.....#..#.....#',
+        '#......G.......#',
+        '################',
+    ],
+    # Practice Map with more traps, used by test.py
+    'world_traps': [
+        '#########',
+        '#1....2.#',
+        '#..T....#',
+        '#.......#',
+        '#..TT...#',
+        '#.T...T.#',
+        '###G#####',
+    ],
+    # KillingHouse with 10 agents
+    'world3_10': [
+        '############',
+        '#123456789A#',
+        '###.......##',
+        '#....##....#',
+        '#...####...#',
+        '##.......#.#',
+        '#..T.....#.#',
+        '#...T....#.#',
+        '#..........#',
+        '###...###..#',
+        '#.....G....#',
+        '############',
+    ],
+    # SandTrap with 8 agents
+    'world4_8': [
+        '################',
+        '#123#######5678#',
+        '#.#.#.#4#.#..#.#',
+        '#.....#.#......#',
+        '#..............#',
+        '#.#.###.#....#.#',
+        '#.#.#.#.#......#',
+        '#T#.#.#.#..T...#',
+        '#.#.#.#.#......#',
+        '#.#.###.#......#',
+        '#.#.....#....#.#',
+        '#.#.###.#......#',
+        '#..............#',
+        '#.....#..#.....#',
+        '#..T...G.......#',
+        '################',
+    ],
+    # Map of MazeGame, which uses its own cell values (3 trap, 4 teleporter, 5 goal)
+    'maze_game': [
+        '#########',
+        '#1....2.#',
+        '#..3....#',
+        '#4....4.#',
+        '#..33...#',
+        '#.3.5.3.#',
+        '###5#####',
+    ],
+}
+
+
+# Turn a layout into a grid of cell values
+def parseLayout(rows):
+    if len({len(row) for row in rows}) != 1:
+        raise ValueError("Every row of a layout must have the same length")
+    try:
+        return np.array([[LEGEND[character] for character in row] for row in rows], dtype=np.int16)
+    except KeyError as error:
+        raise ValueError(f"Unknown map character {error}") from None
+
+
+# Turn a grid of cell values back into a layout
+def formatLayout(world):
+    return [''.join(CHARACTERS[value] for value in row) for row in np.asarray(world).tolist()]
+
+
+def layoutHash(rows):
+    return hashlib.sha1('\n'.join(rows).encode()).hexdigest()[:16]
+
+
+# Add a map, or replace the map with the same name
+def register(name, rows):
+    parseLayout(rows)
+    LAYOUTS[name] = list(rows)
+    _loaded.pop(name, None)
+
+
+def mapNames():
+    return list(LAYOUTS)
+
+
+class CompiledMap:
+    # Constructor
+    def __init__(self, name, arrays):
+        '''
+
+        :param name: Name of the map in the registry
+        :param arrays: Grid and metadata, as compiled by _compile() or mapped from the cache file
+        '''
+        self.name = name
+        self.world = arrays['world']
+        # Flat indices into the grid
+        self.free_cells = arrays['free_cells']
+        self.goals = arrays['goals']
+        self.traps = arrays['traps']
+        # Row and column of agent 1, 2, ... up to the first agent missing from the map
+        self.spawns = arrays['spawns']
+        self.numAgents = len(self.spawns)
+
+
+# Grid and metadata of a layout
+def _compile(rows):
+    world = parseLayout(rows)
+    flat = world.ravel()
+    spawns = []
+    while np.any(world == len(spawns) + 1):
+        spawns.append(np.argwhere(world == len(spawns) + 1)[0])
+    return {
+        'world': world,
+        'free_cells': np.flatnonzero(flat == SPACE),
+        'goals': np.flatnonzero(flat == GOAL),
+        'traps': np.flatnonzero(flat == TRAP),
+        'spawns': np.array(spawns, dtype=np.int64).reshape(-1, 2),
+    }
+
+
+# Map every array of an uncompressed .npz file into memory without reading it
+def _memmapArrays(path):
+    arrays = {}
+    with zipfile.ZipFile(path) as archive, open(path, 'rb') as file:
+        for info in archive.infolist():
+            # The .npy data starts after the local header of the zip entry, which has its own name and extra lengths
+            file.seek(info.header_offset + 26)
+            name_length, extra_length = struct.unpack('<HH', file.read(4))
+            file.seek(info.header_offset + 30 + name_length + extra_length)
+            version = np.lib.format.read_magic(file)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(file)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(file)
+            name = info.filename[:-len('.npy')]
+            # Empty arrays can't be mapped
+            if int(np.prod(shape)) == 0:
+                arrays[name] = np.empty(shape, dtype=dtype)
+            else:
+                arrays[name] = np.memmap(path, dtype=dtype, mode='r', offset=file.tell(), shape=shape,
+                                         order='F' if fortran_order else 'C').view(np.ndarray)
+    return arrays
+
+
+# Path of the cache file of a map, compiling it first if it isn't there
+def compileMap(name):
+    rows = LAYOUTS[name]
+    path = os.path.join(CACHE_DIR, f'{name}-{layoutHash(rows)}.npz')
+    if not os.path.exists(path):
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        # Written under another name first, so a half written file is never loaded
+        partial_path = f'{path}.{os.getpid()}.partial'
+        with open(partial_path, 'wb') as file:
+            np.savez(file, **_compile(rows))
+        os.replace(partial_path, path)
+    return path
+
+
+# Maps loaded by this process
+_loaded = {}
+
+
+def loadMap(name):
+    if name not in LAYOUTS:
+        raise KeyError(f"Unknown map: {name}")
+    if name not in _loaded:
+        try:
+            arrays = _memmapArrays(compileMap(name))
+        # Without a writable cache the map is compiled in memory
+        except OSError:
+            arrays = _compile(LAYOUTS[name])
+        _loaded[name] = CompiledMap(name, arrays)
+    return _loaded[name]
+
+
+# Grid of a map, read only
+def getMap(name):
+    return loadMap(name).world
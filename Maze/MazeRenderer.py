@@ -0,0 +1,120 @@
+# Offscreen rendering of maze worlds into RGB images
+# Every cell value has a tile in an atlas, and a frame is the atlas indexed with the world,
+# so no window or Tk is needed and there is no Python loop over the cells
+import os
+
+import numpy as np
+
+# Lowest and highest cell values that can be drawn (WALL to GOAL)
+LOWEST_VALUE = -1
+HIGHEST_VALUE = 13
+
+# Same cell values as the environments
+WALL = -1
+TRAP = 12
+GOAL = 13
+
+# RGB values of the turtle colour names used by the environments
+COLOURS = {
+    "white": (255, 255, 255),
+    "light blue": (173, 216, 230),
+    "blue": (0, 0, 255),
+    "red": (255, 0, 0),
+    "green": (0, 128, 0),
+}
+
+# Agent sprites for each team colour
+ASSETS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Assets')
+SPRITES = {
+    "red": "red_circle.jpg",
+    "blue": "blue_circle.jpg",
+}
+
+
+# Mask of a filled circle in a size x size tile, the radius is a fraction of the tile
+def _discMask(size, radius):
+    centre = (size - 1) / 2
+    y, x = np.ogrid[:size, :size]
+    return (x - centre) ** 2 + (y - centre) ** 2 <= (size * radius) ** 2
+
+
+# Mask of a filled five pointed star in a size x size tile
+def _starMask(size):
+    centre_x = (size - 1) / 2
+    # The points reach further up than down, so the star sits a little low to look centred
+    centre_y = centre_x + size * 0.05
+    angles = -np.pi / 2 + np.arange(10) * np.pi / 5
+    radii = np.where(np.arange(10) % 2 == 0, size * 0.48, size * 0.19)
+    corners_x = centre_x + radii * np.cos(angles)
+    corners_y = centre_y + radii * np.sin(angles)
+
+    # Even-odd rule, a pixel is inside if a ray to its right crosses the outline an odd number of times
+    y, x = np.mgrid[:size, :size]
+    inside = np.zeros((size, size), dtype=bool)
+    for i in range(10):
+        x1, y1 = corners_x[i], corners_y[i]
+        x2, y2 = corners_x[i - 1], corners_y[i - 1]
+        crosses = (y1 > y) != (y2 > y)
+        crossing_x = x1 + (y - y1) * (x2 - x1) / (y2 - y1)
+        inside ^= crosses & (x < crossing_x)
+    return inside
+
+
+# Load an agent sprite scaled to a tile, with its white background replaced by the background colour
+def loadSprite(name, cellSize, bgcolor):
+    from PIL import Image
+    sprite = Image.open(os.path.join(ASSETS, name)).convert('RGB')
+    tile = np.array(sprite.resize((cellSize, cellSize), Image.BILINEAR))
+    tile[tile.min(axis=2) > 200] = COLOURS[bgcolor]
+    return tile
+
+
+# Build the tile of every cell value, shaped (values, cellSize, cellSize, 3)
+def makeAtlas(cellColours, bgcolor, cellSize=25):
+    '''
+
+    :param cellColours: Colour name of each cell value that is drawn, other values are background
+    :param bgcolor: Colour name of the background
+    :param cellSize: Width and height of a cell in pixels
+    '''
+    atlas = np.empty((HIGHEST_VALUE - LOWEST_VALUE + 1, cellSize, cellSize, 3), dtype=np.uint8)
+    atlas[:] = COLOURS[bgcolor]
+    sprites = {}
+    for value, colour in cellColours.items():
+        tile = atlas[value - LOWEST_VALUE]
+        if value == WALL:
+            tile[:] = COLOURS[colour]
+        # Traps are smaller than the agent sprites so the two can be told apart
+        elif value == TRAP:
+            tile[_discMask(cellSize, 0.25)] = COLOURS[colour]
+        elif value == GOAL:
+            tile[_starMask(cellSize)] = COLOURS[colour]
+        # Agents are drawn with the sprite of their team colour
+        elif colour in SPRITES:
+            if colour not in sprites:
+                sprites[colour] = loadSprite(SPRITES[colour], cellSize, bgcolor)
+            tile[:] = sprites[colour]
+        else:
+            tile[_discMask(cellSize, 0.4)] = COLOURS[colour]
+    return atlas
+
+
+# Look up the tile of every cell and lay the tiles out as one image
+# Each pixel row of a tile is copied straight to its place in the image, so no transpose is needed
+def drawFrame(world, atlas):
+    height, width = np.shape(world)
+    cellSize = np.size(atlas, 1)
+    tile_rows = atlas.reshape(len(atlas), cellSize, cellSize * 3)
+    values = np.clip(world, LOWEST_VALUE, HIGHEST_VALUE) - LOWEST_VALUE
+    image = tile_rows[values[:, None, :], np.arange(cellSize)[None, :, None]]
+    return image.reshape(height * cellSize, width * cellSize, 3)
+
+
+# Draw a stack of worlds shaped (N, H, W) into N images at once
+def drawFrames(worlds, atlas):
+    count, height, width = np.shape(worlds)
+    cellSize = np.size(atlas, 1)
+    tile_rows = atlas.reshape(len(atlas), cellSize, cellSize * 3)
+    values = np.clip(worlds, LOWEST_VALUE, HIGHEST_VALUE) - LOWEST_VALUE
+    images = tile_rows[values[:, :, None, :], np.arange(cellSize)[None, None, :, None]]
+    return images.reshape(count, height * cellSize, width * cellSize, 3)
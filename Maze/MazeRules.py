@@ -0,0 +1,121 @@
+# Movement rules of the maze, compiled once per map
+# For every cell and action what happens on entering the next cell is looked up in a table, so a step only has
+# to check whether another agent is standing in the way. The tables hold one small integer per cell and action,
+# so they stay compact on large maps, and the cell an action leads to is worked out from its offset
+import numpy as np
+
+# Same actions and cell values as the environments
+BACKWARD = 0
+RIGHT = 1
+FORWARD = 2
+LEFT = 3
+TELEPORT = 4
+
+WALL = -1
+SPACE = 0
+TRAP = 12
+GOAL = 13
+
+# What happens when an agent enters a cell, ignoring other agents
+BLOCKED = 0
+MOVE = 1
+FAIL = 2
+SUCCEED = 3
+# State of the game after each outcome
+OUTCOME_STATES = ('P', 'P', 'Failed', 'Succeeded')
+
+# Row and column offsets of the four movement actions
+MOVES = {BACKWARD: (-1, 0), RIGHT: (0, 1), FORWARD: (1, 0), LEFT: (0, -1)}
+# The same offsets indexed by action, for looking up many moves at once
+ROW_STEPS = np.array([MOVES[action][0] for action in range(4)], dtype=np.int64)
+COL_STEPS = np.array([MOVES[action][1] for action in range(4)], dtype=np.int64)
+# How far forward an agent is teleported
+TELEPORT_DISTANCE = 3
+# Agents found in a world array are numbered below TRAP, more agents need their starting cells given separately
+MAX_WORLD_AGENT = TRAP - 1
+
+
+# Split a world into its terrain and the starting cell of agents 1..numAgents, None for agents not on it
+def splitWorld(world, numAgents):
+    world = np.asarray(world)
+    agents = (world >= 1) & (world <= min(numAgents, MAX_WORLD_AGENT))
+    starts = [None] * (numAgents + 1)
+    rows, cols = np.nonzero(agents)
+    for row, col in zip(rows.tolist(), cols.tolist()):
+        starts[int(world[row, col])] = (row, col)
+    terrain = np.where(agents, SPACE, world).astype(np.int16)
+    terrain.flags.writeable = False
+    return terrain, starts
+
+
+class MazeRules:
+    # Compile the rules of a map
+    def __init__(self, world, numAgents):
+        '''
+
+        :param world: Starting world of the map, agents are treated as empty spaces
+        :param numAgents: Number of agents, agents are numbered 1 to numAgents
+        '''
+        self.height = np.size(world, 0)
+        self.width = np.size(world, 1)
+        self.numAgents = numAgents
+
+        # The map without agents, which never changes during an episode and is read-only,
+        # and the starting cell of each agent found on the map
+        self.terrain, self.agent_start = splitWorld(world, numAgents)
+
+        rows = np.arange(self.height)[:, None]
+        cols = np.arange(self.width)[None, :]
+
+        # Outcome of each movement action, the move leads to the cell at its offset unless it is BLOCKED
+        self.outcome = np.empty((self.height, self.width, len(MOVES)), dtype=np.int8)
+        for action, (row_step, col_step) in MOVES.items():
+            # Agents can only enter the rows between the top and bottom walls
+            inside = ((rows + row_step >= 1) & (rows + row_step <= self.height - 2)
+                      & (cols + col_step >= 0) & (cols + col_step < self.width))
+            # Value of the cell each move enters, rolled values that wrap around the edge are outside anyway
+            # Moves only enter spaces, traps and the goal, while a teleport lands on anything but a wall
+            entered = np.roll(self.terrain, (-row_step, -col_step), axis=(0, 1))
+            self.outcome[:, :, action] = np.where(inside, self._cellOutcome(entered, BLOCKED), BLOCKED)
+
+        # Rows a teleported agent can land on, furthest first, -1 where the edge or a wall is in the way
+        # The agent lands on the first of them that is not taken by another agent
+        # Rows are stored in int16, which holds the rows of any map up to 32767 rows high
+        row_type = np.int16 if self.height <= np.iinfo(np.int16).max else np.int32
+        self.teleport_rows = np.empty((self.height, self.width, TELEPORT_DISTANCE), dtype=row_type)
+        for distance in range(TELEPORT_DISTANCE, 0, -1):
+            inside = rows + distance <= self.height - 2
+            open_cells = np.roll(self.terrain, -distance, axis=0) != WALL
+            self.teleport_rows[:, :, TELEPORT_DISTANCE - distance] = np.where(inside & open_cells, rows + distance, -1)
+        # Row CompMazeEnv and TestEnv teleport an agent to from each row: three rows ahead when that is above the
+        # last open row, otherwise the first of one, two or three rows back that is. The agent lands there whatever
+        # is on the cell
+        self.jump_rows = [self._jumpRow(row) for row in range(self.height)]
+        # Agents already at the bottom edge are not teleported, the same for every column so it is only a view
+        self.can_teleport = np.broadcast_to(rows < self.height - 2, (self.height, self.width))
+        self.teleport_outcome = self._cellOutcome(self.terrain)
+
+    # Cells the given moves lead to, the agent stays where it is when the move is BLOCKED
+    def moveTargets(self, rows, cols, actions, outcome):
+        moved = outcome != BLOCKED
+        return rows + ROW_STEPS[actions] * moved, cols + COL_STEPS[actions] * moved
+
+    # Row the competitive envs teleport an agent on the given row to
+    def _jumpRow(self, row):
+        if row + TELEPORT_DISTANCE < self.height - 2:
+            return row + TELEPORT_DISTANCE
+        for distance in range(1, TELEPORT_DISTANCE + 1):
+            if row - distance < self.height - 2:
+                break
+        return row - distance
+
+    # Outcome of entering cells with the given values, other is the outcome of values that are none of the cells
+    # below, such as the ids of agents beyond numAgents left on the map
+    @staticmethod
+    def _cellOutcome(values, other=MOVE):
+        outcome = np.full(np.shape(values), other, dtype=np.int8)
+        outcome[values == SPACE] = MOVE
+        outcome[values == WALL] = BLOCKED
+        outcome[values == TRAP] = FAIL
+        outcome[values == GOAL] = SUCCEED
+        return outcome
@@ -0,0 +1,182 @@
+# Parallel multi-agent interface to MazeEnv, with observations, rewards, terminations and infos keyed by agent
+# Every agent acts in every step (the simultaneous mode of MazeEnv). The values of the dicts are views into
+# contiguous arrays that are updated in place, so a learner that batches the agents reads the arrays directly
+# and nothing is copied per agent. AgentVecEnv flattens every agent of many envs into one SB3 VecEnv, so one
+# forward pass of the policy serves all of them
+import numpy as np
+from gym.spaces import Discrete
+from stable_baselines3.common.vec_env import VecEnv
+
+import MazeLayers
+from MazeEnv import MazeEnv
+from Seeding import spawnSeeds
+
+
+# Name of each agent, agents are numbered 1 to numOfAgents like in the world
+def agentNames(numOfAgents):
+    return [f'agent_{agent}' for agent in range(1, numOfAgents + 1)]
+
+
+class ParallelMazeEnv:
+    # Constructor
+    def __init__(self, world, numOfAgents, **kwargs):
+        '''
+
+        :param world: Starting world of the map
+        :param numOfAgents: Number of agents, agents are numbered 1 to numOfAgents
+        :param kwargs: Passed on to MazeEnv, e.g. obs_layout, agent_start or exploration
+        '''
+        self.env = MazeEnv(world, numOfAgents, simultaneous=True, **kwargs)
+        self.numAgents = numOfAgents
+        self.possible_agents = agentNames(numOfAgents)
+        self.agents = []
+        self._observation_space = MazeLayers.observationSpace(self.env.terrain.shape, self.env.obs_layout,
+                                                              numOfAgents)
+        self._action_space = Discrete(5)
+
+        # The arrays behind the dicts, agent i is row i - 1
+        self.actions = np.zeros(numOfAgents, dtype=np.int64)
+        self.rewards = np.zeros(numOfAgents, dtype=np.float32)
+        self.terminations = np.zeros(numOfAgents, dtype=bool)
+        self.truncations = np.zeros(numOfAgents, dtype=bool)
+        # Every step returns these same dicts, their values change in place like the arrays
+        self.useObservations(self.env.observations)
+        self._rewards = self._views(self.rewards)
+        self._terminations = self._views(self.terminations)
+        self._truncations = self._views(self.truncations)
+
+    # Dict of zero dimensional views of an array with one value per agent
+    def _views(self, values):
+        return {agent: values[index, ...] for index, agent in enumerate(self.possible_agents)}
+
+    # Keep the observations in the given array shaped (numOfAgents, ...), so many envs can share one block
+    def useObservations(self, observations):
+        self.env.useObservations(observations)
+        self.observation_array = observations
+        self._observations = dict(zip(self.possible_agents, observations))
+
+    def observation_space(self, agent):
+        return self._observation_space
+
+    def action_space(self, agent):
+        return self._action_space
+
+    def _infos(self, outcomes=None):
+        state = self.env.state
+        if outcomes is None:
+            return {agent: {'state': state} for agent in self.possible_agents}
+        return {agent: {'state': state, 'outcome': outcome}
+                for agent, outcome in zip(self.possible_agents, outcomes.tolist())}
+
+    def reset(self, seed=None, options=None):
+        self.env.reset(seed=seed)
+        self.agents = list(self.possible_agents)
+        self.rewards[:] = 0
+        self.terminations[:] = False
+        self.truncations[:] = False
+        return self._observations, self._infos()
+
+    # Take a dict of actions keyed by agent, or an array with one action per agent in agent order
+    def step(self, actions):
+        if isinstance(actions, dict):
+            for index, agent in enumerate(self.possible_agents):
+                self.actions[index] = actions[agent]
+        else:
+            self.actions[:] = actions
+        _, rewards, done, info = self.env.step(self.actions)
+        self.rewards[:] = rewards
+        # The whole episode ends at once, on a trap or the goal, or when the steps run out
+        self.terminations[:] = info['state'] != 'P'
+        self.truncations[:] = done and info['state'] == 'P'
+        if done:
+            self.agents = []
+        infos = self._infos(info['outcomes'])
+        return self._observations, self._rewards, self._terminations, self._truncations, infos
+
+    def render(self):
+        return self.env.renderFrame()
+
+    def close(self):
+        self.env.close()
+
+
+# Every agent of num_envs ParallelMazeEnv copies as one VecEnv of num_envs * numOfAgents envs
+# Agent a of env e is env e * numOfAgents + a - 1, and the observations of every env live in one block
+class AgentVecEnv(VecEnv):
+    # Constructor
+    def __init__(self, world, numOfAgents, num_envs, **kwargs):
+        '''
+
+        :param world: Starting world of the map
+        :param numOfAgents: Number of agents in each env
+        :param num_envs: Number of copies of the maze
+        :param kwargs: Passed on to MazeEnv, e.g. obs_layout, agent_start or exploration
+        '''
+        self.numAgents = numOfAgents
+        self.render_mode = None
+        self.envs = [ParallelMazeEnv(world, numOfAgents, **kwargs) for _ in range(num_envs)]
+        observation_space = self.envs[0].observation_space(self.envs[0].possible_agents[0])
+        super().__init__(num_envs * numOfAgents, observation_space, Discrete(5))
+
+        # Observations of every agent of every env, each env keeps its own in a slice of the block
+        self.block = np.zeros((num_envs,) + self.envs[0].observation_array.shape, dtype=observation_space.dtype)
+        for env, observations in zip(self.envs, self.block):
+            env.useObservations(observations)
+        self.observations = self.block.reshape((self.num_envs,) + observation_space.shape)
+        self.rewards = np.zeros((num_envs, numOfAgents), dtype=np.float32)
+        self.dones = np.zeros((num_envs, numOfAgents), dtype=bool)
+
+    def reset(self):
+        for env in self.envs:
+            env.reset()
+        return self.observations.copy()
+
+    def step_async(self, actions):
+        self.actions = np.asarray(actions, dtype=np.int64).reshape(len(self.envs), self.numAgents)
+
+    def step_wait(self):
+        infos = []
+        for index, env in enumerate(self.envs):
+            *_, agent_infos = env.step(self.actions[index])
+            self.rewards[index] = env.rewards
+            done = not env.agents
+            self.dones[index] = done
+            agent_infos = list(agent_infos.values())
+            if done:
+                # One copy for all the agents of the env
+                terminal = env.observation_array.copy()
+                for agent, info in enumerate(agent_infos):
+                    info['terminal_observation'] = terminal[agent]
+                    info['TimeLimit.truncated'] = bool(env.truncations[agent])
+                env.reset()
+            infos.extend(agent_infos)
+        return self.observations.copy(), self.rewards.reshape(-1).copy(), self.dones.reshape(-1).copy(), infos
+
+    def close(self):
+        for env in self.envs:
+            env.close()
+
+    def seed(self, seed=None):
+        # One seed per maze, shared by its agents since they step together
+        seeds = spawnSeeds(seed, len(self.envs))
+        for env, env_seed in zip(self.envs, seeds):
+            env.env.seed(env_seed)
+        self.action_space.seed(seed)
+        return [env_seed for env_seed in seeds for _ in range(self.numAgents)]
+
+    # Env holding each of the given agents
+    def _agentEnvs(self, indices):
+        return [self.envs[index // self.numAgents].env for index in self._get_indices(indices)]
+
+    def get_attr(self, attr_name, indices=None):
+        return [getattr(env, attr_name) for env in self._agentEnvs(indices)]
+
+    def set_attr(self, attr_name, value, indices=None):
+        for env in self._agentEnvs(indices):
+            setattr(env, attr_name, value)
+
+    def env_method(self, method_name, *method_args, indices=None, **method_kwargs):
+        return [getattr(env, method_name)(*method_args, **method_kwargs) for env in self._agentEnvs(indices)]
+
+    def env_is_wrapped(self, wrapper_class, indices=None):
+        return [False] * len(self._get_indices(indices))
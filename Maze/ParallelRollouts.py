@@ -0,0 +1,191 @@
+# First-visit Monte Carlo rollouts in a pool of worker processes
+# Each worker owns one env with a state_index. Every round the parent writes a snapshot of the policy into a
+# shared memory block once, and hands out tasks of a fixed number of episodes, each with only a seed. A worker
+# copies the snapshot out the first time a task of the round reaches it. A task plays its episodes and sends back
+# only the sum and the count of the first-visit returns of each (state key, action) pair. Sums and counts merge
+# by adding them up, so the parent folds the tasks together in task order and improves the policy once per
+# round. The tasks and their seeds don't depend on the number of workers, so a seed gives the same policy
+# however many workers there are
+import multiprocessing as mp
+from bisect import bisect_right
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from Seeding import spawnSeeds
+from StateIndex import DenseIndex
+from TabularPolicy import TabularPolicy, firstVisitReturns
+
+# Env of the worker process
+_env = None
+# Policy snapshot the worker plays from: the round it belongs to, the cumulative action probabilities and the
+# row of each state key, None for a dense index where the key is the row
+_snapshot = (None, None, None)
+
+
+def _initWorker(env_fn):
+    global _env
+    _env = env_fn()
+
+
+def _setSnapshot(round, cumulative, keys):
+    global _snapshot
+    # Keys were given their rows in order
+    rows = None if keys is None else dict(zip(keys.tolist(), range(len(keys))))
+    _snapshot = (round, cumulative, rows)
+
+
+def _openSharedMemory(name):
+    # The parent owns the block and unlinks it at the end of the round, like SharedMemVecEnv
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+# Copy the snapshot of a round out of its shared block, the cumulative probabilities followed by the state keys
+def _loadSnapshot(round, name, shape, num_keys):
+    shm = _openSharedMemory(name)
+    try:
+        cumulative = np.ndarray(shape, dtype=np.float64, buffer=shm.buf).copy()
+        keys = None
+        if num_keys is not None:
+            keys = np.ndarray(num_keys, dtype=np.int64, buffer=shm.buf, offset=cumulative.nbytes).copy()
+    finally:
+        shm.close()
+    _setSnapshot(round, cumulative, keys)
+
+
+# Sum and count of the returns of each distinct (state key, action) pair
+def returnStats(states, actions, returns, counts=None):
+    pairs, inverse = np.unique(np.stack([states, actions], axis=1), axis=0, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    counts = np.ones(len(states), dtype=np.int64) if counts is None else counts
+    return (pairs[:, 0], pairs[:, 1], np.bincount(inverse, weights=returns, minlength=len(pairs)),
+            np.bincount(inverse, weights=counts, minlength=len(pairs)).astype(np.int64))
+
+
+# Merge the stats of many tasks, in the order given so the sums always add up the same way
+def mergeStats(stats):
+    states, actions, sums, counts = (np.concatenate(arrays) for arrays in zip(*stats))
+    return returnStats(states, actions, sums, counts)
+
+
+# Play one episode from the policy snapshot, the episode is a list of (state key, action, reward)
+def _playEpisode(env, cumulative, rows, rng):
+    env.reset()
+    num_actions = cumulative.shape[1]
+    episode = []
+    done = False
+    while not done:
+        key = env.state_index.key
+        row = key if rows is None else rows.get(key, -1)
+        # States the policy has not seen yet are played uniformly
+        if 0 <= row < len(cumulative):
+            row_sums = cumulative[row].tolist()
+            # Rounding can leave a draw just above the last cumulative sum
+            action = min(bisect_right(row_sums, rng.random() * row_sums[-1]), num_actions - 1)
+        else:
+            action = int(rng.integers(num_actions))
+        observation, reward, done, info = env.step(action)
+        episode.append((key, action, reward))
+    return episode
+
+
+def _rolloutTask(task):
+    round, snapshot, seed, num_episodes = task
+    if _snapshot[0] != round:
+        _loadSnapshot(round, *snapshot)
+    _, cumulative, rows = _snapshot
+    rng = np.random.default_rng(seed)
+    episodes = [_playEpisode(_env, cumulative, rows, rng) for _ in range(num_episodes)]
+    return returnStats(*firstVisitReturns(episodes, cumulative.shape[1])) + (sum(map(len, episodes)),)
+
+
+class RolloutPool:
+    # Constructor
+    def __init__(self, env_fn, num_workers=None, episodes_per_task=16, start_method=None):
+        '''
+
+        :param env_fn: Function that creates one env, it must be picklable and the env must have a state_index
+        :param num_workers: Number of worker processes, one per CPU by default, 0 plays the tasks in this process
+        :param episodes_per_task: Episodes played by each task, fixed so the tasks don't depend on the workers
+        :param start_method: multiprocessing start method, forkserver where available like SharedMemVecEnv
+        '''
+        # The parent keeps its own index to turn the state keys the workers send back into policy rows
+        self.state_index = env_fn().state_index
+        if self.state_index is None:
+            raise ValueError("The env needs a state_index for tabular rollouts")
+        self.episodes_per_task = episodes_per_task
+        self.steps = 0
+        # Rounds played so far, which tells the workers when their snapshot is out of date
+        self.rounds = 0
+        self.pool = None
+        if num_workers == 0:
+            _initWorker(env_fn)
+            return
+        if start_method is None:
+            start_method = 'forkserver' if 'forkserver' in mp.get_all_start_methods() else 'spawn'
+        self.pool = mp.get_context(start_method).Pool(num_workers, initializer=_initWorker, initargs=(env_fn,))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+
+    # Play num_episodes episodes from a snapshot of the policy, returns the merged stats of every task
+    def rollouts(self, policy, num_episodes, seed=None):
+        self.rounds += 1
+        cumulative = np.ascontiguousarray(policy.cumulative, dtype=np.float64)
+        keys = None
+        if not isinstance(self.state_index, DenseIndex):
+            keys = np.fromiter(self.state_index.rows, dtype=np.int64, count=len(self.state_index.rows))
+        sizes = [min(self.episodes_per_task, num_episodes - start)
+                 for start in range(0, num_episodes, self.episodes_per_task)]
+        seeds = spawnSeeds(seed, len(sizes))
+        if self.pool is None:
+            _setSnapshot(self.rounds, cumulative, keys)
+            results = [_rolloutTask((self.rounds, None, task_seed, size)) for task_seed, size in zip(seeds, sizes)]
+        else:
+            results = self._mapTasks(cumulative, keys, seeds, sizes)
+        self.steps += sum(result[-1] for result in results)
+        return mergeStats([result[:-1] for result in results])
+
+    # Share the snapshot through one block for the round, so the tasks only carry its name and their seeds
+    def _mapTasks(self, cumulative, keys, seeds, sizes):
+        num_keys = None if keys is None else len(keys)
+        shm = shared_memory.SharedMemory(create=True, size=max(cumulative.nbytes + (num_keys or 0) * 8, 1))
+        try:
+            np.ndarray(cumulative.shape, dtype=np.float64, buffer=shm.buf)[:] = cumulative
+            if keys is not None:
+                np.ndarray(num_keys, dtype=np.int64, buffer=shm.buf, offset=cumulative.nbytes)[:] = keys
+            snapshot = (shm.name, cumulative.shape, num_keys)
+            tasks = [(self.rounds, snapshot, task_seed, size) for task_seed, size in zip(seeds, sizes)]
+            return self.pool.map(_rolloutTask, tasks, chunksize=1)
+        finally:
+            shm.close()
+            shm.unlink()
+
+    # Fold merged stats into the policy and improve the states they visited
+    def learn(self, policy, stats):
+        keys, actions, sums, counts = stats
+        rows = np.array([self.state_index.row(key) for key in keys.tolist()], dtype=np.int64)
+        policy.grow(int(rows.max(initial=-1)) + 1)
+        policy.addReturns(rows, actions, sums, counts)
+        policy.improve(rows)
+
+    # First-visit Monte Carlo with the policy improved after every batch of episodes
+    def train(self, policy=None, episodes=100, batch_size=64, epsilon=0.01, seed=None):
+        if policy is None:
+            policy = TabularPolicy(self.state_index.size, epsilon=epsilon, seed=seed)
+        policy.epsilon = epsilon
+        starts = range(0, episodes, batch_size)
+        for start, batch_seed in zip(starts, spawnSeeds(seed, len(starts))):
+            self.learn(policy, self.rollouts(policy, min(batch_size, episodes - start), batch_seed))
+        return policy
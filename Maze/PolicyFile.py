@@ -0,0 +1,157 @@
+# Policy file of the tabular learners, read through a memory map
+# The file is an 8 byte magic, a JSON header padded to HEADER_SIZE bytes, then the state keys, sorted, when the
+# states are not numbered densely, then the (num_states, num_actions) table of action probabilities as float16
+# or float32. Loading only reads the header and maps the arrays, so it takes the same time for any size of policy,
+# and every evaluator process that maps the same file shares one copy of it in the page cache.
+# The header records the map the policy was learned on, the number of actions and how states become rows:
+# - 'dense': the state is the row, see StateIndex.DenseIndex
+# - 'zobrist': the row of a StateIndex.ZobristIndex key is found by binary search in the sorted keys
+# - 'keys': any other integer state keys, found the same way, e.g. policies converted from old .sav pickles
+import hashlib
+import json
+from bisect import bisect_right
+
+import numpy as np
+
+from StateIndex import DenseIndex
+
+MAGIC = b'MAZEPOL1'
+HEADER_SIZE = 504
+VERSION = 1
+SCHEMES = ['dense', 'zobrist', 'keys']
+# Arrays start on a multiple of this, so they stay aligned for any dtype
+ALIGNMENT = 64
+
+
+# Hash of the terrain of a map, so a policy isn't used on a map it wasn't learned on
+def mapHash(terrain):
+    terrain = np.ascontiguousarray(terrain, dtype=np.int16)
+    return hashlib.sha256(str(terrain.shape).encode() + terrain.tobytes()).hexdigest()
+
+
+def _align(offset):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+# Write the action probabilities of a table with one row per state
+# keys gives the state key of each row for the 'zobrist' and 'keys' schemes, rows are stored sorted by key
+def save(path, probs, scheme, map_hash='', keys=None, dtype=np.float16, num_agents=None):
+    if scheme not in SCHEMES:
+        raise ValueError(f"Unsupported scheme: {scheme}")
+    probs = np.asarray(probs)
+    num_states, num_actions = probs.shape
+    header = {'version': VERSION, 'scheme': scheme, 'map_hash': map_hash, 'num_agents': num_agents,
+              'num_states': num_states, 'num_actions': num_actions, 'dtype': np.dtype(dtype).str}
+    offset = _align(len(MAGIC) + HEADER_SIZE)
+    if scheme == 'dense':
+        header['keys_offset'] = None
+    else:
+        keys = np.asarray(keys, dtype=np.int64)
+        order = np.argsort(keys, kind='stable')
+        keys, probs = keys[order], probs[order]
+        header['keys_offset'] = offset
+        offset = _align(offset + keys.nbytes)
+    header['probs_offset'] = offset
+    text = json.dumps(header).encode()
+    if len(text) > HEADER_SIZE:
+        raise ValueError("Policy header is too long")
+    with open(path, 'wb') as file:
+        file.write(MAGIC + text.ljust(HEADER_SIZE))
+        if scheme != 'dense':
+            file.seek(header['keys_offset'])
+            file.write(keys.tobytes())
+        file.seek(offset)
+        file.write(np.ascontiguousarray(probs, dtype=dtype).tobytes())
+
+
+# Write a TabularPolicy with the state index its rows come from
+def savePolicy(path, policy, state_index, terrain, dtype=np.float16):
+    if isinstance(state_index, DenseIndex):
+        save(path, policy.probs[:state_index.size], 'dense', mapHash(terrain), dtype=dtype,
+             num_agents=state_index.numAgents)
+        return
+    # Only the rows the index has given out hold states
+    keys = np.array(list(state_index.rows), dtype=np.int64)
+    rows = np.array(list(state_index.rows.values()), dtype=np.int64)
+    save(path, policy.probs[rows], 'zobrist', mapHash(terrain), keys, dtype, state_index.numAgents)
+
+
+class PolicyFile:
+    # Constructor
+    def __init__(self, path):
+        '''
+
+        :param path: Policy file written by save()
+        '''
+        with open(path, 'rb') as file:
+            magic = file.read(len(MAGIC))
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a policy file")
+            self.header = json.loads(file.read(HEADER_SIZE))
+        if self.header['version'] != VERSION:
+            raise ValueError(f"Unsupported policy file version: {self.header['version']}")
+        self.scheme = self.header['scheme']
+        self.map_hash = self.header['map_hash']
+        self.num_states = self.header['num_states']
+        self.num_actions = self.header['num_actions']
+        # An empty table can't be mapped
+        shape = (self.num_states, self.num_actions)
+        if self.num_states:
+            self.probs = np.memmap(path, dtype=np.dtype(self.header['dtype']), mode='r',
+                                   offset=self.header['probs_offset'], shape=shape)
+        else:
+            self.probs = np.zeros(shape, dtype=np.dtype(self.header['dtype']))
+        self.keys = None
+        if self.scheme != 'dense':
+            self.keys = np.memmap(path, dtype=np.int64, mode='r', offset=self.header['keys_offset'],
+                                  shape=(self.num_states,)) if self.num_states else np.zeros(0, dtype=np.int64)
+
+    # Raise if the policy was learned on another map
+    def checkMap(self, terrain):
+        if self.map_hash and self.map_hash != mapHash(terrain):
+            raise ValueError("The policy was learned on a different map")
+
+    # Row of a state key, None for states the policy has never seen
+    def row(self, key):
+        if self.keys is None:
+            return key if 0 <= key < self.num_states else None
+        row = int(np.searchsorted(self.keys, key))
+        if row < self.num_states and self.keys[row] == key:
+            return row
+        return None
+
+    # Action probabilities of a state, uniform for states the policy has never seen
+    def actionProbs(self, key):
+        row = self.row(key)
+        if row is None:
+            return np.full(self.num_actions, 1 / self.num_actions, dtype=np.float32)
+        return self.probs[row].astype(np.float32)
+
+    def sampleOne(self, key, rng):
+        cumulative = np.cumsum(self.actionProbs(key)).tolist()
+        return min(bisect_right(cumulative, rng.random() * cumulative[-1]), self.num_actions - 1)
+
+
+# Convert a policy pickled with joblib, either a TabularPolicy or the dict of {state: {action: probability}}
+# that test.py used to save, into a policy file
+def convertSav(sav_path, path, scheme=None, map_hash='', dtype=np.float16):
+    try:
+        import joblib
+        policy = joblib.load(sav_path)
+    except ImportError:
+        # Pickles of plain Python objects load the same without joblib
+        import pickle
+        with open(sav_path, 'rb') as file:
+            policy = pickle.load(file)
+    if isinstance(policy, dict):
+        keys = sorted(policy)
+        num_actions = max(len(actions) for actions in policy.values()) if policy else 0
+        probs = np.zeros((len(keys), num_actions), dtype=np.float32)
+        for row, key in enumerate(keys):
+            for action, prob in policy[key].items():
+                probs[row, action] = prob
+        # Policies saved before the e-soft update was fixed can hold slightly negative probabilities
+        np.clip(probs, 0, None, out=probs)
+        save(path, probs, scheme or 'keys', map_hash, keys, dtype)
+    else:
+        save(path, policy.probs, scheme or 'dense', map_hash, dtype=dtype)
@@ -0,0 +1,10 @@
+# Seeds for batches of environments
+# Every env gets a seed from its own child of a SeedSequence, so the streams are independent,
+# the same seed always gives the same seeds, and they are plain ints that can be saved with
+# trajectories and checkpoints
+import numpy as np
+
+
+# Derive one seed per environment from a single seed, None draws fresh entropy
+def spawnSeeds(seed, count):
+    return [int(child.generate_state(1)[0]) for child in np.random.SeedSequence(seed).spawn(count)]
@@ -0,0 +1,230 @@
+# Vector env that steps MazeEnv or CompMazeEnv copies in worker processes
+# The actions, observations, rewards, dones and states of every env live in one shared memory block,
+# so a step only sends a short command to each worker and waits for a one byte reply, instead of
+# pickling every observation through a pipe like SubprocVecEnv
+import multiprocessing as mp
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+from stable_baselines3.common.vec_env import VecEnv
+from stable_baselines3.common.vec_env.base_vec_env import CloudpickleWrapper
+
+from BatchedMazeEnv import STATE_NAMES
+from Seeding import spawnSeeds
+
+
+# Offset, shape and dtype of each array in the shared block
+def _makeLayout(num_envs, obs_shape, obs_dtype, num_rewards):
+    layout = {}
+    offset = 0
+    for name, shape, dtype in [
+        ('actions', (num_envs,), np.int64),
+        ('observations', (num_envs,) + tuple(obs_shape), obs_dtype),
+        ('terminal_observations', (num_envs,) + tuple(obs_shape), obs_dtype),
+        ('rewards', (num_envs, num_rewards), np.float32),
+        ('dones', (num_envs,), np.bool_),
+        ('states', (num_envs,), np.int8),
+    ]:
+        dtype = np.dtype(dtype)
+        layout[name] = (offset, shape, dtype.str)
+        # Keep every array aligned to 8 bytes
+        offset += -(-int(np.prod(shape)) * dtype.itemsize // 8) * 8
+    return layout, offset
+
+
+def _attach(buffer, layout):
+    return {name: np.ndarray(shape, dtype=np.dtype(dtype), buffer=buffer, offset=offset)
+            for name, (offset, shape, dtype) in layout.items()}
+
+
+def _openSharedMemory(name):
+    # The parent owns the block and unlinks it in close()
+    # Before Python 3.13 the block can't be opened untracked, but the workers share the parent's
+    # resource tracker, so registering the same name again is harmless
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+def _worker(remote, parent_remote, env_fns_wrapper, indices):
+    parent_remote.close()
+    envs = [env_fn() for env_fn in env_fns_wrapper.var]
+    shm = None
+    arrays = None
+
+    # Step an env and write the results into the shared block, resetting it when the episode is over
+    def stepEnv(index, env, action):
+        obs, *rewards, done, info = env.step(action)
+        arrays['rewards'][index] = rewards
+        arrays['dones'][index] = done
+        arrays['states'][index] = STATE_NAMES.index(info['state'])
+        if done:
+            arrays['terminal_observations'][index] = obs
+            obs = env.reset()
+        arrays['observations'][index] = obs
+
+    try:
+        while True:
+            command, data = remote.recv()
+            if command == 'step':
+                for index, env in zip(indices, envs):
+                    stepEnv(index, env, int(arrays['actions'][index]))
+                remote.send_bytes(b'1')
+            elif command == 'reset':
+                for index, env in zip(indices, envs):
+                    arrays['observations'][index] = env.reset()
+                remote.send_bytes(b'1')
+            elif command == 'attach':
+                shm = _openSharedMemory(data[0])
+                arrays = _attach(shm.buf, data[1])
+                remote.send_bytes(b'1')
+            elif command == 'get_spaces':
+                remote.send((envs[0].observation_space, envs[0].action_space))
+            # The remaining commands are only applied to the envs the parent asked for
+            elif command == 'get_attr':
+                attr_name, wanted = data
+                remote.send([getattr(env, attr_name) for index, env in zip(indices, envs) if index in wanted])
+            elif command == 'set_attr':
+                attr_name, value, wanted = data
+                for index, env in zip(indices, envs):
+                    if index in wanted:
+                        setattr(env, attr_name, value)
+                remote.send([])
+            elif command == 'env_method':
+                method_name, args, kwargs, wanted = data
+                remote.send([getattr(env, method_name)(*args, **kwargs)
+                             for index, env in zip(indices, envs) if index in wanted])
+            elif command == 'close':
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        arrays = None
+        if shm is not None:
+            shm.close()
+        remote.close()
+
+
+class SharedMemVecEnv(VecEnv):
+    # Constructor
+    def __init__(self, env_fns, num_workers=None, num_rewards=1, start_method=None):
+        '''
+
+        :param env_fns: Functions that each create one env
+        :param num_workers: Number of worker processes, the envs are split evenly between them (one per env by default)
+        :param num_rewards: 1 for MazeEnv, 2 for CompMazeEnv which returns a reward for each team
+        :param start_method: multiprocessing start method, forkserver where available like SubprocVecEnv
+        '''
+        num_envs = len(env_fns)
+        num_workers = num_envs if num_workers is None else min(num_workers, num_envs)
+        self.num_rewards = num_rewards
+        self.waiting = False
+        self.closed = False
+        self.render_mode = None
+
+        if start_method is None:
+            start_method = 'forkserver' if 'forkserver' in mp.get_all_start_methods() else 'spawn'
+        ctx = mp.get_context(start_method)
+        # Start the resource tracker before the workers so they all share it with the parent
+        resource_tracker.ensure_running()
+
+        # Contiguous chunks of envs for each worker
+        self.worker_indices = [chunk.tolist() for chunk in np.array_split(np.arange(num_envs), num_workers)]
+        self.remotes = []
+        self.processes = []
+        for indices in self.worker_indices:
+            remote, work_remote = ctx.Pipe()
+            env_fns_wrapper = CloudpickleWrapper([env_fns[i] for i in indices])
+            process = ctx.Process(target=_worker, args=(work_remote, remote, env_fns_wrapper, indices), daemon=True)
+            process.start()
+            work_remote.close()
+            self.remotes.append(remote)
+            self.processes.append(process)
+
+        self.remotes[0].send(('get_spaces', None))
+        observation_space, action_space = self.remotes[0].recv()
+        super().__init__(num_envs, observation_space, action_space)
+
+        layout, size = _makeLayout(num_envs, observation_space.shape, observation_space.dtype, num_rewards)
+        self.shm = shared_memory.SharedMemory(create=True, size=size)
+        self.arrays = _attach(self.shm.buf, layout)
+        self._sendAll(('attach', (self.shm.name, layout)))
+        self._waitAll()
+
+    def _sendAll(self, message):
+        for remote in self.remotes:
+            remote.send(message)
+
+    def _waitAll(self):
+        for remote in self.remotes:
+            remote.recv_bytes()
+
+    def reset(self):
+        self._sendAll(('reset', None))
+        self._waitAll()
+        return self.arrays['observations'].copy()
+
+    def step_async(self, actions):
+        self.arrays['actions'][:] = np.asarray(actions).reshape(self.num_envs)
+        self._sendAll(('step', None))
+        self.waiting = True
+
+    def step_wait(self):
+        self._waitAll()
+        self.waiting = False
+
+        dones = self.arrays['dones'].copy()
+        rewards = self.arrays['rewards'].copy()
+        if self.num_rewards == 1:
+            rewards = rewards[:, 0]
+        infos = [{'state': STATE_NAMES[state]} for state in self.arrays['states'].tolist()]
+        for env in np.nonzero(dones)[0].tolist():
+            infos[env]['terminal_observation'] = self.arrays['terminal_observations'][env].copy()
+        return self.arrays['observations'].copy(), rewards, dones, infos
+
+    def close(self):
+        if self.closed:
+            return
+        if self.waiting:
+            self._waitAll()
+        self._sendAll(('close', None))
+        for process in self.processes:
+            process.join()
+        self.arrays = None
+        self.shm.close()
+        self.shm.unlink()
+        self.closed = True
+
+    # Every env is seeded with its own seed derived from the given one, so the workers draw independent streams
+    def seed(self, seed=None):
+        seeds = spawnSeeds(seed, self.num_envs)
+        for index, env_seed in enumerate(seeds):
+            self.env_method('seed', env_seed, indices=[index])
+        return seeds
+
+    # Send a command for some of the envs to the workers running them, results come back in the order asked for
+    def _callWorkers(self, command, data, indices):
+        indices = list(self._get_indices(indices))
+        wanted = set(indices)
+        remotes = [remote for remote, worker_indices in zip(self.remotes, self.worker_indices)
+                   if wanted.intersection(worker_indices)]
+        for remote in remotes:
+            remote.send((command, data + (wanted,)))
+        results = []
+        for remote in remotes:
+            results.extend(remote.recv())
+        by_index = dict(zip(sorted(wanted), results))
+        return [by_index.get(index) for index in indices]
+
+    def get_attr(self, attr_name, indices=None):
+        return self._callWorkers('get_attr', (attr_name,), indices)
+
+    def set_attr(self, attr_name, value, indices=None):
+        self._callWorkers('set_attr', (attr_name, value), indices)
+
+    def env_method(self, method_name, *method_args, indices=None, **method_kwargs):
+        return self._callWorkers('env_method', (method_name, method_args, method_kwargs), indices)
+
+    def env_is_wrapped(self, wrapper_class, indices=None):
+        return [False] * len(self._get_indices(indices))
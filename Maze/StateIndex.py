@@ -0,0 +1,123 @@
+# State keys of maze configurations for the tabular learners
+# A configuration is the cell of every agent plus the agent whose turn it is. The terrain never changes, so it
+# is left out. Both indexes keep the key of the current configuration and update it in O(1) when an agent
+# moves or the turn passes, instead of hashing the whole world at every step:
+# - 'zobrist' XORs a random 64 bit key for each (agent, cell) and for the current agent, so it works on any
+#   map, and numbers the keys it sees in order to give each state a row
+# - 'dense' numbers every placement of the agents over the open cells directly, so every state has a fixed
+#   row without a lookup, for maps small enough for that to fit
+import numpy as np
+
+from MazeRules import WALL
+
+STATE_INDEXES = ['zobrist', 'dense']
+# Largest number of rows the dense index may need
+MAX_DENSE_STATES = 1 << 26
+
+
+class ZobristIndex:
+    # Constructor
+    def __init__(self, terrain, numAgents, seed=0):
+        '''
+
+        :param terrain: Terrain of the map, only its shape is used
+        :param numAgents: Number of agents, agents are numbered 1 to numAgents
+        :param seed: Seed of the random keys, the same seed always gives the same keys
+        '''
+        self.numAgents = numAgents
+        self.height, self.width = np.shape(terrain)
+        rng = np.random.default_rng(seed)
+        keys = rng.integers(1, 1 << 63, size=(numAgents + 1, self.height * self.width + numAgents + 1),
+                            dtype=np.int64)
+        # Python ints are much faster to XOR one at a time than NumPy scalars
+        self.cell_keys = [row[:self.height * self.width] for row in keys.tolist()]
+        self.turn_keys = keys[0, self.height * self.width:].tolist()
+        self.key = 0
+        # Row of each key seen so far
+        self.rows = {}
+
+    # Key of a configuration from scratch
+    def reset(self, agent_pos, current_agent):
+        key = self.turn_keys[current_agent]
+        for agent, pos in enumerate(agent_pos):
+            if pos is not None:
+                key ^= self.cell_keys[agent][pos[0] * self.width + pos[1]]
+        self.key = key
+
+    # An agent moves from one cell to another, None for off the map
+    def move(self, agent, old_pos, new_pos):
+        keys = self.cell_keys[agent]
+        if old_pos is not None:
+            self.key ^= keys[old_pos[0] * self.width + old_pos[1]]
+        if new_pos is not None:
+            self.key ^= keys[new_pos[0] * self.width + new_pos[1]]
+
+    def turn(self, old_agent, new_agent):
+        self.key ^= self.turn_keys[old_agent] ^ self.turn_keys[new_agent]
+
+    # Row of a key, keys seen for the first time get the next row
+    def row(self, key):
+        return self.rows.setdefault(key, len(self.rows))
+
+    # Number of rows given out so far
+    @property
+    def size(self):
+        return len(self.rows)
+
+
+class DenseIndex:
+    # Constructor
+    def __init__(self, terrain, numAgents, max_states=MAX_DENSE_STATES):
+        '''
+
+        :param terrain: Terrain of the map
+        :param numAgents: Number of agents, agents are numbered 1 to numAgents
+        :param max_states: Largest number of rows allowed, bigger maps have to use the zobrist index
+        '''
+        terrain = np.asarray(terrain)
+        self.numAgents = numAgents
+        self.height, self.width = terrain.shape
+        # Agents can only stand on the open cells between the top and bottom rows, the last number is off the map
+        open_cells = np.zeros(terrain.shape, dtype=bool)
+        open_cells[1:-1] = terrain[1:-1] != WALL
+        numbers = np.full(terrain.shape, -1, dtype=np.int64)
+        numbers[open_cells] = np.arange(np.count_nonzero(open_cells))
+        self.radix = int(np.count_nonzero(open_cells)) + 1
+        self.size = self.radix ** numAgents * numAgents
+        if self.size > max_states:
+            raise ValueError(f"A dense index of {numAgents} agents on this map needs {self.size} states, "
+                             f"more than {max_states}")
+        self.cell_numbers = numbers.reshape(-1).tolist()
+        # The turn is the lowest digit, then agent 1, agent 2 and so on
+        self.weights = [0] + [numAgents * self.radix ** (agent - 1) for agent in range(1, numAgents + 1)]
+        self.off_map = self.radix - 1
+        self.key = 0
+
+    def _number(self, pos):
+        if pos is None:
+            return self.off_map
+        return self.cell_numbers[pos[0] * self.width + pos[1]]
+
+    def reset(self, agent_pos, current_agent):
+        key = current_agent - 1
+        for agent in range(1, len(self.weights)):
+            key += self._number(agent_pos[agent]) * self.weights[agent]
+        self.key = key
+
+    def move(self, agent, old_pos, new_pos):
+        self.key += (self._number(new_pos) - self._number(old_pos)) * self.weights[agent]
+
+    def turn(self, old_agent, new_agent):
+        self.key += new_agent - old_agent
+
+    # The key is already the row
+    def row(self, key):
+        return key
+
+
+def makeIndex(kind, terrain, numAgents):
+    if kind == 'zobrist':
+        return ZobristIndex(terrain, numAgents)
+    if kind == 'dense':
+        return DenseIndex(terrain, numAgents)
+    raise ValueError(f"Unsupported state_index: {kind}")
@@ -0,0 +1,129 @@
+# Per-phase timers for the step() and reset() of the maze environments
+# Profiling installs timed copies of the phase methods on one env instance and removing them puts the
+# class methods back, so an env that isn't being profiled runs exactly the same code as one without a profiler
+import time
+
+# Methods timed as phases, a method missing from an env is skipped
+PHASES = ['step', 'reset', 'moveAgent', 'teleportAgent', 'moveAll', 'teleportAll', 'drawMaze', 'render',
+          'createObservation', '_resetAgents']
+# Writes to the episode log are timed as one more phase
+LOG_PHASE = 'log'
+# Histogram buckets are powers of two nanoseconds, bucket i counts times below 2**i ns
+NUM_BUCKETS = 40
+
+
+class PhaseStats:
+    # Constructor
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.count = 0
+        # Time including the phases called from this one, and time spent in this phase alone
+        self.total_ns = 0
+        self.self_ns = 0
+        self.min_ns = None
+        self.max_ns = 0
+        self.histogram = [0] * NUM_BUCKETS
+
+    def add(self, elapsed, own):
+        self.count += 1
+        self.total_ns += elapsed
+        self.self_ns += own
+        if self.min_ns is None or elapsed < self.min_ns:
+            self.min_ns = elapsed
+        if elapsed > self.max_ns:
+            self.max_ns = elapsed
+        self.histogram[min(elapsed.bit_length(), NUM_BUCKETS - 1)] += 1
+
+    # Upper bound of the given percentile, read from the histogram
+    def percentile(self, fraction):
+        seen = 0
+        for bucket, count in enumerate(self.histogram):
+            seen += count
+            if seen >= fraction * self.count:
+                return min(2 ** bucket, self.max_ns)
+        return self.max_ns
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'total_ms': self.total_ns / 1e6,
+            'self_ms': self.self_ns / 1e6,
+            'mean_us': self.total_ns / self.count / 1e3,
+            'min_us': self.min_ns / 1e3,
+            'max_us': self.max_ns / 1e3,
+            'p50_us': self.percentile(0.5) / 1e3,
+            'p90_us': self.percentile(0.9) / 1e3,
+            'p99_us': self.percentile(0.99) / 1e3,
+            # Count of calls faster than each power of two microseconds
+            'histogram_us': {2 ** bucket / 1e3: count for bucket, count in enumerate(self.histogram) if count},
+        }
+
+
+# Passes everything through to the episode log, timing the writes
+class _TimedLog:
+    # Constructor
+    def __init__(self, log, timed_write):
+        self._log = log
+        self.write = timed_write
+
+    def __getattr__(self, name):
+        return getattr(self._log, name)
+
+
+class StepProfiler:
+    # Constructor
+    def __init__(self, env):
+        '''
+
+        :param env: Environment whose phases are timed
+        '''
+        self.env = env
+        self.phases = [phase for phase in PHASES if hasattr(env, phase)]
+        self.enabled = False
+        self.stats = {phase: PhaseStats() for phase in self.phases + [LOG_PHASE]}
+        # Time spent in the phases called from the phase that is running
+        self._child_ns = 0
+
+    # Wrap a method so every call adds its time to the stats of a phase
+    def _timed(self, phase, method):
+        counter = time.perf_counter_ns
+        stats = self.stats[phase]
+
+        def timed(*args, **kwargs):
+            outer_child_ns = self._child_ns
+            self._child_ns = 0
+            start = counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                elapsed = counter() - start
+                stats.add(elapsed, elapsed - self._child_ns)
+                self._child_ns = outer_child_ns + elapsed
+        return timed
+
+    def enable(self):
+        if self.enabled:
+            return
+        for phase in self.phases:
+            setattr(self.env, phase, self._timed(phase, getattr(self.env, phase)))
+        self.env.log = _TimedLog(self.env.log, self._timed(LOG_PHASE, self.env.log.write))
+        self.enabled = True
+
+    # Remove the timed methods, so the class methods are called again
+    def disable(self):
+        if not self.enabled:
+            return
+        for phase in self.phases:
+            delattr(self.env, phase)
+        self.env.log = self.env.log._log
+        self.enabled = False
+
+    # Summary of every phase that has run since the last clear
+    def summary(self):
+        return {phase: stats.summary() for phase, stats in self.stats.items() if stats.count}
+
+    def clear(self):
+        for stats in self.stats.values():
+            stats.clear()
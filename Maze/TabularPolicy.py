@@ -0,0 +1,120 @@
+# Dense storage of the action values and the epsilon-soft policy of the tabular learners
+# Q, the policy and the visit counts are (num_states, num_actions) arrays instead of a dict of dicts per state,
+# so sampling, greedy choices and policy improvement are whole-row NumPy operations, and many states or
+# many episodes are updated in one call
+from bisect import bisect_right
+from itertools import chain
+
+import numpy as np
+
+
+# First visit of each state-action pair in each episode, with the return that follows it
+# Episodes are lists of (state, action, reward) timesteps, states can be rows or any 64 bit state keys.
+# Returns the states, actions and returns of the first visits, in one vectorized pass over all the timesteps
+def firstVisitReturns(episodes, num_actions):
+    lengths = np.array([len(episode) for episode in episodes], dtype=np.int64)
+    if not lengths.sum():
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0)
+    states, actions, rewards = zip(*chain.from_iterable(episodes))
+    states = np.array(states, dtype=np.int64)
+    actions = np.array(actions, dtype=np.int64)
+    # Sum of the rewards from each timestep to the end of everything, then to the end of its own episode
+    tail = np.append(np.cumsum(np.array(rewards[::-1], dtype=np.float64))[::-1], 0.0)
+    ends = np.cumsum(lengths)
+    returns = tail[:-1] - np.repeat(tail[ends], lengths)
+    # Pairs are numbered per episode, so the first index of each number is a first visit in its episode
+    episode_ids = np.repeat(np.arange(len(episodes)), lengths)
+    lowest = int(states.min())
+    span = int(states.max()) - lowest + 1
+    if len(episodes) * span * num_actions < 1 << 62:
+        _, first = np.unique((episode_ids * span + (states - lowest)) * num_actions + actions, return_index=True)
+    else:
+        # State keys too spread out to number the pairs in 64 bits
+        _, first = np.unique(np.stack([episode_ids, states, actions], axis=1), axis=0, return_index=True)
+    return states[first], actions[first], returns[first]
+
+
+class TabularPolicy:
+    # Constructor
+    def __init__(self, num_states, num_actions=5, epsilon=0.01, seed=None):
+        '''
+
+        :param num_states: Number of states, states are numbered 0 to num_states - 1
+        :param num_actions: Number of actions
+        :param epsilon: Probability spread evenly over the actions of a state, the rest goes to the greedy one
+        :param seed: Seed of the random stream used to sample actions and break ties
+        '''
+        self.num_states = num_states
+        self.num_actions = num_actions
+        self.epsilon = epsilon
+        self.q = np.zeros((num_states, num_actions), dtype=np.float32)
+        # Every policy starts uniform
+        self.probs = np.full((num_states, num_actions), 1 / num_actions, dtype=np.float32)
+        # Cumulative sums of each row of the policy, kept up to date by improve() so sampling doesn't redo them
+        self.cumulative = np.cumsum(self.probs, axis=1)
+        # Number of returns averaged into each Q value
+        self.counts = np.zeros((num_states, num_actions), dtype=np.uint32)
+        self.seed(seed)
+
+    # Add rows for new states, the table at least doubles so adding states one at a time stays cheap
+    def grow(self, num_states):
+        if num_states <= self.num_states:
+            return
+        extra = max(num_states, 2 * self.num_states) - self.num_states
+        uniform = np.full((extra, self.num_actions), 1 / self.num_actions, dtype=np.float32)
+        self.q = np.concatenate([self.q, np.zeros((extra, self.num_actions), dtype=np.float32)])
+        self.probs = np.concatenate([self.probs, uniform])
+        self.cumulative = np.concatenate([self.cumulative, np.cumsum(uniform, axis=1)])
+        self.counts = np.concatenate([self.counts, np.zeros((extra, self.num_actions), dtype=np.uint32)])
+        self.num_states += extra
+
+    def seed(self, seed=None):
+        self.np_random = np.random.default_rng(seed)
+        return [seed]
+
+    # Sample one action for each of the given states from the policy
+    def sample(self, states):
+        cumulative = self.cumulative[states]
+        draws = self.np_random.random(np.shape(states)) * cumulative[..., -1]
+        actions = (cumulative <= draws[..., None]).sum(axis=-1)
+        # Rounding can leave a draw just above the last cumulative sum
+        return np.minimum(actions, self.num_actions - 1)
+
+    # A bisect over a list of the row is quicker than NumPy for a single state, clamped like sample()
+    def sampleOne(self, state):
+        cumulative = self.cumulative[state].tolist()
+        return min(bisect_right(cumulative, self.np_random.random() * cumulative[-1]), self.num_actions - 1)
+
+    # Action with the highest value in each of the given states, ties are broken at random
+    def greedy(self, states):
+        q = self.q[states]
+        best = q == q.max(axis=-1, keepdims=True)
+        return np.argmax(np.where(best, self.np_random.random(q.shape), -1.0), axis=-1)
+
+    # Fold returns into the running means of Q, a state-action pair can appear several times in one call
+    def update(self, states, actions, returns):
+        pairs, inverse, counts = np.unique(np.asarray(states) * self.num_actions + actions, return_inverse=True,
+                                           return_counts=True)
+        rows, cols = np.divmod(pairs, self.num_actions)
+        self.addReturns(rows, cols, np.bincount(inverse, weights=returns), counts)
+
+    # Fold the sum and the count of the new returns of each state-action pair into the running means of Q
+    # Each pair can only appear once in a call
+    def addReturns(self, states, actions, sums, counts):
+        q = self.q[states, actions].astype(np.float64)
+        self.counts[states, actions] += np.asarray(counts, dtype=np.uint32)
+        # The new mean is (old mean * old count + sum) / new count
+        self.q[states, actions] = q + (sums - counts * q) / self.counts[states, actions]
+
+    # Make the policy of the given states epsilon-soft around their greedy action
+    def improve(self, states):
+        states = np.unique(states)
+        self.probs[states] = self.epsilon / self.num_actions
+        self.probs[states, self.greedy(states)] += 1 - self.epsilon
+        self.cumulative[states] = np.cumsum(self.probs[states], axis=1)
+
+    # Learn from a batch of episodes with first-visit Monte Carlo, then improve the states they visited
+    def updateFromEpisodes(self, episodes):
+        states, actions, returns = firstVisitReturns(episodes, self.num_actions)
+        self.update(states, actions, returns)
+        self.improve(states)
@@ -0,0 +1,208 @@
+# Compact binary record of MazeEnv episodes
+# MazeEnv is deterministic, so an episode is fully described by its map, the options of the env and its actions.
+# Each step is stored as one uint8 action and one float32 reward (one of each per agent when the agents act
+# simultaneously), and any world of the episode is rebuilt by stepping a fresh MazeEnv through the stored actions
+import hashlib
+
+import gym
+import numpy as np
+
+from MazeEnv import MazeEnv
+
+# Seed stored for episodes that were not reset with one
+NO_SEED = -1
+
+
+# Hash of a map, used to check a trajectory is replayed on the map it was recorded on
+def mapHash(world):
+    world = np.ascontiguousarray(world, dtype=np.int16)
+    return hashlib.sha1(str(world.shape).encode() + world.tobytes()).hexdigest()
+
+
+class Trajectory:
+    # Constructor
+    def __init__(self, world, numAgents, actions, rewards, episode_starts, states, seeds, obs_layout='world',
+                 agent_start=None, exploration='shared', simultaneous=False):
+        '''
+
+        :param world: Starting world of the map the episodes were played on
+        :param numAgents: Number of agents on the map
+        :param actions: Actions of every episode one after the other, uint8, one row per step when simultaneous
+        :param rewards: Reward of each step, float32, one row per step when simultaneous
+        :param episode_starts: Index of the first step of each episode, plus the total number of steps at the end
+        :param states: State each episode ended in ('P' if it was cut short)
+        :param seeds: Seed each episode was reset with, NO_SEED if it wasn't seeded
+        :param obs_layout: obs_layout the MazeEnv was built with
+        :param agent_start: agent_start the MazeEnv was built with, None for the agents drawn on the world
+        :param exploration: exploration the MazeEnv was built with
+        :param simultaneous: simultaneous the MazeEnv was built with
+        '''
+        self.world = np.asarray(world, dtype=np.int16)
+        self.map_hash = mapHash(self.world)
+        self.numAgents = int(numAgents)
+        self.actions = np.asarray(actions, dtype=np.uint8)
+        self.rewards = np.asarray(rewards, dtype=np.float32)
+        self.episode_starts = np.asarray(episode_starts, dtype=np.int64)
+        self.states = np.asarray(states, dtype=str)
+        self.seeds = np.asarray(seeds, dtype=np.int64)
+        # Options the episodes are replayed with
+        self.obs_layout = str(obs_layout)
+        if agent_start is not None:
+            agent_start = [None if pos is None else (int(pos[0]), int(pos[1])) for pos in agent_start]
+        self.agent_start = agent_start
+        self.exploration = str(exploration)
+        self.simultaneous = bool(simultaneous)
+        # Environment the episodes are replayed in, built the first time it is needed
+        self.env = None
+
+    def __len__(self):
+        return len(self.episode_starts) - 1
+
+    def save(self, path):
+        options = {}
+        if self.agent_start is not None:
+            # Agents that start off the map are stored as (-1, -1)
+            options['agent_start'] = np.array([(-1, -1) if pos is None else pos for pos in self.agent_start],
+                                              dtype=np.int64).reshape(self.numAgents, 2)
+        np.savez_compressed(path, world=self.world, map_hash=self.map_hash, numAgents=self.numAgents,
+                            actions=self.actions, rewards=self.rewards, episode_starts=self.episode_starts,
+                            states=self.states, seeds=self.seeds, obs_layout=self.obs_layout,
+                            exploration=self.exploration, simultaneous=self.simultaneous, **options)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            # Files saved before the options were stored were all recorded with the defaults
+            options = {}
+            for name in ['obs_layout', 'exploration', 'simultaneous']:
+                if name in data.files:
+                    options[name] = data[name].item()
+            if 'agent_start' in data.files:
+                options['agent_start'] = [None if row < 0 else (row, col) for row, col in data['agent_start'].tolist()]
+            trajectory = cls(data['world'], data['numAgents'], data['actions'], data['rewards'],
+                             data['episode_starts'], data['states'], data['seeds'], **options)
+            if str(data['map_hash']) != trajectory.map_hash:
+                raise ValueError(f"{path} does not match the map it was recorded on")
+        return trajectory
+
+    # Actions and rewards of one episode
+    def episodeActions(self, episode):
+        return self.actions[self.episode_starts[episode]:self.episode_starts[episode + 1]]
+
+    def episodeRewards(self, episode):
+        return self.rewards[self.episode_starts[episode]:self.episode_starts[episode + 1]]
+
+    # Step a fresh environment through an episode, yielding the world after the reset and after every step
+    # The same world array is updated in place, copy it to keep it
+    def replayWorlds(self, episode, env=None):
+        if env is None:
+            # Building the movement rules costs more than replaying an episode, so the env is reused
+            if self.env is None:
+                self.env = MazeEnv(self.world, self.numAgents, obs_layout=self.obs_layout,
+                                   agent_start=self.agent_start, exploration=self.exploration,
+                                   simultaneous=self.simultaneous)
+            env = self.env
+        elif mapHash(env.world_start) != self.map_hash:
+            raise ValueError("The environment is not on the map the trajectory was recorded on")
+        env.reset()
+        yield env.world
+        rewards = self.episodeRewards(episode).tolist()
+        for step, action in enumerate(self.episodeActions(episode).tolist()):
+            obs, reward, done, info = env.step(action)
+            # The reward is stored as float32, so compare at that precision
+            if np.float32(reward).tolist() != rewards[step]:
+                raise ValueError(f"Episode {episode} diverged from the recording at step {step}")
+            yield env.world
+
+    # Rebuild the world of an episode after the given number of steps, the end of the episode by default
+    def replay(self, episode, step=None, env=None):
+        length = self.episode_starts[episode + 1] - self.episode_starts[episode]
+        step = length if step is None else step
+        if not 0 <= step <= length:
+            raise IndexError(f"Episode {episode} has {length} steps")
+        for index, world in enumerate(self.replayWorlds(episode, env)):
+            if index == step:
+                return world.copy()
+
+
+# Records the episodes of a MazeEnv into a Trajectory
+class TrajectoryRecorder(gym.Wrapper):
+    # Constructor
+    def __init__(self, env, path='trial/trajectories.npz'):
+        '''
+
+        :param env: MazeEnv to record
+        :param path: File the trajectory is saved to by flush() and close()
+        '''
+        super().__init__(env)
+        self.path = path
+        self.simultaneous = self.env.simultaneous
+        # Actions stored for each step
+        self.step_actions = self.env.numAgents if self.simultaneous else 1
+        # Steps are appended to byte buffers, which costs 5 bytes per step and agent
+        self.actions = bytearray()
+        self.rewards = bytearray()
+        self.episode_starts = [0]
+        self.states = []
+        self.seeds = []
+        # Seed given to seed(), which the next episode is recorded with
+        self.next_seed = None
+        self.recording = False
+
+    def seed(self, seed=None):
+        self.next_seed = seed
+        return self.env.seed(seed)
+
+    def reset(self, seed=None, **kwargs):
+        if self.recording:
+            self._finishEpisode('P')
+        observation = self.env.reset(seed=seed, **kwargs)
+        if seed is None:
+            seed = self.next_seed
+        self.next_seed = None
+        self.seeds.append(NO_SEED if seed is None else seed)
+        self.recording = True
+        return observation
+
+    def step(self, action):
+        observation, reward, done, info = self.env.step(action)
+        if self.recording:
+            if self.simultaneous:
+                self.actions += np.asarray(action, dtype=np.uint8).tobytes()
+            else:
+                self.actions.append(int(action))
+            self.rewards += np.float32(reward).tobytes()
+            if done:
+                self._finishEpisode(info['state'])
+        return observation, reward, done, info
+
+    def _finishEpisode(self, state):
+        self.episode_starts.append(len(self.actions) // self.step_actions)
+        self.states.append(state)
+        self.recording = False
+
+    # Trajectory of the episodes finished so far
+    def trajectory(self):
+        env = self.env
+        episodes = len(self.states)
+        steps = self.episode_starts[-1]
+        shape = (steps, self.step_actions) if self.simultaneous else (steps,)
+        count = steps * self.step_actions
+        # Only the agents given as agent_start are stored, the agents drawn on the world are part of it
+        agent_start = None if env.agent_start == env.rules.agent_start else env.agent_start[1:]
+        # Copied so the buffers can keep growing
+        return Trajectory(env.world_start, env.numAgents,
+                          np.frombuffer(self.actions, dtype=np.uint8, count=count).reshape(shape).copy(),
+                          np.frombuffer(self.rewards, dtype=np.float32, count=count).reshape(shape).copy(),
+                          self.episode_starts, self.states, self.seeds[:episodes], obs_layout=env.obs_layout,
+                          agent_start=agent_start, exploration=env.exploration, simultaneous=self.simultaneous)
+
+    # Save the episodes finished so far
+    def flush(self):
+        self.trajectory().save(self.path)
+
+    def close(self):
+        if self.recording:
+            self._finishEpisode('P')
+        self.flush()
+        super().close()
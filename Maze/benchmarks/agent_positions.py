@@ -0,0 +1,57 @@
+'''
+Benchmark for the agent position table used by MazeEnv.moveAgent.
+
+Compares moveAgent throughput against a variant that locates the moving
+agent (and the teleported agent) with full np.where scans of the world,
+as moveAgent did before the position table.
+
+Run from the Maze directory:
+    python -m benchmarks.agent_positions
+'''
+import time
+import numpy as np
+
+from MazeEnv import MazeEnv, TELEPORT
+from benchmarks.maps import MAPS, countAgents
+
+
+class ScanningMazeEnv(MazeEnv):
+    # Locate the agents with full scans of the world before every move
+    def moveAgent(self, action):
+        agents = [self.current_agent]
+        if action == TELEPORT:
+            agents.append(self.current_agent % self.numAgents + 1)
+        for agent in agents:
+            rows, cols = np.where(self.world == agent)
+            self.agent_pos[agent] = (int(rows[0]), int(cols[0])) if len(rows) else None
+        super().moveAgent(action)
+
+
+# Time moveAgent over a fixed action sequence and return moves per second
+def movesPerSecond(env, actions):
+    env.reset()
+    elapsed = 0.0
+    for action in actions:
+        start = time.perf_counter()
+        env.moveAgent(action)
+        elapsed += time.perf_counter() - start
+        env.current_agent = env.current_agent % env.numAgents + 1
+        if env.state != 'P':
+            env.reset()
+    return len(actions) / elapsed
+
+
+def main(numMoves=20000, seed=0):
+    actions = np.random.default_rng(seed).integers(0, 5, size=numMoves).tolist()
+
+    print(f"{'map':<10}{'shape':<10}{'agents':>7}{'before/s':>12}{'after/s':>12}{'speedup':>9}")
+    for name, world in MAPS.items():
+        numAgents = countAgents(world)
+        before = movesPerSecond(ScanningMazeEnv(world, numAgents), actions)
+        after = movesPerSecond(MazeEnv(world, numAgents), actions)
+        shape = f"{world.shape[0]}x{world.shape[1]}"
+        print(f"{name:<10}{shape:<10}{numAgents:>7}{before:>12.0f}{after:>12.0f}{after / before:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
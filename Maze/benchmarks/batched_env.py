@@ -0,0 +1,58 @@
+'''
+Benchmark for BatchedMazeEnv against stepping MazeEnv copies one at a time.
+
+Reports environment steps per second (summed over all envs) for a Python
+loop over MazeEnv.step and for BatchedMazeEnv at several batch sizes.
+
+Run from the Maze directory:
+    python -m benchmarks.batched_env
+'''
+import time
+import numpy as np
+
+from MazeEnv import MazeEnv
+from BatchedMazeEnv import BatchedMazeEnv
+from benchmarks.maps import MAPS, countAgents
+
+
+# Step a list of MazeEnv copies one after the other, like DummyVecEnv does
+def loopStepsPerSecond(world, numAgents, numEnvs, numSteps, rng):
+    envs = [MazeEnv(world, numAgents) for _ in range(numEnvs)]
+    for env in envs:
+        env.reset()
+    actions = rng.integers(0, 5, size=(numSteps, numEnvs)).tolist()
+
+    start = time.perf_counter()
+    for step_actions in actions:
+        for env, action in zip(envs, step_actions):
+            obs, reward, done, info = env.step(action)
+            if done:
+                env.reset()
+    return numSteps * numEnvs / (time.perf_counter() - start)
+
+
+def batchedStepsPerSecond(world, numAgents, numEnvs, numSteps, rng):
+    env = BatchedMazeEnv(world, numAgents, numEnvs)
+    env.reset()
+    actions = rng.integers(0, 5, size=(numSteps, numEnvs))
+
+    start = time.perf_counter()
+    for step_actions in actions:
+        env.step(step_actions)
+    return numSteps * numEnvs / (time.perf_counter() - start)
+
+
+def main(mapName='world4', batchSizes=(1, 64, 1024, 4096), seed=0):
+    world = MAPS[mapName]
+    numAgents = countAgents(world)
+    rng = np.random.default_rng(seed)
+
+    loop = loopStepsPerSecond(world, numAgents, 8, 250, rng)
+    print(f"{mapName}: MazeEnv loop, 8 envs: {loop:,.0f} steps/s")
+    for numEnvs in batchSizes:
+        batched = batchedStepsPerSecond(world, numAgents, numEnvs, 500, rng)
+        print(f"{mapName}: BatchedMazeEnv, {numEnvs} envs: {batched:,.0f} steps/s ({batched / loop:,.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
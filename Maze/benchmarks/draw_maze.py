@@ -0,0 +1,86 @@
+'''
+Benchmark for the incremental turtle drawing in MazeEnv.drawMaze.
+
+The window and pen are replaced by stand-ins that count the turtle calls,
+so no display is needed. For each map it reports the calls made for the
+first frame of an episode (the terrain), the average calls and time per
+frame after that, and the number of stamps left on the pen at the end of
+the episode.
+
+Run from the Maze directory:
+    python -m benchmarks.draw_maze
+'''
+import time
+import numpy as np
+
+from MazeEnv import MazeEnv
+from benchmarks.maps import MAPS, countAgents
+
+
+# Turtle pen that counts calls and keeps track of its stamps
+class CountingPen:
+    def __init__(self):
+        self.calls = 0
+        self.stamps = set()
+        self.next_stamp = 0
+
+    def stamp(self):
+        self.calls += 1
+        self.next_stamp += 1
+        self.stamps.add(self.next_stamp)
+        return self.next_stamp
+
+    def clearstamp(self, stamp):
+        self.calls += 1
+        self.stamps.discard(stamp)
+
+    def clear(self):
+        self.calls += 1
+        self.stamps.clear()
+
+    def __getattr__(self, name):
+        def call(*args, **kwargs):
+            self.calls += 1
+        return call
+
+
+class Window:
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+def main(mapNames=('world4', 'world5'), numSteps=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    print(f"{'map':<10}{'cells':>7}{'first frame':>13}{'calls/frame':>13}{'us/frame':>10}{'stamps':>8}")
+    for name in mapNames:
+        world = MAPS[name]
+        env = MazeEnv(world, countAgents(world))
+        env.window = Window()
+        env.pen = CountingPen()
+        env.reset()
+
+        env.drawMaze(env.world)
+        first = env.pen.calls
+        frames = 0
+        calls = 0
+        seconds = 0
+        stamps = 0
+        for action in rng.integers(0, 5, size=numSteps).tolist():
+            obs, reward, done, info = env.step(action)
+            if done:
+                stamps = max(stamps, len(env.pen.stamps))
+                env.reset()
+                env.drawMaze(env.world)
+                continue
+            env.pen.calls = 0
+            start = time.perf_counter()
+            env.drawMaze(env.world)
+            seconds += time.perf_counter() - start
+            calls += env.pen.calls
+            frames += 1
+        print(f"{name:<10}{world.size:>7}{first:>13}{calls / frames:>13.1f}"
+              f"{seconds / frames * 1e6:>10.1f}{stamps:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+'''
+Benchmark for the episode log at each verbosity level.
+
+Reports MazeEnv steps per second with logging off, with episode summaries,
+with full step traces of every episode and of one episode in ten. The old
+behaviour, opening the log file and formatting the world with str() on
+every write, is measured as well for comparison.
+
+Run from the Maze directory:
+    python -m benchmarks.episode_log
+'''
+import os
+import tempfile
+import time
+import numpy as np
+
+import EpisodeLog
+from MazeEnv import MazeEnv
+from benchmarks.maps import MAPS, countAgents
+
+
+# Logger that opens the file and formats the world on every write, like MazeEnv used to
+class DirectLogger:
+    def __init__(self, path):
+        self.path = path
+        self.enabled = True
+        self.tracing = True
+
+    def startEpisode(self, episode):
+        pass
+
+    def write(self, *parts):
+        file = open(self.path, 'a')
+        for part in parts:
+            file.write(str(part))
+        file.close()
+
+    def flush(self):
+        pass
+
+
+def stepsPerSecond(world, numAgents, log, numSteps, rng):
+    env = MazeEnv(world, numAgents, log=log)
+    env.reset()
+    actions = rng.integers(0, 5, size=numSteps).tolist()
+
+    start = time.perf_counter()
+    for action in actions:
+        obs, reward, done, info = env.step(action)
+        if done:
+            env.reset()
+    log.flush()
+    return numSteps / (time.perf_counter() - start)
+
+
+def main(mapName='world4', numSteps=20000, seed=0):
+    world = MAPS[mapName]
+    numAgents = countAgents(world)
+    rng = np.random.default_rng(seed)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'render.txt')
+        loggers = [
+            ('off', EpisodeLog.NO_LOG),
+            ('episodes', EpisodeLog.EpisodeLogger(path, EpisodeLog.LOG_EPISODES)),
+            ('steps, 1 in 10 episodes', EpisodeLog.EpisodeLogger(path, EpisodeLog.LOG_STEPS, trace_every=10)),
+            ('steps', EpisodeLog.EpisodeLogger(path, EpisodeLog.LOG_STEPS)),
+            ('steps, open and str() per write', DirectLogger(path)),
+        ]
+        for name, log in loggers:
+            speed = stepsPerSecond(world, numAgents, log, numSteps, rng)
+            if isinstance(log, EpisodeLog.EpisodeLogger):
+                log.close()
+            print(f"{mapName}: log {name}: {speed:,.0f} steps/s")
+
+
+if __name__ == "__main__":
+    main()
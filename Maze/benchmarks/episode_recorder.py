@@ -0,0 +1,51 @@
+'''
+Benchmark for EpisodeRecorder.
+
+Reports MazeEnv steps per second without recording and while recording
+every episode to GIF. For the recorder it also reports the time until the
+encoder thread has caught up, which is the work moved off the stepping
+thread.
+
+Run from the Maze directory:
+    python -m benchmarks.episode_recorder
+'''
+import tempfile
+import time
+import numpy as np
+
+from MazeEnv import MazeEnv
+from EpisodeRecorder import EpisodeRecorder
+from benchmarks.maps import MAPS, countAgents
+
+
+def run(env, numSteps, rng):
+    actions = rng.integers(0, 5, size=numSteps).tolist()
+    env.reset()
+    start = time.perf_counter()
+    for action in actions:
+        obs, reward, done, info = env.step(action)
+        if done:
+            env.reset()
+    return time.perf_counter() - start
+
+
+def main(mapName='world4', numSteps=2000, seed=0):
+    world = MAPS[mapName]
+    numAgents = countAgents(world)
+    rng = np.random.default_rng(seed)
+
+    plain = run(MazeEnv(world, numAgents), numSteps, rng)
+    print(f"{mapName}: no recording: {numSteps / plain:,.0f} steps/s")
+
+    with tempfile.TemporaryDirectory() as directory:
+        env = EpisodeRecorder(MazeEnv(world, numAgents), directory)
+        stepping = run(env, numSteps, rng)
+        start = time.perf_counter()
+        env.close()
+        encoding = time.perf_counter() - start
+    print(f"{mapName}: recording every episode: {numSteps / stepping:,.0f} steps/s, "
+          f"encoder finished {encoding:.2f}s after the last step")
+
+
+if __name__ == "__main__":
+    main()
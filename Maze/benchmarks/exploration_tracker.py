@@ -0,0 +1,106 @@
+'''
+Benchmark for the exploration prize tracker.
+
+Compares the float64 plane of ones that reset used to allocate every
+episode, checked and cleared with one NumPy compare and store per move,
+against the bit-packed ExplorationTracker that is cleared in place. Reports
+the memory of the visited set, the time to reset it and the time per visit
+on maps from world5 up to 2000x2000, then the same for a batch of envs
+between the bool planes and the packed bits of BatchedExplorationTracker,
+and which of them it picks by default.
+
+Run from the Maze directory:
+    python -m benchmarks.exploration_tracker
+'''
+import time
+
+import numpy as np
+
+import ExplorationTracker
+import MazeMaps
+
+SIZES = [(100, 100), (500, 500), (2000, 2000)]
+NUM_ENVS = 64
+
+
+def timePerCall(function, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        function()
+    return (time.perf_counter() - start) / repeats * 1e6
+
+
+# Visit a fixed list of cells with the old float plane, returns the bonus
+def floatVisits(plane, cells):
+    bonus = 0
+    for pos in cells:
+        if plane[pos] == 1:
+            plane[pos] = 0
+            bonus += 1
+    return bonus
+
+
+def trackerVisits(tracker, cells):
+    bonus = 0
+    for pos in cells:
+        bonus += tracker.visit(0, pos)
+    return bonus
+
+
+def single(height, width, numVisits, repeats, rng):
+    cells = list(zip(rng.integers(1, height - 1, numVisits).tolist(), rng.integers(0, width, numVisits).tolist()))
+    old_reset = timePerCall(lambda: np.ones(shape=(height, width)), repeats)
+    plane = np.ones(shape=(height, width))
+    start = time.perf_counter()
+    old_bonus = floatVisits(plane, cells)
+    old_visit = (time.perf_counter() - start) / numVisits * 1e9
+
+    tracker = ExplorationTracker.ExplorationTracker(height, width)
+    new_reset = timePerCall(tracker.clear, repeats)
+    start = time.perf_counter()
+    new_bonus = trackerVisits(tracker, cells)
+    new_visit = (time.perf_counter() - start) / numVisits * 1e9
+    assert old_bonus == new_bonus
+
+    print(f"{height}x{width:<7}{plane.nbytes:>12,}{len(tracker.bits):>12,}{old_reset:>11.1f}{new_reset:>11.1f}"
+          f"{old_visit:>11.0f}{new_visit:>11.0f}")
+
+
+def batched(height, width, numSteps, repeats, rng):
+    envs = np.arange(NUM_ENVS)
+    groups = np.zeros(NUM_ENVS, dtype=np.int64)
+    cells = rng.integers(width, (height - 1) * width, (numSteps, NUM_ENVS))
+
+    sizes, resets, steps, visited = [], [], [], []
+    for packed in [False, True]:
+        tracker = ExplorationTracker.BatchedExplorationTracker(NUM_ENVS, height, width, packed=packed)
+        resets.append(timePerCall(lambda: tracker.clear(envs), repeats))
+        start = time.perf_counter()
+        for step in range(numSteps):
+            tracker.visit(envs, groups, cells[step])
+        steps.append((time.perf_counter() - start) / numSteps * 1e6)
+        sizes.append(tracker.planes.nbytes)
+        visited.append(tracker.visited())
+    assert (visited[0] == visited[1]).all()
+    default = 'bits' if NUM_ENVS * height * width > ExplorationTracker.BOOL_PLANE_BYTES else 'bool'
+
+    print(f"{height}x{width:<7}{sizes[0]:>14,}{sizes[1]:>12,}{resets[0]:>11.1f}{resets[1]:>11.1f}"
+          f"{steps[0]:>11.1f}{steps[1]:>11.1f}{default:>9}")
+
+
+def main(numVisits=200000, numSteps=2000, repeats=20, seed=0):
+    rng = np.random.default_rng(seed)
+    sizes = [MazeMaps.getMap('world5').shape] + SIZES
+    print("One env: visited set bytes, reset us and ns per visit, float64 plane vs bits")
+    print(f"{'map':<12}{'float64':>12}{'bits':>12}{'reset old':>11}{'reset new':>11}{'visit old':>11}{'visit new':>11}")
+    for height, width in sizes:
+        single(height, width, numVisits, repeats, rng)
+    print(f"\n{NUM_ENVS} envs: visited set bytes, reset us and us per step of every env, bool planes vs bits")
+    print(f"{'map':<12}{'bool':>14}{'bits':>12}{'reset bool':>11}{'reset bits':>11}{'step bool':>11}"
+          f"{'step bits':>11}{'default':>9}")
+    for height, width in sizes:
+        batched(height, width, numSteps, repeats, rng)
+
+
+if __name__ == "__main__":
+    main()
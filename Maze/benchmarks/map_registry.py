@@ -0,0 +1,65 @@
+'''
+Benchmark for loading maps from the MazeMaps registry.
+
+Reports the time to build every registered map from its layout, to load
+them the first time (compiling them into the cache), and to load them again
+from the cache files in a new process, where the arrays are mapped from the
+files instead of being built. The built-in maps are tiny, so it does the
+same for a large open map, which is where the cache pays off.
+
+Run from the Maze directory:
+    python -m benchmarks.map_registry
+'''
+import shutil
+import tempfile
+import time
+
+import MazeMaps
+
+
+# Open square map with walls around it and agent 1 in a corner
+def largeLayout(size):
+    rows = ['#' * size] + ['#' + '.' * (size - 2) + '#'] * (size - 2) + ['#' * size]
+    rows[1] = '#1' + rows[1][2:]
+    return rows
+
+
+def timeLoads(names):
+    MazeMaps._loaded.clear()
+    start = time.perf_counter()
+    for name in names:
+        MazeMaps.loadMap(name)
+    return time.perf_counter() - start
+
+
+def report(label, names, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for name in names:
+            MazeMaps._compile(MazeMaps.LAYOUTS[name])
+    building = (time.perf_counter() - start) / repeats
+
+    first = timeLoads(names)
+    cached = min(timeLoads(names) for _ in range(repeats))
+    print(f"{label}: building from the layouts: {building * 1000:.2f}ms")
+    print(f"{label}: first load, compiling the cache: {first * 1000:.2f}ms")
+    print(f"{label}: loading from the cache: {cached * 1000:.2f}ms")
+
+
+def main(largeSize=1000, repeats=5):
+    names = MazeMaps.mapNames()
+    cache_dir = MazeMaps.CACHE_DIR
+    MazeMaps.CACHE_DIR = tempfile.mkdtemp()
+    try:
+        report(f"{len(names)} built-in maps", names, repeats)
+        MazeMaps.register('large', largeLayout(largeSize))
+        report(f"{largeSize}x{largeSize} map", ['large'], repeats)
+    finally:
+        MazeMaps.LAYOUTS.pop('large', None)
+        MazeMaps._loaded.pop('large', None)
+        shutil.rmtree(MazeMaps.CACHE_DIR)
+        MazeMaps.CACHE_DIR = cache_dir
+
+
+if __name__ == "__main__":
+    main()
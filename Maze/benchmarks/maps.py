@@ -0,0 +1,42 @@
+'''
+Maps used by the benchmarks, loaded from the MazeMaps registry
+'''
+from collections import deque
+
+import numpy as np
+
+import MazeMaps
+
+MAPS = {name: MazeMaps.getMap(name) for name in ['world', 'world2', 'world3', 'world3_2', 'world4', 'world5']}
+
+
+# Number of agents placed on a map, counting up from agent 1
+def countAgents(world):
+    numAgents = 0
+    while np.any(world == numAgents + 1):
+        numAgents += 1
+    return numAgents
+
+
+# Copy of a map with agents 1 to numAgents on it
+# Agents beyond numAgents are removed, and missing agents are put on the empty cells
+# nearest to agent 1 that it can walk to, so they all start in the same part of the maze
+def withAgents(world, numAgents):
+    world = np.array(world)
+    world[(world > numAgents) & (world < 12)] = 0
+    missing = [agent for agent in range(2, numAgents + 1) if not np.any(world == agent)]
+
+    # Breadth first search from agent 1, agents can only stand between the top and bottom rows
+    start = tuple(np.argwhere(world == 1)[0].tolist())
+    seen = {start}
+    cells = deque([start])
+    while cells and missing:
+        row, col = cells.popleft()
+        if world[row, col] == 0:
+            world[row, col] = missing.pop(0)
+        for next_row, next_col in ((row - 1, col), (row + 1, col), (row, col - 1), (row, col + 1)):
+            if (1 <= next_row < len(world) - 1 and 0 <= next_col < np.size(world, 1)
+                    and (next_row, next_col) not in seen and world[next_row, next_col] != -1):
+                seen.add((next_row, next_col))
+                cells.append((next_row, next_col))
+    return world
@@ -0,0 +1,65 @@
+'''
+Benchmark for the procedural maze generator.
+
+Reports the time to generate one map of every style at 100x100 up to
+2000x2000, the time to generate a batch of maps, and how MazeEnv behaves on
+generated maps: how long building the environment takes and how many steps
+per second it runs with random actions.
+
+Run from the Maze directory:
+    python -m benchmarks.maze_generator
+'''
+import time
+
+import numpy as np
+
+import MazeEnv
+import MazeGenerator
+
+SIZES = [100, 500, 1000, 2000]
+
+
+def timeGenerate(style, size, repeats):
+    times = []
+    for seed in range(repeats):
+        start = time.perf_counter()
+        MazeGenerator.generate(style, size, size, seed=seed)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def timeEnv(style, size, numAgents, numSteps):
+    world = MazeGenerator.generate(style, size, size, numAgents=numAgents, seed=0)
+    start = time.perf_counter()
+    env = MazeEnv.MazeEnv(world, numAgents)
+    building = time.perf_counter() - start
+
+    actions = np.random.default_rng(0).integers(0, 5, size=numSteps).tolist()
+    env.reset(seed=0)
+    start = time.perf_counter()
+    for action in actions:
+        if env.step(action)[-2]:
+            env.reset()
+    return building, numSteps / (time.perf_counter() - start)
+
+
+def main(repeats=3, batchSize=64, batchMapSize=100, numAgents=4, numSteps=20000):
+    for style in MazeGenerator.STYLES:
+        for size in SIZES:
+            print(f"{style} {size}x{size}: {timeGenerate(style, size, repeats) * 1000:.1f}ms")
+
+    for style in MazeGenerator.STYLES:
+        start = time.perf_counter()
+        MazeGenerator.generateBatch(style, batchSize, batchMapSize, batchMapSize, seed=0)
+        elapsed = time.perf_counter() - start
+        print(f"{style} batch of {batchSize} {batchMapSize}x{batchMapSize} maps: {elapsed * 1000:.1f}ms")
+
+    for style in MazeGenerator.STYLES:
+        for size in SIZES:
+            building, steps_per_sec = timeEnv(style, size, numAgents, numSteps)
+            print(f"MazeEnv on {style} {size}x{size}: built in {building * 1000:.0f}ms, "
+                  f"{steps_per_sec:,.0f} steps/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+'''
+Benchmark for the first-visit Monte Carlo update of test.py.
+
+Compares the time for TabularPolicy to learn from one episode against the
+update test.py used before, which checked every timestep for an earlier
+visit by rebuilding the list of the state-action pairs before it and kept
+every return in a list that was summed again for each average. Episodes
+run for the TestEnv horizon, (H^2) * numAgents steps, on maps from world4
+up to 40x40 with 10 agents, as a random walk over the cells so states are
+visited many times. The old update is quadratic in the episode length,
+which keeps the maps small. Reports milliseconds per episode and the
+number of returns stored after all the episodes, and checks both updates
+give the same action values.
+
+Run from the Maze directory:
+    python -m benchmarks.monte_carlo
+'''
+import random
+import time
+
+import numpy as np
+
+import MazeMaps
+from TabularPolicy import TabularPolicy
+
+NUM_AGENTS = 10
+SIZES = [20, 40]
+NUM_ACTIONS = 5
+
+
+# The update test.py used before, without its print of every policy entry
+def quadraticUpdate(episode, Q, returns, policy, epsilon):
+    cumulative_Reward = 0
+    for i in reversed(range(0, len(episode))):
+        state, action, reward = episode[i]
+        state_action = (state, action)
+        cumulative_Reward += reward
+        if not state_action in [(x[0], x[1]) for x in episode[0:i]]:
+            if returns.get(state_action):
+                returns[state_action].append(cumulative_Reward)
+            else:
+                returns[state_action] = [cumulative_Reward]
+            Q[state][action] = sum(returns[state_action]) / len(returns[state_action])
+            Q_list = list(map(lambda x: x[1], Q[state].items()))
+            indices = [i for i, x in enumerate(Q_list) if x == max(Q_list)]
+            A_star = random.choice(indices)
+            for a in policy[state].items():
+                if a[0] == A_star:
+                    policy[state][a[0]] = (1 - epsilon) + (epsilon / abs(sum(policy[state].values())))
+                else:
+                    policy[state][a[0]] = (epsilon / abs(sum(policy[state].values())))
+
+
+# Episodes of (state, action, reward) where the state is the cell of a random walk on a size x size map
+def randomEpisodes(size, length, numEpisodes, rng):
+    episodes = []
+    for _ in range(numEpisodes):
+        steps = rng.integers(-1, 2, size=(length, 2))
+        cells = np.clip(np.cumsum(steps, axis=0) + size // 2, 0, size - 1)
+        states = (cells[:, 0] * size + cells[:, 1]).tolist()
+        actions = rng.integers(0, NUM_ACTIONS, size=length).tolist()
+        rewards = np.where(rng.random(length) < 0.001, 200, -2).tolist()
+        episodes.append(list(zip(states, actions, rewards)))
+    return episodes
+
+
+def emptyTables(numStates):
+    policy = {state: {action: 1 / NUM_ACTIONS for action in range(NUM_ACTIONS)} for state in range(numStates)}
+    Q = {state: {action: 0.0 for action in range(NUM_ACTIONS)} for state in range(numStates)}
+    return policy, Q
+
+
+def runOld(episodes, numStates, returns):
+    policy, Q = emptyTables(numStates)
+    random.seed(0)
+    start = time.perf_counter()
+    for episode in episodes:
+        quadraticUpdate(episode, Q, returns, policy, 0.01)
+    return (time.perf_counter() - start) / len(episodes) * 1e3, Q
+
+
+def runNew(episodes, numStates):
+    policy = TabularPolicy(numStates, NUM_ACTIONS, seed=0)
+    start = time.perf_counter()
+    for episode in episodes:
+        policy.updateFromEpisodes([episode])
+    return (time.perf_counter() - start) / len(episodes) * 1e3, policy
+
+
+def main(numEpisodes=3, seed=0):
+    rng = np.random.default_rng(seed)
+    sizes = [MazeMaps.getMap('world4').shape[0]] + SIZES
+    print(f"{'map':<9}{'steps':>9}{'old ms':>11}{'new ms':>9}{'speedup':>9}{'old returns':>13}{'new counts':>12}")
+    for size in sizes:
+        length = size ** 2 * NUM_AGENTS
+        episodes = randomEpisodes(size, length, numEpisodes, rng)
+        returns = {}
+        old_ms, old_Q = runOld(episodes, size * size, returns)
+        new_ms, policy = runNew(episodes, size * size)
+        for state in old_Q:
+            assert np.allclose(list(old_Q[state].values()), policy.q[state])
+        stored = sum(len(values) for values in returns.values())
+        print(f"{size}x{size:<6}{length:>9,}{old_ms:>11.1f}{new_ms:>9.1f}{old_ms / new_ms:>8.0f}x"
+              f"{stored:>13,}{np.count_nonzero(policy.counts):>12,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+'''
+Benchmark for the compiled movement rules.
+
+Reports how long MazeRules takes to compile each map, and how many
+moveAgent calls per second MazeEnv makes with them, for movement
+actions and for teleports.
+
+Run from the Maze directory:
+    python -m benchmarks.move_rules
+'''
+import time
+import numpy as np
+
+from MazeEnv import MazeEnv, TELEPORT
+from MazeRules import MazeRules
+from benchmarks.maps import MAPS, countAgents
+
+
+def compileSeconds(world, numAgents, repeats=20):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        MazeRules(world, numAgents)
+    return (time.perf_counter() - start) / repeats
+
+
+# Call moveAgent directly so the rest of step() is not measured
+def movesPerSecond(env, actions):
+    env.reset()
+    start = time.perf_counter()
+    for action in actions:
+        env.moveAgent(action)
+        env.current_agent = env.current_agent % env.numAgents + 1
+        if env.state != 'P':
+            env.reset()
+    return len(actions) / (time.perf_counter() - start)
+
+
+def main(numMoves=100000, seed=0):
+    rng = np.random.default_rng(seed)
+    print(f"{'map':<10}{'size':<8}{'compile ms':>12}{'moves/s':>12}{'teleports/s':>14}")
+    for name, world in MAPS.items():
+        numAgents = countAgents(world)
+        env = MazeEnv(world, numAgents)
+        moves = movesPerSecond(env, rng.integers(0, TELEPORT, size=numMoves).tolist())
+        teleports = movesPerSecond(env, [TELEPORT] * numMoves)
+        size = f"{np.size(world, 0)}x{np.size(world, 1)}"
+        print(f"{name:<10}{size:<8}{compileSeconds(world, numAgents) * 1000:>12.2f}{moves:>12,.0f}{teleports:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+'''
+Allocation benchmark for MazeEnv observations, measured with tracemalloc.
+
+Every observation returned by step() is kept, like a caller storing
+trajectories would. The benchmark then counts the NumPy arrays that were
+allocated during the steps and are still alive, and the bytes they hold.
+It covers the default zero-copy path, copy_obs=True and the old np.append
+observation.
+
+Run from the Maze directory:
+    python -m benchmarks.observation_alloc
+'''
+import tracemalloc
+import numpy as np
+
+from MazeEnv import MazeEnv
+from benchmarks.maps import MAPS, countAgents
+
+# Domain NumPy reports its array data allocations under
+NUMPY_DOMAIN = 389047
+
+
+# Observation built the way MazeEnv used to, a new int64 array on every call
+class AppendMazeEnv(MazeEnv):
+    def createObservation(self, done=False):
+        data_to_add = [0] * np.size(self.world, 1)
+        data_to_add[0] = self.current_agent
+        return np.append(self.world, [data_to_add], axis=0)
+
+
+def measure(env, numSteps, rng):
+    actions = rng.integers(0, 5, size=numSteps).tolist()
+    observations = [env.reset()]
+
+    tracemalloc.start()
+    start = tracemalloc.take_snapshot()
+    for action in actions:
+        obs, reward, done, info = env.step(action)
+        observations.append(obs)
+        if done:
+            observations.append(env.reset())
+    end = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    domain = [tracemalloc.DomainFilter(True, NUMPY_DOMAIN)]
+    stats = end.filter_traces(domain).compare_to(start.filter_traces(domain), 'traceback')
+    arrays = sum(stat.count_diff for stat in stats if stat.count_diff > 0)
+    size = sum(stat.size_diff for stat in stats if stat.size_diff > 0)
+    return arrays / numSteps, size / numSteps
+
+
+def main(mapName='world4', numSteps=2000, seed=0):
+    world = MAPS[mapName]
+    numAgents = countAgents(world)
+    rng = np.random.default_rng(seed)
+
+    envs = [
+        ('zero-copy', MazeEnv(world, numAgents)),
+        ('copy_obs', MazeEnv(world, numAgents, copy_obs=True)),
+        ('np.append', AppendMazeEnv(world, numAgents)),
+    ]
+    for name, env in envs:
+        arrays, size = measure(env, numSteps, rng)
+        print(f"{mapName}: {name}: {arrays:.2f} arrays, {size:,.0f} bytes kept per step")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+'''
+Benchmark for AgentVecEnv, every agent of many mazes as one VecEnv.
+
+Compares agent actions per second against taking turns in the same number
+of MazeEnv copies, where one batched forward pass over the envs serves the
+one agent whose turn it is in each of them. With AgentVecEnv one forward
+pass serves every agent of every env. The policy is a PyTorch MLP shaped
+like the default SB3 MlpPolicy (two hidden layers of 64).
+
+Run from the Maze directory:
+    python -m benchmarks.parallel_env
+'''
+import time
+
+import numpy as np
+import torch
+from torch import nn
+
+import MazeGenerator
+import MazeMaps
+from MazeEnv import MazeEnv
+from ParallelMazeEnv import AgentVecEnv
+
+NUM_ENVS = 8
+
+
+def makePolicy(obs_size):
+    return nn.Sequential(nn.Flatten(), nn.Linear(obs_size, 64), nn.Tanh(), nn.Linear(64, 64), nn.Tanh(),
+                         nn.Linear(64, 5))
+
+
+def forward(policy, observations):
+    with torch.no_grad():
+        return policy(torch.as_tensor(observations, dtype=torch.float32)).argmax(dim=1).numpy()
+
+
+def turnActions(world, numAgents, agent_start, numSteps, policy):
+    envs = [MazeEnv(world, numAgents, agent_start=agent_start) for _ in range(NUM_ENVS)]
+    observations = np.stack([env.reset(seed=index) for index, env in enumerate(envs)])
+    start = time.perf_counter()
+    for _ in range(numSteps):
+        actions = forward(policy, observations).tolist()
+        for index, env in enumerate(envs):
+            observation, reward, done, info = env.step(actions[index])
+            observations[index] = env.reset() if done else observation
+    return numSteps * NUM_ENVS / (time.perf_counter() - start)
+
+
+def parallelActions(world, numAgents, agent_start, numSteps, policy):
+    env = AgentVecEnv(world, numAgents, NUM_ENVS, agent_start=agent_start)
+    env.seed(0)
+    observations = env.reset()
+    start = time.perf_counter()
+    for _ in range(numSteps):
+        observations, rewards, dones, infos = env.step(forward(policy, observations))
+    return numSteps * env.num_envs / (time.perf_counter() - start)
+
+
+def main(numSteps=300, seed=0):
+    torch.manual_seed(seed)
+    arena = MazeGenerator.generate('arena', 64, 64, numAgents=0, seed=seed)
+    cases = [('world4', MazeMaps.getMap('world4'), 10, None)]
+    for numAgents in [10, 100]:
+        cases.append(('arena 64x64', arena, numAgents, MazeGenerator.placeAgents(arena, numAgents, seed=seed)))
+
+    print(f"{NUM_ENVS} envs, agent actions per second")
+    print(f"{'map':<13}{'agents':>7}{'turns':>12}{'AgentVecEnv':>13}{'speedup':>9}")
+    for name, world, numAgents, agent_start in cases:
+        policy = makePolicy(MazeEnv(world, numAgents, agent_start=agent_start).observation.size)
+        turns = turnActions(world, numAgents, agent_start, numSteps, policy)
+        parallel = parallelActions(world, numAgents, agent_start, numSteps, policy)
+        print(f"{name:<13}{numAgents:>7}{turns:>12,.0f}{parallel:>13,.0f}{parallel / turns:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
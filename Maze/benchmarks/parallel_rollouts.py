@@ -0,0 +1,59 @@
+'''
+Benchmark for the Monte Carlo rollouts of ParallelRollouts.
+
+Trains a first-visit Monte Carlo policy with RolloutPool on a generated
+rooms map and reports episodes and steps per second for each number of
+workers, against playing the same tasks in this process (num_workers=0).
+Every run uses the same seed, and the benchmark checks that they all learn
+the same policy. Throughput can only scale up to the number of CPUs, which
+is printed first.
+
+Run from the Maze directory:
+    python -m benchmarks.parallel_rollouts
+'''
+import functools
+import os
+import time
+
+import numpy as np
+
+import MazeGenerator
+import ParallelRollouts
+from MazeEnv import MazeEnv
+from TabularPolicy import TabularPolicy
+
+WORKER_COUNTS = [1, 2, 4]
+NUM_AGENTS = 2
+
+
+# Train with the given number of workers, 0 plays the episodes in this process
+def train(env_fn, episodes, batch_size, seed, num_workers):
+    with ParallelRollouts.RolloutPool(env_fn, num_workers=num_workers) as pool:
+        if num_workers:
+            # Let every worker build its env before the clock starts
+            pool.pool.map(abs, range(num_workers))
+        start = time.perf_counter()
+        policy = pool.train(episodes=episodes, batch_size=batch_size, seed=seed)
+        return policy, pool.steps, time.perf_counter() - start
+
+
+def samePolicy(first, second):
+    assert isinstance(first, TabularPolicy) and np.array_equal(first.q, second.q)
+    assert np.array_equal(first.probs, second.probs) and np.array_equal(first.counts, second.counts)
+
+
+def main(episodes=1024, batch_size=256, seed=0):
+    world = MazeGenerator.generate('rooms', 20, 20, numAgents=NUM_AGENTS, seed=seed)
+    env_fn = functools.partial(MazeEnv, world, NUM_AGENTS, state_index='zobrist')
+    print(f"{os.cpu_count()} CPUs, {episodes} episodes on a 20x20 rooms map")
+    print(f"{'workers':<12}{'episodes/s':>11}{'steps/s':>10}")
+    reference, steps, seconds = train(env_fn, episodes, batch_size, seed, 0)
+    print(f"{'in process':<12}{episodes / seconds:>11,.0f}{steps / seconds:>10,.0f}")
+    for num_workers in WORKER_COUNTS:
+        policy, steps, seconds = train(env_fn, episodes, batch_size, seed, num_workers)
+        samePolicy(reference, policy)
+        print(f"{num_workers:<12}{episodes / seconds:>11,.0f}{steps / seconds:>10,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+'''
+Benchmark for the memory-mapped policy files of PolicyFile.
+
+Compares the size on disk and the time to load a policy and look up one
+state against pickles, for policies from 10k to 10M states. The pickles
+are the dict of dicts test.py used to save (joblib writes those as plain
+pickles) and a pickled TabularPolicy, loaded in full before the first
+lookup. The dict of dicts is only built up to 100k states.
+
+Run from the Maze directory:
+    python -m benchmarks.policy_file
+'''
+import os
+import pickle
+import tempfile
+import time
+
+import numpy as np
+
+import PolicyFile
+from TabularPolicy import TabularPolicy
+
+STATE_COUNTS = [10000, 100000, 1000000, 10000000]
+MAX_DICT_STATES = 100000
+NUM_ACTIONS = 5
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return result, (time.perf_counter() - start) * 1e3
+
+
+def loadPickle(path):
+    with open(path, 'rb') as file:
+        return pickle.load(file)
+
+
+def dumpPickle(path, value):
+    with open(path, 'wb') as file:
+        pickle.dump(value, file, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def main(seed=0):
+    rng = np.random.default_rng(seed)
+    with tempfile.TemporaryDirectory() as directory:
+        table(rng, directory)
+
+
+def table(rng, directory):
+    print("MB on disk and ms to load and look up one state")
+    print(f"{'states':>11}{'dict MB':>9}{'dict ms':>9}{'pickle MB':>11}{'pickle ms':>11}{'file MB':>9}{'file ms':>9}")
+    for numStates in STATE_COUNTS:
+        policy = TabularPolicy(numStates, NUM_ACTIONS)
+        policy.probs[:] = rng.dirichlet(np.ones(NUM_ACTIONS), size=numStates)
+        state = int(rng.integers(numStates))
+        row = f"{numStates:>11,}"
+
+        if numStates <= MAX_DICT_STATES:
+            path = os.path.join(directory, 'dict.sav')
+            dumpPickle(path, {key: dict(enumerate(probs)) for key, probs in enumerate(policy.probs.tolist())})
+            _, milliseconds = timed(lambda: loadPickle(path)[state])
+            row += f"{os.path.getsize(path) / 1e6:>9.1f}{milliseconds:>9.1f}"
+        else:
+            row += f"{'-':>9}{'-':>9}"
+
+        path = os.path.join(directory, 'policy.sav')
+        dumpPickle(path, policy)
+        _, milliseconds = timed(lambda: loadPickle(path).probs[state])
+        row += f"{os.path.getsize(path) / 1e6:>11.1f}{milliseconds:>11.1f}"
+        os.remove(path)
+
+        path = os.path.join(directory, 'policy.pol')
+        PolicyFile.save(path, policy.probs, 'dense')
+        _, milliseconds = timed(lambda: PolicyFile.PolicyFile(path).actionProbs(state))
+        row += f"{os.path.getsize(path) / 1e6:>9.1f}{milliseconds:>9.2f}"
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+'''
+Benchmark for the offscreen rgb_array renderer.
+
+Reports the time to draw one frame with MazeEnv.renderFrame on each map,
+and the time per frame when BatchedMazeEnv draws all of its envs at once.
+
+Run from the Maze directory:
+    python -m benchmarks.render_frames
+'''
+import time
+
+from MazeEnv import MazeEnv
+from BatchedMazeEnv import BatchedMazeEnv
+from benchmarks.maps import MAPS, countAgents
+
+
+def frameSeconds(draw, repeats):
+    draw()
+    start = time.perf_counter()
+    for _ in range(repeats):
+        draw()
+    return (time.perf_counter() - start) / repeats
+
+
+def main(batchSizes=(16, 256), repeats=200):
+    print(f"{'map':<10}{'image':>10}{'MazeEnv ms':>12}" + ''.join(f"{f'{n} envs ms':>14}" for n in batchSizes))
+    for name, world in MAPS.items():
+        numAgents = countAgents(world)
+        env = MazeEnv(world, numAgents)
+        env.reset()
+        single = frameSeconds(env.renderFrame, repeats)
+        height, width, _ = env.renderFrame().shape
+
+        line = f"{name:<10}{f'{width}x{height}':>10}{single * 1000:>12.3f}"
+        for numEnvs in batchSizes:
+            batched = BatchedMazeEnv(world, numAgents, numEnvs)
+            line += f"{frameSeconds(batched.renderFrames, max(1, repeats // numEnvs)) / numEnvs * 1000:>14.3f}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
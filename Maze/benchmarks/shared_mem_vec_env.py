@@ -0,0 +1,63 @@
+'''
+Benchmark for SharedMemVecEnv against DummyVecEnv and SubprocVecEnv.
+
+Reports environment steps per second (summed over all envs) for each vector
+env with one MazeEnv per worker, at 1, 4, 16 and 32 workers. DummyVecEnv steps
+all of its envs in this process, so its number of workers is its number of envs.
+The process based envs only scale up to the number of cores on the machine.
+
+Run from the Maze directory:
+    python -m benchmarks.shared_mem_vec_env
+'''
+import os
+import time
+from functools import partial
+
+import numpy as np
+from stable_baselines3.common.vec_env import DummyVecEnv, SubprocVecEnv
+
+from MazeEnv import MazeEnv
+from SharedMemVecEnv import SharedMemVecEnv
+from benchmarks.maps import MAPS, countAgents
+
+VEC_ENVS = {
+    'DummyVecEnv': DummyVecEnv,
+    'SubprocVecEnv': SubprocVecEnv,
+    'SharedMemVecEnv': SharedMemVecEnv,
+}
+
+
+def makeEnv(world, numAgents):
+    return MazeEnv(world, numAgents)
+
+
+def stepsPerSecond(vecEnvClass, world, numAgents, numEnvs, numSteps, rng):
+    env = vecEnvClass([partial(makeEnv, world, numAgents) for _ in range(numEnvs)])
+    env.reset()
+    actions = rng.integers(0, 5, size=(numSteps, numEnvs))
+
+    # A few steps to warm up the workers before timing
+    for step_actions in actions[:10]:
+        env.step(step_actions)
+    start = time.perf_counter()
+    for step_actions in actions:
+        env.step(step_actions)
+    elapsed = time.perf_counter() - start
+    env.close()
+    return numSteps * numEnvs / elapsed
+
+
+def main(mapName='world4', workerCounts=(1, 4, 16, 32), vecEnvs=tuple(VEC_ENVS), numSteps=2000, seed=0):
+    world = MAPS[mapName]
+    numAgents = countAgents(world)
+    rng = np.random.default_rng(seed)
+
+    print(f"{mapName}: {os.cpu_count()} cores")
+    for numEnvs in workerCounts:
+        for name in vecEnvs:
+            speed = stepsPerSecond(VEC_ENVS[name], world, numAgents, numEnvs, numSteps, rng)
+            print(f"{mapName}: {name}, {numEnvs} workers: {speed:,.0f} steps/s")
+
+
+if __name__ == "__main__":
+    main()
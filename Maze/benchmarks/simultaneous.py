@@ -0,0 +1,78 @@
+'''
+Benchmark for the simultaneous-move mode of MazeEnv.
+
+Compares rounds per second, a round being one action for every agent, when
+the agents take turns (one env step and one policy forward pass per agent)
+against simultaneous mode (one env step and one batched forward pass for
+all of them). The policy is a single linear layer over the flattened
+observation, standing in for the cost of calling a network. Runs on world4
+with its 10 agents and on a generated 100x100 arena with 10, 100 and 1000
+agents.
+
+Run from the Maze directory:
+    python -m benchmarks.simultaneous
+'''
+import time
+
+import numpy as np
+
+import MazeGenerator
+import MazeMaps
+from MazeEnv import MazeEnv
+
+
+# One linear layer from the flattened observation to the 5 actions
+class LinearPolicy:
+    # Constructor
+    def __init__(self, obs_size, rng):
+        self.weights = rng.standard_normal((obs_size, 5)).astype(np.float32)
+
+    def act(self, observations):
+        logits = observations.reshape(len(observations), -1).astype(np.float32) @ self.weights
+        return logits.argmax(axis=1)
+
+
+def turnRounds(world, numAgents, agent_start, numRounds, rng):
+    env = MazeEnv(world, numAgents, agent_start=agent_start)
+    policy = LinearPolicy(env.observation.size, rng)
+    observation = env.reset(seed=0)
+    start = time.perf_counter()
+    for _ in range(numRounds):
+        for _ in range(numAgents):
+            action = int(policy.act(observation[None])[0])
+            observation, reward, done, info = env.step(action)
+            if done:
+                observation = env.reset()
+    return numRounds / (time.perf_counter() - start)
+
+
+def simultaneousRounds(world, numAgents, agent_start, numRounds, rng):
+    env = MazeEnv(world, numAgents, agent_start=agent_start, simultaneous=True)
+    policy = LinearPolicy(env.observations[0].size, rng)
+    observations = env.reset(seed=0)
+    start = time.perf_counter()
+    for _ in range(numRounds):
+        observations, rewards, done, info = env.step(policy.act(observations))
+        if done:
+            observations = env.reset()
+    return numRounds / (time.perf_counter() - start)
+
+
+def main(numRounds=500, seed=0):
+    rng = np.random.default_rng(seed)
+    arena = MazeGenerator.generate('arena', 100, 100, numAgents=0, seed=seed)
+    cases = [('world4', MazeMaps.getMap('world4'), 10, None)]
+    for numAgents in [10, 100, 1000]:
+        cases.append(('arena 100x100', arena, numAgents, MazeGenerator.placeAgents(arena, numAgents, seed=seed)))
+
+    print(f"{'map':<15}{'agents':>7}{'turns rounds/s':>16}{'simultaneous rounds/s':>23}{'speedup':>9}")
+    for name, world, numAgents, agent_start in cases:
+        # Turns get slow with many agents, so they play fewer rounds
+        rounds = max(10, numRounds // numAgents * 10)
+        turns = turnRounds(world, numAgents, agent_start, rounds, rng)
+        simultaneous = simultaneousRounds(world, numAgents, agent_start, numRounds, rng)
+        print(f"{name:<15}{numAgents:>7}{turns:>16,.1f}{simultaneous:>23,.1f}{simultaneous / turns:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+'''
+Benchmark for the state keys of StateIndex.
+
+Compares the time per MazeEnv step with no state key, with the zobrist and
+dense keys updated as agents move, and with a key made by hashing the bytes
+of the whole world after every step, which grows with the map. Runs on
+world_traps and on generated maps up to 500x500 with 2 agents, then reports
+how fast the zobrist index gives out rows once a million states have been
+seen.
+
+Run from the Maze directory:
+    python -m benchmarks.state_index
+'''
+import time
+
+import numpy as np
+
+import MazeGenerator
+import MazeMaps
+import StateIndex
+from MazeEnv import MazeEnv
+
+SIZES = [50, 200, 500]
+NUM_AGENTS = 2
+
+
+def stepMicroseconds(env, actions, key=None):
+    env.reset(seed=0)
+    start = time.perf_counter()
+    for action in actions:
+        done = env.step(action)[-2]
+        if key is not None:
+            key(env)
+        if done:
+            env.reset()
+    return (time.perf_counter() - start) / len(actions) * 1e6
+
+
+def worldHash(env):
+    return hash(env.world.tobytes())
+
+
+def stateIndexKey(env):
+    return env.state_index.row(env.state_index.key)
+
+
+def main(numSteps=20000, numStates=1000000, seed=0):
+    actions = np.random.default_rng(seed).integers(0, 5, size=numSteps).tolist()
+    worlds = [('world_traps', MazeMaps.getMap('world_traps'))]
+    for size in SIZES:
+        world = MazeGenerator.generate('rooms', size, size, numAgents=NUM_AGENTS, seed=seed)
+        worlds.append((f'{size}x{size}', world))
+
+    print("us per step")
+    print(f"{'map':<13}{'no key':>8}{'zobrist':>9}{'dense':>8}{'world hash':>12}")
+    for name, world in worlds:
+        row = f"{name:<13}{stepMicroseconds(MazeEnv(world, NUM_AGENTS), actions):>8.2f}"
+        zobrist = MazeEnv(world, NUM_AGENTS, state_index='zobrist')
+        row += f"{stepMicroseconds(zobrist, actions, stateIndexKey):>9.2f}"
+        try:
+            dense = MazeEnv(world, NUM_AGENTS, state_index='dense')
+            row += f"{stepMicroseconds(dense, actions, stateIndexKey):>8.2f}"
+        except ValueError:
+            row += f"{'-':>8}"
+        row += f"{stepMicroseconds(MazeEnv(world, NUM_AGENTS), actions, worldHash):>12.2f}"
+        print(row)
+
+    index = StateIndex.ZobristIndex(MazeMaps.getMap('world_traps'), NUM_AGENTS)
+    keys = np.random.default_rng(seed).integers(1, 1 << 63, size=numStates, dtype=np.int64).tolist()
+    start = time.perf_counter()
+    for key in keys:
+        index.row(key)
+    new = (time.perf_counter() - start) / numStates * 1e9
+    start = time.perf_counter()
+    for key in keys:
+        index.row(key)
+    seen = (time.perf_counter() - start) / numStates * 1e9
+    print(f"\nzobrist rows for {index.size:,} states: {new:.0f} ns for a new state, {seen:.0f} ns for a seen one")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+'''
+Benchmark for the phase timers of StepProfiler.
+
+Reports MazeEnv steps per second with profiling never turned on, turned on,
+and turned on then off again, which should match the first. Then prints the
+stats of the profiled run, with every step traced to a text log so the
+log phase shows up too.
+
+Run from the Maze directory:
+    python -m benchmarks.step_profiler
+'''
+import os
+import tempfile
+import time
+import numpy as np
+
+import EpisodeLog
+from MazeEnv import MazeEnv
+from benchmarks.maps import MAPS, countAgents
+
+
+def run(env, actions):
+    env.reset(seed=0)
+    start = time.perf_counter()
+    for action in actions:
+        obs, reward, done, info = env.step(action)
+        if done:
+            env.reset()
+    return len(actions) / (time.perf_counter() - start)
+
+
+def main(mapName='world4', numSteps=50000, seed=0):
+    world = MAPS[mapName]
+    numAgents = countAgents(world)
+    actions = np.random.default_rng(seed).integers(0, 5, size=numSteps).tolist()
+
+    plain = run(MazeEnv(world, numAgents), actions)
+    profiled = run(MazeEnv(world, numAgents, profile=True), actions)
+    env = MazeEnv(world, numAgents, profile=True)
+    env.set_profiling(False)
+    disabled = run(env, actions)
+    print(f"{mapName}: never profiled: {plain:,.0f} steps/s")
+    print(f"{mapName}: profiled: {profiled:,.0f} steps/s")
+    print(f"{mapName}: profiled then turned off: {disabled:,.0f} steps/s")
+
+    with tempfile.TemporaryDirectory() as directory:
+        log = EpisodeLog.EpisodeLogger(os.path.join(directory, 'render.txt'), level=EpisodeLog.LOG_STEPS)
+        env = MazeEnv(world, numAgents, log=log, profile=True)
+        run(env, actions[:5000])
+        log.close()
+    print(f"{'phase':>18} {'calls':>8} {'total ms':>9} {'self ms':>9} {'mean us':>8} {'p50 us':>7} {'p99 us':>7}")
+    for phase, stats in env.get_perf_stats().items():
+        print(f"{phase:>18} {stats['count']:>8} {stats['total_ms']:>9.1f} {stats['self_ms']:>9.1f} "
+              f"{stats['mean_us']:>8.2f} {stats['p50_us']:>7.2f} {stats['p99_us']:>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
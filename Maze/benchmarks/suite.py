@@ -0,0 +1,226 @@
+'''
+Throughput benchmark suite for MazeEnv, CompMazeEnv and TestEnv.
+
+For every environment, map, number of agents and render/log setting it
+measures steps per second, resets per second and the 50th, 90th and 99th
+percentile latency of a single step. Results are written to JSON together
+with a description of the machine, and compare checks a run against a
+stored baseline and flags every case that got slower. Each case is run a
+few times and the best numbers are kept, since noise from the rest of the
+machine only ever makes a run slower.
+
+Rendering draws an offscreen frame with renderFrame() after every step and
+logging writes every step to a text log at LOG_STEPS. CompMazeEnv always
+plays with its 4 agents. Maps are given the agents they need with
+withAgents().
+
+Run from the Maze directory:
+    python -m benchmarks.suite run --output baseline.json
+    python -m benchmarks.suite run --output current.json
+    python -m benchmarks.suite compare baseline.json current.json
+'''
+import argparse
+import datetime
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+
+import EpisodeLog
+import MazeEnv
+import CompMazeEnv
+import TestEnv
+from benchmarks.maps import MAPS, withAgents
+
+ENVS = ['MazeEnv', 'CompMazeEnv', 'TestEnv']
+AGENT_COUNTS = [2, 4, 6, 8, 10]
+SETTINGS = ['off', 'on']
+# Fraction a measurement may get worse by before compare flags it
+THRESHOLD = 0.10
+
+
+def makeEnv(envName, world, numAgents, log):
+    if envName == 'MazeEnv':
+        return MazeEnv.MazeEnv(world, numAgents, log=log)
+    if envName == 'CompMazeEnv':
+        return CompMazeEnv.MazeEnv(world, log=log)
+    return TestEnv.MazeEnv(world, numAgents, log=log)
+
+
+# Every combination to run, CompMazeEnv only supports its own number of agents
+def cases(envNames, mapNames, agentCounts, renders, logs):
+    for envName, mapName, numAgents, render, log in itertools.product(envNames, mapNames, agentCounts,
+                                                                       renders, logs):
+        if envName == 'CompMazeEnv':
+            if numAgents != agentCounts[0]:
+                continue
+            numAgents = CompMazeEnv.numOfAgents
+        yield envName, mapName, numAgents, render, log
+
+
+def measure(envName, mapName, numAgents, render, log, numSteps, numResets, seed, directory):
+    world = withAgents(MAPS[mapName], numAgents)
+    logger = None
+    if log == 'on':
+        logger = EpisodeLog.EpisodeLogger(os.path.join(directory, 'render.txt'), level=EpisodeLog.LOG_STEPS)
+    env = makeEnv(envName, world, numAgents, logger)
+    actions = np.random.default_rng(seed).integers(0, 5, size=numSteps).tolist()
+
+    # Warm up before timing, the first frame builds the tile atlas
+    env.reset(seed=seed)
+    for action in actions[:100]:
+        env.step(action)
+        if render == 'on':
+            env.renderFrame()
+
+    # Every step is timed on its own, resets are left out of the step latencies
+    latencies = np.empty(numSteps, dtype=np.int64)
+    env.reset(seed=seed)
+    for step, action in enumerate(actions):
+        start = time.perf_counter_ns()
+        result = env.step(action)
+        if render == 'on':
+            env.renderFrame()
+        latencies[step] = time.perf_counter_ns() - start
+        if result[-2]:
+            env.reset()
+
+    start = time.perf_counter()
+    for _ in range(numResets):
+        env.reset()
+    resetting = time.perf_counter() - start
+
+    if logger is not None:
+        logger.close()
+    p50, p90, p99 = np.percentile(latencies, [50, 90, 99]) / 1000
+    return {
+        'env': envName,
+        'map': mapName,
+        'agents': numAgents,
+        'render': render,
+        'log': log,
+        'steps_per_sec': numSteps / (latencies.sum() / 1e9),
+        'resets_per_sec': numResets / resetting,
+        'latency_us': {'p50': p50, 'p90': p90, 'p99': p99},
+    }
+
+
+def machineMetadata():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ''
+    import gym
+    return {
+        'date': datetime.datetime.now().isoformat(timespec='seconds'),
+        'host': platform.node(),
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'python': sys.version.split()[0],
+        'numpy': np.__version__,
+        'gym': gym.__version__,
+        'commit': commit,
+    }
+
+
+# Best throughput and latency of several runs of a case
+def measureBest(case, numSteps, numResets, seed, repeats, directory):
+    runs = [measure(*case, numSteps, numResets, seed, directory) for _ in range(repeats)]
+    best = runs[0]
+    best['steps_per_sec'] = max(result['steps_per_sec'] for result in runs)
+    best['resets_per_sec'] = max(result['resets_per_sec'] for result in runs)
+    for percentile in best['latency_us']:
+        best['latency_us'][percentile] = min(result['latency_us'][percentile] for result in runs)
+    return best
+
+
+def run(output, envNames=ENVS, mapNames=tuple(MAPS), agentCounts=AGENT_COUNTS, renders=SETTINGS, logs=SETTINGS,
+        numSteps=2000, numResets=500, seed=0, repeats=3):
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for case in cases(envNames, mapNames, agentCounts, renders, logs):
+            result = measureBest(case, numSteps, numResets, seed, repeats, directory)
+            results.append(result)
+            print(f"{caseName(result)}: {result['steps_per_sec']:,.0f} steps/s, "
+                  f"{result['resets_per_sec']:,.0f} resets/s, p99 {result['latency_us']['p99']:.1f}us")
+    with open(output, 'w') as file:
+        json.dump({'machine': machineMetadata(), 'results': results}, file, indent=2)
+    print(f"Wrote {len(results)} results to {output}")
+
+
+def caseKey(result):
+    return result['env'], result['map'], result['agents'], result['render'], result['log']
+
+
+def caseName(result):
+    return (f"{result['env']} {result['map']} {result['agents']} agents, "
+            f"render {result['render']}, log {result['log']}")
+
+
+# Compare a run against a baseline, returns the number of regressions
+def compare(baselinePath, currentPath, threshold=THRESHOLD):
+    with open(baselinePath) as file:
+        baseline = json.load(file)
+    with open(currentPath) as file:
+        current = json.load(file)
+
+    # Numbers from different machines are not comparable, so say so first
+    for key in ['host', 'processor', 'cpu_count', 'python', 'numpy']:
+        if baseline['machine'].get(key) != current['machine'].get(key):
+            print(f"Warning: {key} differs, {baseline['machine'].get(key)} vs {current['machine'].get(key)}")
+
+    baseline_results = {caseKey(result): result for result in baseline['results']}
+    regressions = 0
+    for result in current['results']:
+        old = baseline_results.get(caseKey(result))
+        if old is None:
+            continue
+        # Throughput should not drop, latency should not rise
+        changes = [
+            ('steps/s', result['steps_per_sec'] / old['steps_per_sec'] - 1, -1),
+            ('resets/s', result['resets_per_sec'] / old['resets_per_sec'] - 1, -1),
+            ('p99 latency', result['latency_us']['p99'] / old['latency_us']['p99'] - 1, 1),
+        ]
+        worse = [f"{name} {change:+.1%}" for name, change, sign in changes if change * sign > threshold]
+        if worse:
+            regressions += 1
+            print(f"REGRESSION {caseName(result)}: {', '.join(worse)}")
+    print(f"{regressions} regressions in {len(current['results'])} cases (threshold {threshold:.0%})")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.suite')
+    commands = parser.add_subparsers(dest='command', required=True)
+    run_parser = commands.add_parser('run', help='Run the benchmarks and write the results to JSON')
+    run_parser.add_argument('--output', default='benchmark_results.json')
+    run_parser.add_argument('--envs', nargs='+', default=ENVS, choices=ENVS)
+    run_parser.add_argument('--maps', nargs='+', default=list(MAPS), choices=list(MAPS))
+    run_parser.add_argument('--agents', nargs='+', type=int, default=AGENT_COUNTS)
+    run_parser.add_argument('--render', nargs='+', default=SETTINGS, choices=SETTINGS)
+    run_parser.add_argument('--log', nargs='+', default=SETTINGS, choices=SETTINGS)
+    run_parser.add_argument('--steps', type=int, default=2000)
+    run_parser.add_argument('--resets', type=int, default=500)
+    run_parser.add_argument('--seed', type=int, default=0)
+    run_parser.add_argument('--repeats', type=int, default=3)
+    compare_parser = commands.add_parser('compare', help='Flag the cases that got slower than a baseline')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=THRESHOLD)
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+        run(args.output, args.envs, args.maps, args.agents, args.render, args.log, args.steps, args.resets,
+            args.seed, args.repeats)
+    elif compare(args.baseline, args.current, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+'''
+Benchmark for the dense Q-table and policy of TabularPolicy.
+
+Compares the dict of dicts test.py kept per state for the policy and for
+Q against the float32 arrays of TabularPolicy. Reports the memory of both
+tables, the time to learn from an episode of EPISODE_LENGTH steps with a
+first-visit Monte Carlo update (one episode at a time and in batches of
+BATCH episodes) and the time to sample an action, one state at a time and
+for a batch of states.
+
+Run from the Maze directory:
+    python -m benchmarks.tabular_policy
+'''
+import random
+import time
+import tracemalloc
+
+import numpy as np
+
+from TabularPolicy import TabularPolicy
+
+STATE_COUNTS = [10000, 100000]
+NUM_ACTIONS = 5
+EPISODE_LENGTH = 1000
+BATCH = 64
+
+
+def dictTables(numStates):
+    policy = {state: {action: 1 / NUM_ACTIONS for action in range(NUM_ACTIONS)} for state in range(numStates)}
+    Q = {state: {action: 0.0 for action in range(NUM_ACTIONS)} for state in range(numStates)}
+    return policy, Q
+
+
+# The dict update of test.py, first visits found in one pass and Q kept as running means
+def dictUpdate(episode, Q, counts, policy, epsilon):
+    first = {}
+    for t, (state, action, reward) in enumerate(episode):
+        first.setdefault((state, action), t)
+    cumulative_Reward = 0
+    for t in reversed(range(0, len(episode))):
+        state, action, reward = episode[t]
+        state_action = (state, action)
+        cumulative_Reward += reward
+        if first[state_action] == t:
+            count = counts.get(state_action, 0) + 1
+            counts[state_action] = count
+            Q[state][action] += (cumulative_Reward - Q[state][action]) / count
+            Q_list = list(Q[state].values())
+            max_value = max(Q_list)
+            indices = [i for i, x in enumerate(Q_list) if x == max_value]
+            A_star = random.choice(indices)
+            for a in policy[state]:
+                if a == A_star:
+                    policy[state][a] = (1 - epsilon) + (epsilon / abs(sum(policy[state].values())))
+                else:
+                    policy[state][a] = (epsilon / abs(sum(policy[state].values())))
+
+
+# The action sampling of run_game
+def dictSample(policy, state):
+    n = random.uniform(0, sum(policy[state].values()))
+    top_range = 0
+    for prob in policy[state].items():
+        top_range += prob[1]
+        if n < top_range:
+            return prob[0]
+
+
+def episodes(numStates, count, rng):
+    return [list(zip(rng.integers(0, numStates, EPISODE_LENGTH).tolist(),
+                     rng.integers(0, NUM_ACTIONS, EPISODE_LENGTH).tolist(),
+                     np.where(rng.random(EPISODE_LENGTH) < 0.01, 200.0, -2.0).tolist())) for _ in range(count)]
+
+
+def perCall(function, items):
+    start = time.perf_counter()
+    for item in items:
+        function(item)
+    return (time.perf_counter() - start) / len(items)
+
+
+def main(seed=0):
+    rng = np.random.default_rng(seed)
+    random.seed(seed)
+    print(f"{'states':>8}{'dict MB':>9}{'array MB':>10}{'dict update ms':>16}{'array ms':>10}{'batched ms':>12}"
+          f"{'dict sample us':>16}{'array us':>10}{'batched us':>12}")
+    for numStates in STATE_COUNTS:
+        tracemalloc.start()
+        policy, Q = dictTables(numStates)
+        dict_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        tabular = TabularPolicy(numStates, NUM_ACTIONS, seed=seed)
+        array_bytes = tabular.q.nbytes + tabular.probs.nbytes + tabular.cumulative.nbytes + tabular.counts.nbytes
+
+        batch = episodes(numStates, BATCH, rng)
+        counts = {}
+        dict_update = perCall(lambda episode: dictUpdate(episode, Q, counts, policy, 0.01), batch)
+        array_update = perCall(lambda episode: tabular.updateFromEpisodes([episode]), batch)
+        batched_update = perCall(tabular.updateFromEpisodes, [batch]) / BATCH
+
+        states = rng.integers(0, numStates, 10000)
+        dict_sample = perCall(lambda state: dictSample(policy, state), states.tolist())
+        array_sample = perCall(tabular.sampleOne, states.tolist())
+        batched_sample = perCall(tabular.sample, [states]) / len(states)
+
+        print(f"{numStates:>8,}{dict_bytes / 1e6:>9.1f}{array_bytes / 1e6:>10.1f}{dict_update * 1e3:>16.2f}"
+              f"{array_update * 1e3:>10.2f}{batched_update * 1e3:>12.3f}{dict_sample * 1e6:>16.2f}"
+              f"{array_sample * 1e6:>10.2f}{batched_sample * 1e6:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+'''
+Benchmark for Trajectory against the step by step text log.
+
+Plays the same random episodes twice, once writing every world to a text log
+with EpisodeLogger at LOG_STEPS and once recording the actions with
+TrajectoryRecorder. Reports the bytes written per step, then the time to
+rebuild every world of every episode by parsing the text log and by
+replaying the trajectory.
+
+Run from the Maze directory:
+    python -m benchmarks.trajectory
+'''
+import os
+import tempfile
+import time
+import numpy as np
+
+import EpisodeLog
+from MazeEnv import MazeEnv
+from Trajectory import Trajectory, TrajectoryRecorder
+from benchmarks.maps import MAPS, countAgents
+
+
+def play(env, numEpisodes, seed):
+    rng = np.random.default_rng(seed)
+    for _ in range(numEpisodes):
+        env.reset()
+        done = False
+        while not done:
+            obs, reward, done, info = env.step(int(rng.integers(0, 5)))
+
+
+# Read every world back out of the text log, they are the lines made only of numbers
+def parseLog(path, height):
+    worlds = []
+    rows = []
+    with open(path) as file:
+        for line in file:
+            # The first row of a world follows the move description on the same line
+            if line.startswith('Agent') and '      ' in line:
+                line = line.split('      ', 1)[1]
+            values = line.split()
+            if values and all(value.lstrip('-').isdigit() for value in values):
+                rows.append([int(value) for value in values])
+                if len(rows) == height:
+                    worlds.append(np.array(rows))
+                    rows = []
+    return worlds
+
+
+def main(mapName='world4', numEpisodes=200, seed=0):
+    world = MAPS[mapName]
+    numAgents = countAgents(world)
+
+    with tempfile.TemporaryDirectory() as directory:
+        log_path = os.path.join(directory, 'render.txt')
+        log = EpisodeLog.EpisodeLogger(log_path, level=EpisodeLog.LOG_STEPS)
+        play(MazeEnv(world, numAgents, log=log), numEpisodes, seed)
+        log.close()
+
+        trajectory_path = os.path.join(directory, 'trajectories.npz')
+        env = TrajectoryRecorder(MazeEnv(world, numAgents), trajectory_path)
+        play(env, numEpisodes, seed)
+        env.close()
+
+        trajectory = Trajectory.load(trajectory_path)
+        numSteps = int(trajectory.episode_starts[-1])
+        print(f"{mapName}: {numEpisodes} episodes, {numSteps} steps")
+        print(f"{mapName}: text log: {os.path.getsize(log_path) / numSteps:,.1f} bytes/step")
+        print(f"{mapName}: trajectory: {os.path.getsize(trajectory_path) / numSteps:,.1f} bytes/step")
+
+        start = time.perf_counter()
+        parsed = len(parseLog(log_path, np.size(world, 0)))
+        parsing = time.perf_counter() - start
+        start = time.perf_counter()
+        replayed = sum(1 for episode in range(len(trajectory)) for _ in trajectory.replayWorlds(episode))
+        replaying = time.perf_counter() - start
+    print(f"{mapName}: parsing the text log: {parsed} worlds in {parsing:.3f}s")
+    print(f"{mapName}: replaying the trajectory: {replayed} worlds in {replaying:.3f}s ({parsing / replaying:,.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+'''
+Benchmark for the layered world storage of MazeEnv.
+
+Compares the time to put the agents back on their starting cells at reset
+against a variant that copies the whole starting world and scans it for the
+agents, as reset did before the terrain and occupancy planes were split.
+Runs on generated maps from 100x100 to 1000x1000, with the agents written
+into the world where they fit and given as starting cells beyond that, and
+reports steps per second with each observation layout.
+
+Run from the Maze directory:
+    python -m benchmarks.world_layers
+'''
+import time
+
+import numpy as np
+
+import MazeGenerator
+from MazeEnv import MazeEnv
+from MazeRules import MAX_WORLD_AGENT
+
+SIZES = [100, 300, 1000]
+AGENT_COUNTS = [2, 10, 1000]
+
+
+class CopyingMazeEnv(MazeEnv):
+    # Copy the starting world over the world and find the agents with a scan of it
+    def _resetAgents(self):
+        self.world[:] = self.world_start
+        self.occupancy[:] = 0
+        rows, cols = np.nonzero((self.world >= 1) & (self.world <= self.numAgents))
+        for row, col in zip(rows.tolist(), cols.tolist()):
+            self.occupancy[row, col] = self.world[row, col]
+            self.agent_pos[int(self.world[row, col])] = (row, col)
+
+
+def resetMicroseconds(env, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        env._resetAgents()
+    return (time.perf_counter() - start) / repeats * 1e6
+
+
+def stepsPerSecond(env, actions):
+    env.reset(seed=0)
+    start = time.perf_counter()
+    for action in actions:
+        if env.step(action)[-2]:
+            env.reset()
+    return len(actions) / (time.perf_counter() - start)
+
+
+def main(repeats=200, numSteps=5000, seed=0):
+    actions = np.random.default_rng(seed).integers(0, 5, size=numSteps).tolist()
+    print(f"{'map':<11}{'agents':>7}{'copy+scan us':>14}{'layers us':>11}{'world steps/s':>15}{'planes steps/s':>16}")
+    for size in SIZES:
+        for numAgents in AGENT_COUNTS:
+            if numAgents <= MAX_WORLD_AGENT:
+                world = MazeGenerator.generate('rooms', size, size, numAgents=numAgents, seed=seed)
+                agent_start = None
+            else:
+                world = MazeGenerator.generate('rooms', size, size, numAgents=0, seed=seed)
+                agent_start = MazeGenerator.placeAgents(world, numAgents, seed=seed)
+            layered = MazeEnv(world, numAgents, agent_start=agent_start)
+            row = f"{size}x{size:<7}{numAgents:>7}"
+            # Agents that are not in the world can't be found by scanning it
+            if agent_start is None:
+                row += f"{resetMicroseconds(CopyingMazeEnv(world, numAgents), repeats):>14.1f}"
+            else:
+                row += f"{'-':>14}"
+            row += f"{resetMicroseconds(layered, repeats):>11.1f}"
+            row += f"{stepsPerSecond(layered, actions):>15,.0f}"
+            planes = MazeEnv(world, numAgents, agent_start=agent_start, obs_layout='planes')
+            row += f"{stepsPerSecond(planes, actions):>16,.0f}"
+            print(row)
+
+
+if __name__ == "__main__":
+    main()